@@ -1,69 +1,278 @@
 """Job API endpoints."""
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import func
-from sqlmodel import select
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from app.db.session import get_session
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlmodel import Session
+
+from app.core.config import get_settings
+from app.db.session import run_in_session
 from app.models.job import Job
 from app.schemas.job import (
     AnalyticsSummary,
+    AnalyticsTimeseries,
     JobCreateRequest,
     JobListResponse,
     JobResponse,
     JobSummary,
+    QuoteResponse,
+    QuoteSweepRequest,
+    QuoteSweepResponse,
+    SubmissionAccepted,
+    SubmissionStatus,
 )
 from app.services.analytics import compute_summary
-from app.services.pipeline import process_job
+from app.services.batch import BatchItem, run_batch
+from app.services.history import list_job_page
+from app.services.pipeline import get_plugin, process_job
+from app.services.quick_quote import quick_quote
+from app.services.rollups import GRANULARITIES, timeseries
+from app.services.submissions import SubmissionQueueFull, job_queue
+from app.services.sweep import quote_sweep
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
+settings = get_settings()
+
+# Comment lines sent on idle event streams so proxies do not close them.
+SSE_KEEPALIVE = 15.0
+
+
+def _job_page(session: Session, limit: int, **kwargs: Any) -> Tuple[List[JobSummary], Optional[int], Optional[str]]:
+    page = list_job_page(session, limit, **kwargs)
+    items = [JobSummary.from_orm(record) for record in page["records"]]
+    return items, page["total"], page["next_cursor"]
 
 
 @router.get("", response_model=JobListResponse)
-def list_jobs(limit: int = Query(10, ge=1, le=100), offset: int = Query(0, ge=0)) -> JobListResponse:
-    """Return a paginated list of recently generated jobs."""
+async def list_jobs(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor."),
+    offset: int = Query(0, ge=0, description="Deprecated; ignored when a cursor is given."),
+    include_total: bool = Query(True),
+) -> JobListResponse:
+    """Return a page of recently generated jobs, newest first."""
+
+    try:
+        items, total, next_cursor = await run_in_session(
+            _job_page, limit, cursor=cursor, offset=offset, include_total=include_total
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    with get_session() as session:
-        total_result = session.exec(select(func.count()).select_from(Job)).one()
-        total = int(total_result[0] if isinstance(total_result, tuple) else total_result)
+    return JobListResponse(
+        items=items,
+        total=total,
+        limit=limit,
+        offset=0 if cursor else offset,
+        next_cursor=next_cursor,
+    )
 
-        statement = select(Job).order_by(Job.timestamp.desc()).offset(offset).limit(limit)
-        records = session.exec(statement).all()
 
-    items = [JobSummary.from_orm(record) for record in records]
-    return JobListResponse(items=items, total=total, limit=limit, offset=offset)
+@router.post("", response_model=JobResponse, status_code=201, responses={202: {"model": SubmissionAccepted}})
+async def create_job(
+    request: JobCreateRequest,
+    http_request: Request,
+    deadline: Optional[float] = Query(
+        None, gt=0, le=60, description="Seconds the bid may take; defaults to the server's request deadline."
+    ),
+    run_async: bool = Query(
+        False, alias="async", description="Queue the job and answer 202 at once instead of waiting for the bid."
+    ),
+) -> Any:
+    """Create a job bid based on user input.
 
+    With ``async=true`` the job is queued for the background workers and the
+    response is ``202`` with its ``job_id`` and the URLs of its status and
+    progress stream.
+    """
 
-@router.post("", response_model=JobResponse, status_code=201)
-async def create_job(request: JobCreateRequest) -> JobResponse:
-    """Create a job bid based on user input."""
+    if run_async:
+        try:
+            get_plugin(request.trade)
+            job_id = await job_queue.submit(request.dict(), deadline_seconds=deadline)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        except SubmissionQueueFull as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+        accepted = SubmissionAccepted(
+            job_id=job_id,
+            status="queued",
+            status_url=http_request.app.url_path_for("job_status", job_id=job_id),
+            events_url=http_request.app.url_path_for("job_events", job_id=job_id),
+        )
+        return JSONResponse(accepted.dict(), status_code=202, headers={"Location": accepted.status_url})
 
     try:
-        result = await process_job(request.dict())
+        result = await process_job(request.dict(), deadline_seconds=deadline)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
     return JobResponse.parse_obj(result)
 
 
+@router.post("/quote", response_model=QuoteResponse)
+async def create_quote(request: JobCreateRequest) -> QuoteResponse:
+    """Return a ballpark bid from cached and baseline data without calling providers or saving."""
+
+    try:
+        result = await quick_quote(request.dict())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return QuoteResponse.parse_obj(result)
+
+
+@router.post("/quote-sweep", response_model=QuoteSweepResponse)
+async def create_quote_sweep(request: QuoteSweepRequest) -> QuoteSweepResponse:
+    """Price every combination of the requested dimensions and margins without saving a job."""
+
+    fields = {"lengths", "widths", "depths", "margins"}
+    try:
+        result = await quote_sweep(request.dict(exclude=fields), **request.dict(include=fields))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return QuoteSweepResponse(**result)
+
+
+def _parse_batch_item(index: int, raw: Any) -> BatchItem:
+    if index >= settings.batch_max_items:
+        return index, ValueError(f"Batch is limited to {settings.batch_max_items} jobs")
+    try:
+        return index, JobCreateRequest.parse_obj(raw).dict()
+    except ValidationError as exc:
+        return index, ValueError(str(exc))
+
+
+async def _list_items(body: List[Any]) -> AsyncIterator[BatchItem]:
+    for index, raw in enumerate(body):
+        yield _parse_batch_item(index, raw)
+
+
+def _parse_ndjson_line(index: int, line: bytes) -> BatchItem:
+    try:
+        raw = json.loads(line)
+    except ValueError as exc:
+        return index, ValueError(f"Invalid JSON: {exc}")
+    return _parse_batch_item(index, raw)
+
+
+async def _ndjson_items(body: bytes) -> AsyncIterator[BatchItem]:
+    lines = (line for line in body.splitlines() if line.strip())
+    for index, line in enumerate(lines):
+        yield _parse_ndjson_line(index, line)
+
+
+async def _encode_results(results: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for result in results:
+        if "job" in result:
+            result = {**result, "job": jsonable_encoder(JobResponse.parse_obj(result["job"]), by_alias=True)}
+        yield json.dumps(result) + "\n"
+
+
+@router.post("/batch", status_code=200, response_class=StreamingResponse)
+async def create_jobs_batch(request: Request) -> StreamingResponse:
+    """Create many job bids at once.
+
+    Accepts a JSON array of job requests or an ``application/x-ndjson`` stream
+    with one request per line, and streams one NDJSON result per job as soon
+    as it is stored: ``{"index", "status": "created", "job"}`` or
+    ``{"index", "status": "error", "error"}``.
+    """
+
+    # The body is read up front: once a streaming response starts, Starlette
+    # listens on the same receive channel for client disconnects.
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = _ndjson_items(await request.body())
+    else:
+        try:
+            body = await request.json()
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON stream") from exc
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON stream")
+        items = _list_items(body)
+
+    return StreamingResponse(_encode_results(run_batch(items)), media_type="application/x-ndjson")
+
+
 @router.get("/analytics/summary", response_model=AnalyticsSummary)
-def analytics_summary() -> AnalyticsSummary:
+async def analytics_summary() -> AnalyticsSummary:
     """Return aggregate analytics computed from historical jobs."""
 
-    with get_session() as session:
-        summary = compute_summary(session)
+    summary = await run_in_session(compute_summary)
 
     return AnalyticsSummary(**summary)
 
 
+@router.get("/analytics/timeseries", response_model=AnalyticsTimeseries)
+async def analytics_timeseries(
+    granularity: str = Query("day", regex=f"^({'|'.join(GRANULARITIES)})$"),
+    trade: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None, alias="from", description="Inclusive UTC start."),
+    end: Optional[datetime] = Query(None, alias="to", description="Exclusive UTC end."),
+) -> AnalyticsTimeseries:
+    """Return per-trade trend points from the time-bucketed rollups.
+
+    Hourly points are only kept for the recent retention window.
+    """
+
+    points = await run_in_session(timeseries, granularity, trade=trade, start=start, end=end)
+
+    return AnalyticsTimeseries(granularity=granularity, points=points)
+
+
+async def _encode_events(events: AsyncIterator[Optional[Dict[str, Any]]]) -> AsyncIterator[str]:
+    async for event in events:
+        if event is None:
+            yield ": keep-alive\n\n"
+            continue
+        yield f"event: {event['status']}\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
+
+
+@router.get("/{job_id}/status", response_model=SubmissionStatus, name="job_status")
+async def job_status(job_id: str) -> SubmissionStatus:
+    """Return the processing state of a job submitted with ``async=true``."""
+
+    status = await job_queue.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return SubmissionStatus(**status)
+
+
+@router.get("/{job_id}/events", response_class=StreamingResponse, name="job_events")
+async def job_events(job_id: str) -> StreamingResponse:
+    """Stream a submitted job's progress as Server-Sent Events.
+
+    Events already published are replayed first; the stream ends with a
+    ``completed`` or ``failed`` event. Jobs running in another process, or no
+    longer tracked in memory, are followed through their stored status.
+    """
+
+    events = await job_queue.events(job_id, keepalive=SSE_KEEPALIVE)
+    if events is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return StreamingResponse(
+        _encode_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{job_id}", response_model=JobResponse)
-def get_job(job_id: str) -> JobResponse:
+async def get_job(job_id: str) -> JobResponse:
     """Retrieve a job by identifier."""
 
-    with get_session() as session:
-        job = session.get(Job, job_id)
-
+    job = await run_in_session(Session.get, Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -3,10 +3,12 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Literal, Optional
 
 from pydantic import BaseSettings, Field
 
+APP_DIR = Path(__file__).resolve().parent.parent
+
 
 class Settings(BaseSettings):
     """Central application settings loaded from environment variables."""
@@ -16,14 +18,163 @@ class Settings(BaseSettings):
     debug: bool = False
 
     database_url: str = Field(
-        default=f"sqlite:///{Path(__file__).resolve().parent.parent / 'bidder.db'}",
+        default=f"sqlite:///{APP_DIR / 'bidder.db'}",
         description="SQLModel compatible database URL.",
     )
+    db_executor_workers: int = Field(
+        default=4, ge=1, description="Threads running blocking database work for async request paths."
+    )
+    db_pool_size: int = Field(default=5, ge=1, description="Connections kept open per process.")
+    db_max_overflow: int = Field(default=10, ge=0)
+    db_pool_timeout: float = Field(default=30.0, description="Seconds to wait for a free pooled connection.")
+    db_pool_recycle: int = Field(default=3600, description="Seconds before a pooled connection is replaced.")
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = Field(
+        default="WAL", description="WAL lets readers run alongside the writer."
+    )
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = Field(
+        default="NORMAL", description="NORMAL is durable across crashes under WAL."
+    )
+    sqlite_cache_size_kib: int = Field(
+        default=8 * 1024,
+        ge=0,
+        description="Page cache per connection; a process may hold DB_POOL_SIZE + DB_MAX_OVERFLOW of them.",
+    )
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024, ge=0, description="Bytes of the file to memory-map.")
+    sqlite_busy_timeout_ms: int = Field(default=5000, ge=0, description="Wait for locks instead of failing.")
+
+    persistence_mode: str = Field(
+        default="direct",
+        regex="^(direct|write_behind)$",
+        description="'write_behind' queues created jobs and inserts them in batched transactions.",
+    )
+    write_behind_batch_size: int = Field(default=200, ge=1, description="Rows that trigger an immediate flush.")
+    write_behind_max_delay: float = Field(default=0.05, ge=0, description="Seconds a queued row may wait.")
+    write_behind_max_pending: int = Field(default=10000, ge=1, description="Queued rows before callers wait.")
 
     geoapify_key: Optional[str] = Field(default=None, env="GEOAPIFY_KEY")
     openweather_api_key: Optional[str] = Field(default=None, env="OPENWEATHER_API_KEY")
     bls_api_key: Optional[str] = Field(default=None, env="BLS_API_KEY")
 
+    http_timeout: float = Field(default=20.0, description="Default upstream request timeout in seconds.")
+    http_connect_timeout: float = Field(default=5.0, description="Upper bound for establishing a connection.")
+    provider_timeouts: Dict[str, float] = Field(
+        default_factory=lambda: {
+            "nominatim": 10.0,
+            "geoapify": 10.0,
+            "bls": 20.0,
+            "build": 8.0,
+            "openweather": 5.0,
+            "wikihow": 10.0,
+        },
+        description="Per-provider request timeouts in seconds, keyed by provider name.",
+    )
+    http_max_connections_per_host: int = Field(default=20, ge=1)
+    http_max_keepalive_connections: int = Field(default=10, ge=0)
+    http_keepalive_expiry: float = Field(default=30.0, ge=0)
+    http2_enabled: bool = Field(default=False, description="Negotiate HTTP/2 when the 'h2' package is installed.")
+    http_user_agent: str = "Bidder/1.0 (https://example.com)"
+
+    circuit_failure_threshold: int = Field(
+        default=5, ge=1, description="Consecutive provider failures that open its circuit."
+    )
+    circuit_reset_timeout: float = Field(default=30.0, description="Seconds an open circuit waits before a probe.")
+    provider_max_retries: int = Field(default=2, ge=0, description="Retries for connection errors and 429/5xx.")
+    provider_retry_backoff: float = Field(default=0.2, ge=0, description="Base seconds of the jittered backoff.")
+    adaptive_timeout_percentile: float = Field(default=99.0, gt=0, le=100)
+    adaptive_timeout_multiplier: float = Field(
+        default=3.0, ge=1, description="Timeout as a multiple of the observed latency percentile."
+    )
+    adaptive_timeout_min: float = Field(default=1.0, description="Lower bound for adaptive timeouts in seconds.")
+    adaptive_timeout_window: int = Field(default=200, ge=1, description="Recent response times kept per provider.")
+    adaptive_timeout_min_samples: int = Field(
+        default=20, ge=1, description="Responses observed before the configured timeout is tightened."
+    )
+
+    geocode_cache_size: int = Field(default=2048, ge=1, description="Geocodes kept in the in-process LRU.")
+    geocode_cache_ttl: float = Field(default=30 * 24 * 3600, description="Lifetime of a cached geocode in seconds.")
+    geocode_negative_ttl: float = Field(default=24 * 3600, description="Lifetime of a cached 'no results' answer.")
+    geocode_cache_path: Optional[Path] = Field(
+        default=APP_DIR / "geocode_cache.db",
+        description="SQLite file backing the geocode cache; unset to keep it in memory only.",
+    )
+
+    bls_series_per_request: Optional[int] = Field(
+        default=None, ge=1, le=50, description="Series per BLS request; defaults to 50 with BLS_API_KEY, else 25."
+    )
+    labor_rate_include_states: Optional[bool] = Field(
+        default=None, description="Prefetch state-level wages as well as national; defaults to on with BLS_API_KEY."
+    )
+    labor_rate_refresh_interval: float = Field(default=24 * 3600, description="Seconds between BLS refreshes.")
+    labor_rate_retry_interval: float = Field(
+        default=15 * 60, description="First retry delay after a failed BLS refresh; doubles up to the refresh interval."
+    )
+
+    weather_grid_precision: int = Field(
+        default=1, ge=0, le=4, description="Decimal places of lat/lon per weather cache cell."
+    )
+    weather_cache_ttl: float = Field(default=30 * 60, description="Lifetime of a cached weather modifier in seconds.")
+    weather_cache_size: int = Field(default=4096, ge=1)
+
+    instruction_refresh_interval: float = Field(default=12 * 3600, description="Seconds between WikiHow refreshes.")
+    instruction_retry_interval: float = Field(default=10 * 60, description="Retry delay while any query is uncached.")
+
+    singleflight_share_errors: bool = Field(
+        default=True, description="Raise a failed coalesced lookup to every waiter instead of letting them retry."
+    )
+
+    batch_concurrency: int = Field(default=8, ge=1, description="Pipelines run at once by POST /jobs/batch.")
+    batch_flush_size: int = Field(default=50, ge=1, description="Maximum jobs inserted per batch transaction.")
+    batch_item_timeout: float = Field(default=60.0, description="Seconds before one batch item is reported as failed.")
+    batch_max_items: int = Field(default=5000, ge=1)
+
+    rollup_hourly_retention: float = Field(
+        default=14 * 24 * 3600, description="Seconds of hourly rollups kept before compaction into days."
+    )
+    rollup_compaction_interval: float = Field(default=3600, description="Seconds between rollup compactions.")
+    rollup_max_points: int = Field(default=5000, ge=1, description="Row limit for one timeseries response.")
+
+    request_deadline: float = Field(
+        default=2.0, ge=0, description="Seconds a created bid may take before inputs fall back; 0 disables."
+    )
+    deadline_reserve: float = Field(
+        default=0.25, ge=0, description="Part of the deadline kept for computing and storing the bid."
+    )
+
+    submission_workers: int = Field(default=4, ge=1, description="Jobs from POST /jobs?async=true run at once.")
+    submission_max_pending: int = Field(default=10000, ge=1, description="Queued async jobs before 503s.")
+    submission_max_attempts: int = Field(
+        default=3, ge=1, description="Runs of an async job cut short by a crash before it is marked failed."
+    )
+    submission_lease: float = Field(
+        default=30, gt=0, description="Seconds a worker holds a claimed job without renewing its lease."
+    )
+    submission_poll_interval: float = Field(
+        default=1.0, gt=0, description="Seconds idle workers and event streams wait between queue polls."
+    )
+    submission_deadline: float = Field(
+        default=0, ge=0, description="Deadline for async jobs without one; 0 waits for every provider."
+    )
+    submission_retention: float = Field(
+        default=7 * 24 * 3600, description="Seconds finished async submissions stay queryable."
+    )
+    submission_progress_retention: float = Field(
+        default=300, description="Seconds the progress events of a finished job are kept in memory."
+    )
+    submission_shutdown_timeout: float = Field(
+        default=10, ge=0, description="Seconds shutdown waits for running async jobs before releasing them."
+    )
+
+    sweep_max_variants: int = Field(default=20000, ge=1, description="Largest grid one quote sweep may price.")
+
+    material_lookup_concurrency: int = Field(
+        default=4, ge=1, description="Maximum concurrent material price lookups per job."
+    )
+    material_price_fresh_ttl: float = Field(default=3600, description="Seconds a live price is served without refresh.")
+    material_price_max_stale: float = Field(
+        default=7 * 24 * 3600, description="Seconds past freshness a price is served while it refreshes."
+    )
+    material_price_cache_size: int = Field(default=5000, ge=1, description="Maximum cached material prices.")
+
     class Config:
         env_file = ".env"
         case_sensitive = False
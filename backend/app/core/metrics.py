@@ -0,0 +1,236 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms are plain Python objects guarded by a lock, cheap
+enough to record on every request: an observation is a bisect and a few
+additions. Cache statistics are not recorded on the hot path at all; caches
+register a callback that reads their own hit counters when ``/metrics`` is
+scraped.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+
+Labels = Tuple[str, ...]
+MetricT = TypeVar("MetricT", bound="_Metric")
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _check(self, labels: Labels) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+
+    @abstractmethod
+    def samples(self) -> Iterator[Tuple[str, Labels, Sequence[str], float]]:
+        """Yield ``(sample name, label names, label values, value)`` for every series."""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labelnames, values, value in self.samples():
+            lines.append(f"{name}{_format_labels(labelnames, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Sequence[str], float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield self.name, self.labelnames, labels, value
+
+
+class CallbackCounter(_Metric):
+    """Counter whose samples are read from registered callbacks at scrape time.
+
+    Each callback returns ``(label values, value)`` pairs, so components that
+    already keep their own totals (such as cache hit counts) cost nothing
+    extra per request.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: List[Callable[[], Iterable[Tuple[Labels, float]]]] = []
+
+    def register(self, callback: Callable[[], Iterable[Tuple[Labels, float]]]) -> None:
+        self._callbacks.append(callback)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Sequence[str], float]]:
+        for callback in list(self._callbacks):
+            for labels, value in callback():
+                yield self.name, self.labelnames, labels, value
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: "Histogram", labels: Labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (seconds, by convention)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: one count per bucket plus +Inf, then the sum.
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        self._check(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def time(self, *labels: str) -> _Timer:
+        """Return a context manager that observes the duration of its block."""
+
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return sum(state[:-1]) if state else 0
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Sequence[str], float]]:
+        with self._lock:
+            values = sorted((labels, list(state)) for labels, state in self._values.items())
+        bucket_labels = self.labelnames + ("le",)
+        for labels, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", bucket_labels, labels + (_format_value(float(bound)),), cumulative
+            yield f"{self.name}_sum", self.labelnames, labels, state[-1]
+            yield f"{self.name}_count", self.labelnames, labels, cumulative
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: MetricT) -> MetricT:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_seconds = registry.register(
+    Histogram("bidder_stage_duration_seconds", "Time spent in each pipeline stage.", ("trade", "stage"))
+)
+job_seconds = registry.register(
+    Histogram("bidder_job_duration_seconds", "End-to-end time to generate and store one job.", ("trade",))
+)
+provider_seconds = registry.register(
+    Histogram("bidder_provider_request_duration_seconds", "Upstream provider response time.", ("provider",))
+)
+provider_errors = registry.register(
+    Counter(
+        "bidder_provider_errors_total",
+        "Upstream provider failures by reason: transport, status (5xx), timeout or circuit_open.",
+        ("provider", "reason"),
+    )
+)
+bids_created = registry.register(Counter("bidder_bids_total", "Bids generated per trade.", ("trade",)))
+cache_requests = registry.register(
+    CallbackCounter("bidder_cache_requests_total", "Cache lookups by outcome.", ("cache", "result"))
+)
+
+
+def register_cache(name: str, get_cache: Callable[[], object]) -> None:
+    """Report the ``hits``/``stale_hits``/``misses`` attributes of ``get_cache()`` as ``name``.
+
+    ``get_cache`` is called on every scrape, so caches that are replaced at
+    runtime keep being reported.
+    """
+
+    def collect() -> Iterator[Tuple[Labels, float]]:
+        cache = get_cache()
+        for result, attribute in (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses")):
+            if hasattr(cache, attribute):
+                yield (name, result), getattr(cache, attribute)
+
+    cache_requests.register(collect)
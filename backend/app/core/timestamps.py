@@ -0,0 +1,15 @@
+"""Timestamp normalisation shared by the services that store job times."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Return ``value`` as a naive UTC datetime, the form SQLite stores and returns.
+
+    Naive values are assumed to be UTC already and returned unchanged.
+    """
+
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
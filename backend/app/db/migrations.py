@@ -0,0 +1,162 @@
+"""Versioned schema migrations applied on startup.
+
+``SQLModel.metadata.create_all`` only creates missing tables, so any change to
+an existing ``bidder.db`` (indexes, new columns, table rebuilds) is expressed
+as a numbered :class:`Migration`. Applied versions are recorded in the
+``schema_migrations`` table and each migration runs at most once, in its own
+transaction.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Sequence, Union
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+MigrationStep = Union[Sequence[str], Callable[[Connection], None]]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A schema change: SQL statements or a callable receiving the connection."""
+
+    version: int
+    description: str
+    apply: MigrationStep
+
+    def run(self, connection: Connection) -> None:
+        if callable(self.apply):
+            self.apply(connection)
+            return
+        for statement in self.apply:
+            connection.execute(text(statement))
+
+
+def _rebuild_analytics(connection: Connection) -> None:
+    from sqlmodel import Session
+
+    from app.services.analytics import rebuild_aggregates
+
+    with Session(bind=connection) as session:
+        rebuild_aggregates(session)
+        session.flush()
+
+
+def _rebuild_recent_locations(connection: Connection) -> None:
+    from app.models.analytics import RecentLocation
+
+    # The ring used to be keyed by commit sequence; recreate it keyed by job.
+    RecentLocation.__table__.drop(connection, checkfirst=True)
+    RecentLocation.__table__.create(connection)
+    _rebuild_analytics(connection)
+
+
+def _add_submission_leases(connection: Connection) -> None:
+    inspector = inspect(connection)
+    if not inspector.has_table("jobsubmission"):
+        return
+    existing = {column["name"] for column in inspector.get_columns("jobsubmission")}
+    for name, kind in (("stage", "VARCHAR"), ("owner", "VARCHAR"), ("lease_expires_at", "DATETIME")):
+        if name not in existing:
+            connection.execute(text(f"ALTER TABLE jobsubmission ADD COLUMN {name} {kind}"))
+
+
+def _rebuild_rollups(connection: Connection) -> None:
+    from sqlmodel import Session
+
+    from app.services.rollups import rebuild_rollups
+
+    with Session(bind=connection) as session:
+        rebuild_rollups(session)
+        session.flush()
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Index job history, trade and location lookups",
+        (
+            "CREATE INDEX IF NOT EXISTS ix_job_timestamp_job_id ON job (timestamp, job_id)",
+            "CREATE INDEX IF NOT EXISTS ix_job_trade_timestamp ON job (trade, timestamp)",
+            "CREATE INDEX IF NOT EXISTS ix_job_location ON job (location)",
+        ),
+    ),
+    Migration(2, "Backfill trade aggregates and recent locations", _rebuild_analytics),
+    Migration(3, "Backfill hourly, daily and weekly job rollups", _rebuild_rollups),
+    Migration(4, "Order recent locations by job timestamp", _rebuild_recent_locations),
+    Migration(5, "Lease async job submissions to one worker at a time", _add_submission_leases),
+]
+
+
+def _ensure_version_table(engine: Engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version INTEGER PRIMARY KEY, description TEXT NOT NULL, applied_at TIMESTAMP NOT NULL)"
+            )
+        )
+
+
+def applied_versions(engine: Engine) -> List[int]:
+    """Return the migration versions already applied to ``engine``."""
+
+    _ensure_version_table(engine)
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT version FROM schema_migrations ORDER BY version"))
+        return [row[0] for row in rows]
+
+
+def run_migrations(engine: Engine, migrations: Sequence[Migration] = MIGRATIONS) -> List[int]:
+    """Apply every pending migration in version order and return the versions applied.
+
+    The version row is inserted first within the migration's transaction, so
+    when several workers start at once only one of them applies each step.
+    """
+
+    done = set(applied_versions(engine))
+    applied: List[int] = []
+
+    for migration in sorted(migrations, key=lambda item: item.version):
+        if migration.version in done:
+            continue
+
+        try:
+            with engine.begin() as connection:
+                connection.execute(
+                    text(
+                        "INSERT INTO schema_migrations (version, description, applied_at) "
+                        "VALUES (:version, :description, :applied_at)"
+                    ),
+                    {
+                        "version": migration.version,
+                        "description": migration.description,
+                        "applied_at": datetime.utcnow(),
+                    },
+                )
+                migration.run(connection)
+        except IntegrityError:
+            # Either the version row lost a race with another worker, or the
+            # migration itself violated a constraint and must not be skipped.
+            if migration.version not in applied_versions(engine):
+                raise
+            logger.info("Migration %s already applied by another worker", migration.version)
+            continue
+
+        logger.info("Applied migration %s: %s", migration.version, migration.description)
+        applied.append(migration.version)
+
+    return applied
+
+
+if __name__ == "__main__":
+    from app.db.session import engine, init_db
+
+    init_db()
+    print(f"Schema at version {max(applied_versions(engine), default=0)}")
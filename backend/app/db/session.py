@@ -1,21 +1,103 @@
 """Database session management using SQLModel."""
 from __future__ import annotations
 
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool, StaticPool
 from sqlmodel import Session, SQLModel, create_engine
 
 from app.core.config import get_settings
 
 settings = get_settings()
-engine = create_engine(settings.database_url, echo=settings.debug, future=True)
+
+T = TypeVar("T")
+
+
+def _sqlite_pragmas() -> Dict[str, Any]:
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "cache_size": -settings.sqlite_cache_size_kib,
+        "mmap_size": settings.sqlite_mmap_size,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+    }
+
+
+def build_engine(database_url: Optional[str] = None) -> Engine:
+    """Create the engine for ``database_url`` using the tuning profile from settings.
+
+    SQLite connections get the WAL/synchronous/cache/mmap/busy-timeout
+    pragmas on connect and are pooled across threads (the DB executor and
+    the migration runner share them); in-memory databases share a single
+    connection. Other backends get a sized, pre-pinged pool.
+    """
+
+    url = make_url(database_url or settings.database_url)
+    options: Dict[str, Any] = {"echo": settings.debug, "future": True}
+
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=True,
+            **options,
+        )
+
+    connect_args = {"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000}
+    if url.database in (None, "", ":memory:") or url.query.get("mode") == "memory":
+        engine = create_engine(url, connect_args=connect_args, poolclass=StaticPool, **options)
+    else:
+        engine = create_engine(
+            url,
+            connect_args=connect_args,
+            poolclass=QueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            **options,
+        )
+
+    pragmas = _sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, _record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+engine = build_engine()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
 
 
 def init_db() -> None:
-    """Create database tables if they do not exist."""
+    """Create missing tables, apply pending migrations and seed maintained counters."""
+
+    from app.db.migrations import run_migrations
+    from app.models import analytics, counter, job, labor, submission  # noqa: F401  (register table metadata)
+    from app.services.history import ensure_job_total
 
     SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
+    with get_session() as session:
+        ensure_job_total(session)
 
 
 @contextmanager
@@ -24,3 +106,40 @@ def get_session() -> Iterator[Session]:
 
     with Session(engine) as session:
         yield session
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool used for database work, creating it on first use."""
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.db_executor_workers, thread_name_prefix="db")
+        return _executor
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking database code on the DB executor without stalling the event loop."""
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_in_session(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call ``fn(session, *args, **kwargs)`` with a fresh session on the DB executor."""
+
+    def call() -> T:
+        with get_session() as session:
+            return fn(session, *args, **kwargs)
+
+    return await run_db(call)
+
+
+def shutdown_db(wait: bool = True) -> None:
+    """Stop the DB executor after its queued work finishes (when ``wait``)."""
+
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
@@ -2,11 +2,15 @@
 from __future__ import annotations
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
 from app.api.routes import jobs
+from app.core import metrics
 from app.core.config import get_settings
 from app.core.logging import configure_logging
-from app.db.session import init_db
+from app.db.session import init_db, shutdown_db
+from app.services import instructions, labor, providers, rollups, submissions, write_behind
+from app.services.pipeline import PLUGIN_REGISTRY
 
 settings = get_settings()
 configure_logging(settings.debug)
@@ -15,8 +19,36 @@ app = FastAPI(title=settings.app_name, debug=settings.debug)
 app.include_router(jobs.router, prefix=settings.api_v1_prefix)
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics() -> PlainTextResponse:
+    """Expose pipeline, provider and cache metrics for Prometheus to scrape."""
+
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.on_event("startup")
-def on_startup() -> None:
+async def on_startup() -> None:
     """Initialize resources on application startup."""
 
     init_db()
+    await providers.startup()
+    labor.labor_rate_store.start()
+    instructions.instruction_cache.register(plugin.instruction_query for plugin in PLUGIN_REGISTRY.values())
+    instructions.instruction_cache.start()
+    rollups.rollup_compactor.start()
+    if settings.persistence_mode == write_behind.WRITE_BEHIND:
+        write_behind.job_writer.start()
+    await submissions.job_queue.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    """Release resources on application shutdown."""
+
+    await submissions.job_queue.stop()
+    await write_behind.job_writer.stop()
+    await rollups.rollup_compactor.stop()
+    await instructions.instruction_cache.stop()
+    await labor.labor_rate_store.stop()
+    await providers.shutdown()
+    shutdown_db()
@@ -0,0 +1,41 @@
+"""Aggregate tables maintained alongside job inserts for cheap analytics reads."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class TradeAggregate(SQLModel, table=True):
+    """Running job count and value sums for one trade."""
+
+    trade: str = Field(primary_key=True)
+    job_count: int = 0
+    total_bid_sum: float = 0.0
+    profit_margin_sum: float = 0.0
+    material_total_sum: float = 0.0
+    labor_total_sum: float = 0.0
+    last_timestamp: Optional[datetime] = None
+
+
+class RecentLocation(SQLModel, table=True):
+    """One of the few latest jobs by ``(timestamp, job_id)``; ``slot`` 0 is the newest."""
+
+    slot: int = Field(primary_key=True)
+    job_id: str
+    location: str
+    timestamp: datetime
+
+
+class JobRollup(SQLModel, table=True):
+    """Job count and value sums for one trade within one time bucket."""
+
+    granularity: str = Field(primary_key=True)
+    bucket_start: datetime = Field(primary_key=True)
+    trade: str = Field(primary_key=True)
+    job_count: int = 0
+    total_bid_sum: float = 0.0
+    profit_margin_sum: float = 0.0
+    material_total_sum: float = 0.0
+    labor_total_sum: float = 0.0
@@ -0,0 +1,11 @@
+"""Maintained counters that replace full-table aggregate queries."""
+from __future__ import annotations
+
+from sqlmodel import Field, SQLModel
+
+
+class Counter(SQLModel, table=True):
+    """Named running total updated in the same transaction as the rows it counts."""
+
+    name: str = Field(primary_key=True)
+    value: int = 0
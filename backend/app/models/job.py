@@ -42,6 +42,19 @@ class Job(SQLModel, table=True):
     class Config:
         allow_population_by_field_name = True
 
+    @classmethod
+    def from_payload(cls, payload: dict) -> "Job":
+        """Build a row from a pipeline payload.
+
+        Material line items are kept as plain dictionaries so the JSON column
+        can serialize them; model construction would otherwise coerce them
+        into :class:`MaterialItem` instances.
+        """
+
+        job = cls(**payload)
+        job.materials = [dict(item) for item in payload.get("materials", [])]
+        return job
+
 
 class JobCreate(SQLModel):
     """Payload accepted from the API when creating a job."""
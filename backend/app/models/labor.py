@@ -0,0 +1,31 @@
+"""BLS labor rates shared by every worker process."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class LaborRate(SQLModel, table=True):
+    """Latest mean hourly wage BLS reported for one occupation and area."""
+
+    occupation: str = Field(primary_key=True)
+    area: str = Field(primary_key=True)
+    rate: float
+    fetched_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class LaborRateRefresh(SQLModel, table=True):
+    """Schedule of the shared BLS refresh.
+
+    A process claims a due refresh by setting ``claimed_until``; the others
+    wait for it and read the rates it stores. ``failures`` counts refreshes
+    in a row that loaded nothing, which push ``next_refresh_at`` back
+    exponentially.
+    """
+
+    name: str = Field(primary_key=True)
+    next_refresh_at: datetime = Field(default_factory=datetime.utcnow)
+    failures: int = 0
+    claimed_until: Optional[datetime] = None
@@ -0,0 +1,29 @@
+"""Durable queue of asynchronously submitted jobs."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import JSON, Column, Field, SQLModel
+
+
+class JobSubmission(SQLModel, table=True):
+    """A job accepted by ``POST /jobs?async=true`` and its processing state.
+
+    A worker claims a ``queued`` row by taking its lease (``owner`` and
+    ``lease_expires_at``) and renews it while the job runs. A ``running`` row
+    whose lease has expired belonged to a process that died and may be
+    claimed again.
+    """
+
+    job_id: str = Field(primary_key=True)
+    payload: dict = Field(sa_column=Column(JSON), default_factory=dict)
+    deadline: Optional[float] = None
+    status: str = Field(default="queued", index=True)
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    submitted_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
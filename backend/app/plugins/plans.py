@@ -0,0 +1,165 @@
+"""Pricing plans compiled from trade profiles.
+
+``TRADE_PROFILES`` stay plain dicts so they are easy to edit; when plugins
+are built, each profile is validated and compiled into a :class:`PricingPlan`
+with one :class:`MaterialRule` per material and every default resolved up
+front. A bad profile raises :class:`ValueError` at startup instead of during
+a request, and ``compute_bid`` no longer walks nested dicts per material.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Union
+
+Number = Union[int, float]
+
+METRICS = ("length_ft", "width_ft", "depth_ft", "area_sqft", "linear_ft", "volume_cuft", "volume_cy")
+
+MATERIAL_FIELDS = {"unit", "metric", "multiplier", "base_quantity", "min_quantity", "precision", "round_up"}
+PROFILE_FIELDS = {
+    "default_materials",
+    "default_margin",
+    "default_dimensions",
+    "calculation",
+    "labor_metric",
+    "labor_hours_per_unit",
+    "min_labor_hours",
+    "overhead_rate",
+    "instruction_query",
+    "material_heuristics",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class MaterialRule:
+    """How the quantity of one material is derived from the job metrics."""
+
+    unit: str
+    metric: str
+    multiplier: Number
+    base_quantity: Number
+    min_quantity: Optional[Number]
+    round_up: bool
+    precision: int
+
+    def quantity(self, metrics: Mapping[str, Any]) -> Number:
+        """Return the rounded quantity for ``metrics``, exactly as the profile heuristics define it."""
+
+        metric_value = metrics.get(self.metric)
+        if not metric_value:
+            metric_value = metrics.get("volume_cy") or metrics.get("area_sqft") or 1.0
+
+        quantity = self.base_quantity + metric_value * self.multiplier
+        if self.min_quantity:
+            quantity = max(quantity, self.min_quantity)
+        if self.round_up:
+            quantity = math.ceil(quantity)
+        if self.precision >= 0:
+            quantity = round(quantity, self.precision)
+        if self.precision == 0:
+            quantity = int(quantity)
+        return quantity
+
+
+@dataclass(frozen=True, slots=True)
+class PricingPlan:
+    """Validated, fully defaulted pricing inputs for one trade."""
+
+    trade: str
+    materials: Dict[str, MaterialRule]
+    default_rule: MaterialRule
+    labor_metric: str
+    labor_hours_per_unit: Number
+    min_labor_hours: Number
+    overhead_rate: Number
+    default_margin: Number
+
+    def rule_for(self, material_name: str) -> MaterialRule:
+        return self.materials.get(material_name.lower(), self.default_rule)
+
+    def labor_hours(self, metrics: Mapping[str, Any]) -> Number:
+        metric_value = (
+            metrics.get(self.labor_metric) or metrics.get("area_sqft") or metrics.get("volume_cy") or 1.0
+        )
+        return max(metric_value * self.labor_hours_per_unit, self.min_labor_hours)
+
+
+def _fail(trade: str, message: str) -> ValueError:
+    return ValueError(f"Invalid pricing profile for '{trade}': {message}")
+
+
+def _number(trade: str, where: str, value: Any, minimum: Optional[float] = None) -> Number:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or math.isnan(value):
+        raise _fail(trade, f"{where} must be a number, got {value!r}")
+    if minimum is not None and value < minimum:
+        raise _fail(trade, f"{where} must be at least {minimum}, got {value!r}")
+    return value
+
+
+def _metric(trade: str, where: str, value: Any) -> str:
+    if value not in METRICS:
+        raise _fail(trade, f"{where} must be one of {', '.join(METRICS)}, got {value!r}")
+    return value
+
+
+def _material_rule(trade: str, name: str, heuristics: Any, default_metric: str) -> MaterialRule:
+    if not isinstance(heuristics, Mapping):
+        raise _fail(trade, f"heuristics for '{name}' must be a mapping")
+    unknown = set(heuristics) - MATERIAL_FIELDS
+    if unknown:
+        raise _fail(trade, f"unknown heuristics for '{name}': {', '.join(sorted(unknown))}")
+
+    precision = heuristics.get("precision", 2)
+    if isinstance(precision, bool) or not isinstance(precision, int):
+        raise _fail(trade, f"precision for '{name}' must be an integer, got {precision!r}")
+    min_quantity = heuristics.get("min_quantity")
+    unit = heuristics.get("unit", "unit")
+    if not isinstance(unit, str):
+        raise _fail(trade, f"unit for '{name}' must be a string, got {unit!r}")
+
+    return MaterialRule(
+        unit=unit,
+        metric=_metric(trade, f"metric for '{name}'", heuristics.get("metric", default_metric)),
+        multiplier=_number(trade, f"multiplier for '{name}'", heuristics.get("multiplier", 1.0)),
+        base_quantity=_number(trade, f"base_quantity for '{name}'", heuristics.get("base_quantity", 0.0)),
+        min_quantity=_number(trade, f"min_quantity for '{name}'", min_quantity, 0) if min_quantity else None,
+        round_up=bool(heuristics.get("round_up")),
+        precision=precision,
+    )
+
+
+def compile_plan(trade: str, profile: Mapping[str, Any]) -> PricingPlan:
+    """Validate ``profile`` and compile it into a :class:`PricingPlan`."""
+
+    if not isinstance(profile, Mapping):
+        raise _fail(trade, "profile must be a mapping")
+    unknown = set(profile) - PROFILE_FIELDS
+    if unknown:
+        raise _fail(trade, f"unknown fields: {', '.join(sorted(unknown))}")
+
+    defaults = profile.get("default_materials", [])
+    if not isinstance(defaults, list) or not all(isinstance(name, str) for name in defaults):
+        raise _fail(trade, "default_materials must be a list of strings")
+
+    labor_metric = _metric(trade, "labor_metric", profile.get("labor_metric", "volume_cy"))
+    heuristics = profile.get("material_heuristics", {})
+    if not isinstance(heuristics, Mapping):
+        raise _fail(trade, "material_heuristics must be a mapping")
+
+    margin = _number(trade, "default_margin", profile.get("default_margin", 0.15), 0)
+    if margin > 1:
+        raise _fail(trade, f"default_margin must be at most 1, got {margin!r}")
+
+    return PricingPlan(
+        trade=trade,
+        materials={
+            name: _material_rule(trade, name, rule, labor_metric) for name, rule in heuristics.items()
+        },
+        default_rule=_material_rule(trade, "<default>", {}, labor_metric),
+        labor_metric=labor_metric,
+        labor_hours_per_unit=_number(trade, "labor_hours_per_unit", profile.get("labor_hours_per_unit", 1.0), 0),
+        min_labor_hours=_number(trade, "min_labor_hours", profile.get("min_labor_hours", 2.0), 0),
+        overhead_rate=_number(trade, "overhead_rate", profile.get("overhead_rate", 0.1), 0),
+        default_margin=margin,
+    )
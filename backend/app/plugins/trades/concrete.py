@@ -2,13 +2,14 @@
 from __future__ import annotations
 
 import logging
-import math
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.plugins.base import BaseTradePlugin
-from app.services import geocoding, instructions, labor, materials, weather
+from app.plugins.plans import compile_plan
+from app.services import deadline, geocoding, instructions, labor, materials, weather
+from app.services.stages import Stage, run_stages
 
 logger = logging.getLogger(__name__)
 
@@ -99,6 +100,11 @@ class ConfigurableTradePlugin(BaseTradePlugin):
     def __init__(self, trade_name: str, profile: Dict[str, Any]):
         self.trade_name = trade_name
         self.profile = profile
+        self.plan = compile_plan(trade_name, profile)
+
+    @property
+    def instruction_query(self) -> str:
+        return self.profile.get("instruction_query", f"{self.trade_name} project plan")
 
     @staticmethod
     def _to_float(value: Any, default: float) -> float:
@@ -107,14 +113,20 @@ class ConfigurableTradePlugin(BaseTradePlugin):
         except (TypeError, ValueError):
             return float(default)
 
-    async def normalize_data(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        logger.debug("Normalizing payload for %s: %s", self.trade_name, payload)
+    def dimensions(self, payload: Dict[str, Any]) -> Tuple[float, float, float]:
+        """Return ``(length, width, depth)`` from ``payload`` with profile defaults."""
+
         dimensions = payload.get("dimensions") or {}
         defaults = self.profile.get("default_dimensions", DEFAULT_DIMENSIONS)
 
         length = self._to_float(dimensions.get("length"), defaults.get("length", 0.0))
         width = self._to_float(dimensions.get("width"), defaults.get("width", 0.0))
         depth = self._to_float(dimensions.get("depth"), defaults.get("depth", 0.0))
+        return length, width, depth
+
+    async def normalize_data(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        logger.debug("Normalizing payload for %s: %s", self.trade_name, payload)
+        length, width, depth = self.dimensions(payload)
 
         area_sqft = length * width
         linear_ft = 2 * (length + width)
@@ -157,82 +169,75 @@ class ConfigurableTradePlugin(BaseTradePlugin):
 
     async def fetch_public_data(self, normalized_payload: Dict[str, Any]) -> Dict[str, Any]:
         location = normalized_payload.get("location")
-        geo = await geocoding.geocode_location(location) if location else None
-        normalized_payload["geocode"] = geo
-        normalized_payload["location_details"] = geo
+        material_names = normalized_payload.get("materials", [])
 
-        material_costs = await materials.resolve_material_costs(normalized_payload.get("materials", []))
-        normalized_payload["material_costs"] = material_costs
+        async def geocode(_: Dict[str, Any]) -> Any:
+            return await geocoding.geocode_location(location) if location else None
 
-        state = geo.get("state") if geo else None
-        labor_rate = await labor.resolve_trade_labor_rate(self.trade_name, state)
-        normalized_payload["labor_rate"] = labor_rate
+        async def material_costs(_: Dict[str, Any]) -> Dict[str, float]:
+            return await materials.resolve_material_costs(material_names)
 
-        if geo:
+        async def labor_rate(inputs: Dict[str, Any]) -> float:
+            geo = inputs["geocode"]
+            return await labor.resolve_trade_labor_rate(self.trade_name, geo.get("state") if geo else None)
+
+        async def weather_modifier(inputs: Dict[str, Any]) -> float:
+            geo = inputs["geocode"]
+            if not geo:
+                return 0.0
             modifier = await weather.fetch_weather_modifier(geo.get("lat"), geo.get("lon"))
-            normalized_payload["weather_modifier"] = modifier or 0.0
-        else:
-            normalized_payload["weather_modifier"] = 0.0
+            return modifier or 0.0
+
+        # Only labor and weather depend on the geocode; materials resolve alongside it.
+        results = await run_stages(
+            [
+                Stage("geocode", geocode, fallback=None),
+                Stage("material_costs", material_costs, fallback=materials.baseline_material_costs(material_names)),
+                Stage("labor_rate", labor_rate, requires=("geocode",), fallback=labor.fallback_labor_rate(self.trade_name)),
+                Stage("weather_modifier", weather_modifier, requires=("geocode",), fallback=0.0),
+            ]
+        )
+
+        normalized_payload["geocode"] = results["geocode"]
+        normalized_payload["location_details"] = results["geocode"]
+        normalized_payload["material_costs"] = results["material_costs"]
+        normalized_payload["labor_rate"] = results["labor_rate"]
+        normalized_payload["weather_modifier"] = results["weather_modifier"]
 
         return normalized_payload
 
     async def compute_bid(self, enriched_payload: Dict[str, Any]) -> Dict[str, Any]:
-        material_items: List[Dict[str, Any]] = []
+        plan = self.plan
         material_costs = enriched_payload.get("material_costs", {})
         metrics = enriched_payload.get("metrics", {})
-        profile_heuristics = self.profile.get("material_heuristics", {})
 
+        material_items: List[Dict[str, Any]] = []
         for material_name, unit_cost in material_costs.items():
-            key = material_name.lower()
-            heuristics = profile_heuristics.get(key, {})
-            metric_key = heuristics.get("metric", self.profile.get("labor_metric", "volume_cy"))
-            metric_value = metrics.get(metric_key)
-            if not metric_value:
-                metric_value = metrics.get("volume_cy") or metrics.get("area_sqft") or 1.0
-
-            quantity = heuristics.get("base_quantity", 0.0) + metric_value * heuristics.get("multiplier", 1.0)
-            if heuristics.get("min_quantity"):
-                quantity = max(quantity, heuristics["min_quantity"])
-
-            if heuristics.get("round_up"):
-                quantity = math.ceil(quantity)
-
-            precision = heuristics.get("precision", 2)
-            quantity = round(quantity, precision) if precision >= 0 else quantity
-            if precision == 0:
-                quantity = int(quantity)
-
-            unit = heuristics.get("unit", "unit")
-            total_cost = quantity * unit_cost
-
+            rule = plan.rule_for(material_name)
+            quantity = rule.quantity(metrics)
             material_items.append(
                 {
                     "name": material_name,
                     "quantity": quantity,
-                    "unit": unit,
+                    "unit": rule.unit,
                     "unit_cost": round(unit_cost, 2),
-                    "total_cost": round(total_cost, 2),
+                    "total_cost": round(quantity * unit_cost, 2),
                 }
             )
 
         material_total = sum(item["total_cost"] for item in material_items)
 
-        labor_metric_key = self.profile.get("labor_metric", "volume_cy")
-        labor_metric_value = metrics.get(labor_metric_key) or metrics.get("area_sqft") or metrics.get("volume_cy") or 1.0
-        labor_hours = labor_metric_value * self.profile.get("labor_hours_per_unit", 1.0)
-        labor_hours = max(labor_hours, self.profile.get("min_labor_hours", 2.0))
-
+        labor_hours = plan.labor_hours(metrics)
         labor_rate = enriched_payload.get("labor_rate", 25.0)
         labor_total = labor_hours * labor_rate
 
-        overhead_rate = self.profile.get("overhead_rate", 0.1)
-        overhead = (material_total + labor_total) * overhead_rate
+        overhead = (material_total + labor_total) * plan.overhead_rate
 
         weather_modifier = float(enriched_payload.get("weather_modifier", 0.0))
         subtotal = material_total + labor_total + overhead
         weather_adjusted_subtotal = subtotal * (1 + weather_modifier)
 
-        profit_margin = float(enriched_payload.get("margin", self.profile.get("default_margin", 0.15)))
+        profit_margin = float(enriched_payload.get("margin", plan.default_margin))
         profit_amount = weather_adjusted_subtotal * profit_margin
         total_bid = weather_adjusted_subtotal + profit_amount
 
@@ -275,9 +280,9 @@ class ConfigurableTradePlugin(BaseTradePlugin):
         return bid
 
     async def generate_instructions(self, bid_payload: Dict[str, Any]) -> List[str]:
-        query = self.profile.get("instruction_query", f"{self.trade_name} project plan")
-        steps = await instructions.fetch_wikihow_steps(query)
+        steps = instructions.instruction_cache.get(self.instruction_query)
         if not steps:
+            deadline.degrade("steps")
             steps = instructions.fallback_steps(self.trade_name)
         return steps
 
@@ -286,12 +291,16 @@ class ConfigurableTradePlugin(BaseTradePlugin):
         return bid_payload
 
 
-def build_plugins() -> Dict[str, ConfigurableTradePlugin]:
-    """Create plugin instances for every configured trade."""
+def build_plugins(profiles: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, ConfigurableTradePlugin]:
+    """Create plugin instances for every configured trade.
+
+    Each profile is compiled into its pricing plan here, so an invalid profile
+    raises ``ValueError`` at import time rather than on the first request.
+    """
 
     return {
         trade: ConfigurableTradePlugin(trade, profile)
-        for trade, profile in TRADE_PROFILES.items()
+        for trade, profile in (TRADE_PROFILES if profiles is None else profiles).items()
     }
 
 
@@ -2,9 +2,9 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, confloat
 
 
 class MaterialItem(BaseModel):
@@ -95,9 +95,15 @@ class JobCreateRequest(BaseModel):
 
 
 class JobResponse(JobBase):
-    """Response schema returned from job creation."""
+    """Response schema returned from job creation.
+
+    ``degraded`` names the inputs that fell back to cached or baseline data
+    because a provider failed or the request deadline ran out; it is not
+    stored, so fetched jobs report it empty.
+    """
 
     job_id: str
+    degraded: List[str] = []
 
 
 class JobSummary(BaseModel):
@@ -120,12 +126,17 @@ class JobSummary(BaseModel):
 
 
 class JobListResponse(BaseModel):
-    """Paginated list of job summaries."""
+    """Paginated list of job summaries.
+
+    Pass ``next_cursor`` back as ``cursor`` to fetch the following page; it is
+    ``None`` on the last page.
+    """
 
     items: List[JobSummary]
-    total: int
+    total: Optional[int] = None
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
 
 
 class TradeCount(BaseModel):
@@ -146,3 +157,82 @@ class AnalyticsSummary(BaseModel):
     top_trades: List[TradeCount]
     recent_locations: List[str]
     last_updated: datetime
+
+
+class TimeseriesPoint(BaseModel):
+    """Rolled-up job figures for one trade in one time bucket."""
+
+    bucket_start: datetime
+    trade: str
+    job_count: int
+    total_bid: float
+    average_bid: float
+    average_profit_margin: float
+    material_share: float
+    labor_share: float
+
+
+class AnalyticsTimeseries(BaseModel):
+    """Trend data read from the hourly, daily or weekly rollups."""
+
+    granularity: str
+    points: List[TimeseriesPoint]
+
+
+class SubmissionAccepted(BaseModel):
+    """Acknowledgement of a job submitted with ``POST /jobs?async=true``."""
+
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+
+class SubmissionStatus(BaseModel):
+    """Processing state of a submitted job.
+
+    ``status`` is queued, running, completed or failed; ``stage`` names the
+    pipeline stage of a running job. Completed jobs are read from
+    ``GET /jobs/{job_id}``.
+    """
+
+    job_id: str
+    status: str
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    submitted_at: datetime
+    updated_at: datetime
+
+
+class QuoteSweepRequest(JobCreateRequest):
+    """A job plus the dimension and margin values to price every combination of."""
+
+    lengths: Optional[List[confloat(ge=0)]] = None
+    widths: Optional[List[confloat(ge=0)]] = None
+    depths: Optional[List[confloat(ge=0)]] = None
+    margins: Optional[List[confloat(ge=0, le=1)]] = None
+
+
+class QuoteSweepResponse(BaseModel):
+    """Totals for each variant of a quote sweep, one row per combination."""
+
+    trade: str
+    location: str
+    labor_rate: float
+    weather_modifier: float
+    material_costs: Dict[str, float]
+    variants: int
+    columns: List[str]
+    rows: List[List[float]]
+
+
+class QuoteResponse(JobBase):
+    """A bid computed from cached data only; nothing is stored.
+
+    ``stale`` and ``defaulted`` name the inputs that came from an expired
+    cache entry or from a baseline/fallback value.
+    """
+
+    stale: List[str] = []
+    defaulted: List[str] = []
@@ -1,5 +1,16 @@
 """Service layer exports."""
-from . import analytics, geocoding, instructions, labor, materials, weather
+from . import (
+    analytics,
+    geocoding,
+    instructions,
+    labor,
+    materials,
+    providers,
+    rollups,
+    submissions,
+    weather,
+    write_behind,
+)
 
 __all__ = [
     "analytics",
@@ -7,5 +18,9 @@ __all__ = [
     "instructions",
     "labor",
     "materials",
+    "providers",
+    "rollups",
+    "submissions",
     "weather",
+    "write_behind",
 ]
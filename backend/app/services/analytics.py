@@ -1,14 +1,30 @@
-"""Analytics helpers for summarising job performance."""
+"""Analytics helpers for summarising job performance.
+
+The summary endpoint reads :class:`TradeAggregate` and :class:`RecentLocation`
+rows that :func:`record_jobs` updates in the same transaction as every job
+insert. :func:`scan_summary` computes the same figures from the ``job`` table
+and backs the ``rebuild`` command used for consistency checks::
+
+    python -m app.services.analytics check
+    python -m app.services.analytics rebuild
+"""
 from __future__ import annotations
 
+import argparse
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Sequence
 
-from sqlalchemy import func
+from sqlalchemy import case, delete, func, update
 from sqlmodel import Session, select
 
+from app.core.timestamps import naive_utc
+from app.models.analytics import RecentLocation, TradeAggregate
 from app.models.job import Job
 
+RECENT_LOCATION_SLOTS = 5
+TOP_TRADES = 5
+
 
 def _tuple_value(item):
     """Return the scalar value from a possible tuple result."""
@@ -18,23 +34,164 @@ def _tuple_value(item):
     return item
 
 
+def _empty_summary() -> Dict[str, object]:
+    return {
+        "total_jobs": 0,
+        "average_bid": 0.0,
+        "average_profit_margin": 0.0,
+        "average_material_cost": 0.0,
+        "average_labor_cost": 0.0,
+        "top_trades": [],
+        "recent_locations": [],
+        "last_updated": datetime.utcnow(),
+    }
+
+
+def record_jobs(session: Session, jobs: Sequence[Job]) -> None:
+    """Fold newly inserted ``jobs`` into the aggregates within the caller's transaction.
+
+    The recent locations are the latest jobs by ``(timestamp, job_id)``, the
+    order :func:`scan_summary` uses, so jobs committed out of timestamp order
+    (write-behind batches, parallel workers, async submissions) land in the
+    right place or not at all.
+    """
+
+    by_trade: Dict[str, List[Job]] = defaultdict(list)
+    for job in jobs:
+        by_trade[job.trade].append(job)
+
+    for trade, trade_jobs in by_trade.items():
+        values = {
+            "job_count": len(trade_jobs),
+            "total_bid_sum": sum(job.total_bid for job in trade_jobs),
+            "profit_margin_sum": sum(job.profit_margin for job in trade_jobs),
+            "material_total_sum": sum(job.material_total for job in trade_jobs),
+            "labor_total_sum": sum(job.labor_total for job in trade_jobs),
+        }
+        latest = max(naive_utc(job.timestamp) for job in trade_jobs)
+        result = session.execute(
+            update(TradeAggregate)
+            .where(TradeAggregate.trade == trade)
+            .values(
+                last_timestamp=case(
+                    (TradeAggregate.last_timestamp > latest, TradeAggregate.last_timestamp), else_=latest
+                ),
+                **{column: getattr(TradeAggregate, column) + amount for column, amount in values.items()},
+            )
+        )
+        if result.rowcount == 0:
+            session.add(TradeAggregate(trade=trade, last_timestamp=latest, **values))
+
+    current = [
+        (row.timestamp, row.job_id, row.location)
+        for row in session.exec(select(RecentLocation).order_by(RecentLocation.slot)).all()
+    ]
+    # New jobs may carry an aware timestamp; stored rows read back naive UTC.
+    added = ((naive_utc(job.timestamp), job.job_id, job.location) for job in jobs)
+    ranked = sorted([*current, *added], reverse=True)
+    ranked = ranked[:RECENT_LOCATION_SLOTS]
+    if ranked == current:
+        return
+    for slot, (timestamp, job_id, location) in enumerate(ranked):
+        session.merge(RecentLocation(slot=slot, job_id=job_id, location=location, timestamp=timestamp))
+
+
 def compute_summary(session: Session) -> Dict[str, object]:
-    """Compute aggregate analytics for all stored jobs."""
+    """Return aggregate analytics from the maintained aggregate tables."""
+
+    aggregates = session.exec(select(TradeAggregate)).all()
+    total_jobs = sum(aggregate.job_count for aggregate in aggregates)
+    if total_jobs == 0:
+        return _empty_summary()
+
+    def average(column: str) -> float:
+        return sum(getattr(aggregate, column) for aggregate in aggregates) / total_jobs
+
+    ranked = sorted(aggregates, key=lambda aggregate: (-aggregate.job_count, aggregate.trade))
+    recent_rows = session.exec(
+        select(RecentLocation.location)
+        .order_by(RecentLocation.timestamp.desc(), RecentLocation.job_id.desc())
+        .limit(RECENT_LOCATION_SLOTS)
+    ).all()
+    timestamps = [aggregate.last_timestamp for aggregate in aggregates if aggregate.last_timestamp]
+
+    return {
+        "total_jobs": total_jobs,
+        "average_bid": round(average("total_bid_sum"), 2),
+        "average_profit_margin": round(average("profit_margin_sum"), 4),
+        "average_material_cost": round(average("material_total_sum"), 2),
+        "average_labor_cost": round(average("labor_total_sum"), 2),
+        "top_trades": [
+            {"trade": aggregate.trade, "count": aggregate.job_count}
+            for aggregate in ranked[:TOP_TRADES]
+            if aggregate.job_count
+        ],
+        "recent_locations": [_tuple_value(row) for row in recent_rows if _tuple_value(row)],
+        "last_updated": max(timestamps) if timestamps else datetime.utcnow(),
+    }
+
+
+def rebuild_aggregates(session: Session) -> None:
+    """Recompute every aggregate row from the ``job`` table (without committing)."""
+
+    session.execute(delete(TradeAggregate))
+    session.execute(delete(RecentLocation))
+
+    rows = session.exec(
+        select(
+            Job.trade,
+            func.count(),
+            func.sum(Job.total_bid),
+            func.sum(Job.profit_margin),
+            func.sum(Job.material_total),
+            func.sum(Job.labor_total),
+            func.max(Job.timestamp),
+        ).group_by(Job.trade)
+    ).all()
+    for trade, count, bid_sum, margin_sum, material_sum, labor_sum, latest in rows:
+        session.add(
+            TradeAggregate(
+                trade=trade,
+                job_count=int(count),
+                total_bid_sum=float(bid_sum or 0.0),
+                profit_margin_sum=float(margin_sum or 0.0),
+                material_total_sum=float(material_sum or 0.0),
+                labor_total_sum=float(labor_sum or 0.0),
+                last_timestamp=latest,
+            )
+        )
+
+    recent = session.exec(
+        select(Job.job_id, Job.location, Job.timestamp)
+        .order_by(Job.timestamp.desc(), Job.job_id.desc())
+        .limit(RECENT_LOCATION_SLOTS)
+    ).all()
+    for slot, (job_id, location, timestamp) in enumerate(recent):
+        session.add(RecentLocation(slot=slot, job_id=job_id, location=location, timestamp=timestamp))
+
+
+def summary_drift(session: Session) -> Dict[str, tuple]:
+    """Return ``{field: (maintained, scanned)}`` for every field that disagrees."""
+
+    maintained = compute_summary(session)
+    scanned = scan_summary(session)
+    drift = {}
+    for key in maintained:
+        if key == "last_updated" and not maintained["total_jobs"]:
+            continue
+        if maintained[key] != scanned[key]:
+            drift[key] = (maintained[key], scanned[key])
+    return drift
+
+
+def scan_summary(session: Session) -> Dict[str, object]:
+    """Compute aggregate analytics by scanning every stored job."""
 
     total_result = session.exec(select(func.count()).select_from(Job)).one()
     total_jobs = int(_tuple_value(total_result))
 
     if total_jobs == 0:
-        return {
-            "total_jobs": 0,
-            "average_bid": 0.0,
-            "average_profit_margin": 0.0,
-            "average_material_cost": 0.0,
-            "average_labor_cost": 0.0,
-            "top_trades": [],
-            "recent_locations": [],
-            "last_updated": datetime.utcnow(),
-        }
+        return _empty_summary()
 
     averages_row = session.exec(
         select(
@@ -50,8 +207,8 @@ def compute_summary(session: Session) -> Dict[str, object]:
     top_trades_rows: List[tuple] = session.exec(
         select(Job.trade, func.count())
         .group_by(Job.trade)
-        .order_by(func.count().desc())
-        .limit(5)
+        .order_by(func.count().desc(), Job.trade)
+        .limit(TOP_TRADES)
     ).all()
     top_trades = [
         {"trade": trade, "count": int(_tuple_value(count))}
@@ -60,8 +217,8 @@ def compute_summary(session: Session) -> Dict[str, object]:
 
     recent_locations_rows = session.exec(
         select(Job.location)
-        .order_by(Job.timestamp.desc())
-        .limit(5)
+        .order_by(Job.timestamp.desc(), Job.job_id.desc())
+        .limit(RECENT_LOCATION_SLOTS)
     ).all()
     recent_locations = [
         _tuple_value(row) for row in recent_locations_rows if _tuple_value(row)
@@ -84,3 +241,27 @@ def compute_summary(session: Session) -> Dict[str, object]:
         "recent_locations": recent_locations,
         "last_updated": last_updated,
     }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain Bidder analytics aggregates.")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    args = parser.parse_args()
+
+    from app.db.session import get_session, init_db
+
+    init_db()
+    with get_session() as session:
+        drift = summary_drift(session)
+        for key, (maintained, scanned) in drift.items():
+            print(f"{key}: maintained={maintained!r} scanned={scanned!r}")
+        if args.command == "rebuild":
+            rebuild_aggregates(session)
+            session.commit()
+            print("Aggregates rebuilt from the job table.")
+        elif not drift:
+            print("Aggregates are consistent with the job table.")
+
+
+if __name__ == "__main__":
+    main()
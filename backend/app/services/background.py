@@ -0,0 +1,77 @@
+"""Background refresh loops for in-memory reference data."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(failures: int, base: float, cap: float) -> float:
+    """Return ``base`` doubled for every failure after the first, capped at ``cap``."""
+
+    return min(base * 2 ** min(max(failures - 1, 0), 32), cap)
+
+
+class PeriodicRefresher:
+    """Run ``refresh`` immediately and then on a fixed schedule.
+
+    ``refresh`` returns whether it succeeded; failures are retried after the
+    shorter ``retry_interval`` instead of waiting a full ``interval``. With a
+    ``max_retry_interval`` the retry delay doubles on each consecutive
+    failure up to that bound.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        refresh: Callable[[], Awaitable[bool]],
+        interval: float,
+        retry_interval: Optional[float] = None,
+        max_retry_interval: Optional[float] = None,
+    ):
+        self.name = name
+        self.refresh = refresh
+        self.interval = interval
+        self.retry_interval = retry_interval if retry_interval is not None else interval
+        self.max_retry_interval = max_retry_interval if max_retry_interval is not None else self.retry_interval
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Schedule the refresh loop on the running event loop."""
+
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name=f"refresh:{self.name}")
+
+    async def stop(self) -> None:
+        """Cancel the refresh loop and wait for it to exit."""
+
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                succeeded = await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Background refresh '%s' failed", self.name)
+                succeeded = False
+
+            self.failures = 0 if succeeded else self.failures + 1
+            delay = self.interval if succeeded else backoff_delay(self.failures, self.retry_interval, self.max_retry_interval)
+            await asyncio.sleep(delay)
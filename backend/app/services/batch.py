@@ -0,0 +1,116 @@
+"""Concurrent batch execution of the job pipeline."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import get_settings
+from app.db.session import run_db
+from app.services.persistence import save_jobs
+from app.services.pipeline import build_job
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+BatchItem = Tuple[int, Any]
+
+_DONE = object()
+
+
+def _error(index: Optional[int], exc: BaseException) -> Dict[str, Any]:
+    message = str(exc) or exc.__class__.__name__
+    return {"index": index, "status": "error", "error": message}
+
+
+async def run_batch(
+    items: AsyncIterable[BatchItem],
+    concurrency: Optional[int] = None,
+    flush_size: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run the pipeline for every ``(index, payload)`` item and yield outcomes as they finish.
+
+    A payload that is an exception (for example a line that failed validation)
+    is reported as an error without running. Up to ``concurrency`` pipelines
+    run at once; completed jobs are inserted together in one transaction per
+    flush, at most ``flush_size`` rows each, before their results are yielded.
+    Enrichment lookups are shared across the batch through the service
+    caches. Each result is ``{"index", "status", "job"}`` or
+    ``{"index", "status", "error"}``.
+    """
+
+    concurrency = concurrency or settings.batch_concurrency
+    flush_size = flush_size or settings.batch_flush_size
+    pending: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=concurrency * 2)
+    finished: "asyncio.Queue[Any]" = asyncio.Queue()
+
+    async def produce() -> None:
+        try:
+            async for item in items:
+                await pending.put(item)
+        except Exception as exc:
+            logger.warning("Batch input aborted: %s", exc)
+            await finished.put(_error(None, exc))
+        finally:
+            for _ in range(concurrency):
+                await pending.put(_DONE)
+
+    async def work() -> None:
+        while True:
+            item = await pending.get()
+            if item is _DONE:
+                await finished.put(_DONE)
+                return
+
+            index, payload = item
+            if isinstance(payload, Exception):
+                await finished.put(_error(index, payload))
+                continue
+
+            try:
+                job = await asyncio.wait_for(build_job(payload), settings.batch_item_timeout)
+            except asyncio.TimeoutError:
+                await finished.put(_error(index, TimeoutError("Timed out generating bid")))
+            except ValueError as exc:
+                await finished.put(_error(index, exc))
+            except Exception as exc:
+                logger.exception("Batch item %s failed", index)
+                await finished.put(_error(index, exc))
+            else:
+                await finished.put({"index": index, "status": "created", "job": job})
+
+    tasks = [asyncio.ensure_future(produce())]
+    tasks.extend(asyncio.ensure_future(work()) for _ in range(concurrency))
+    running_workers = concurrency
+
+    try:
+        while running_workers:
+            outcomes: List[Dict[str, Any]] = []
+            item = await finished.get()
+            while True:
+                if item is _DONE:
+                    running_workers -= 1
+                else:
+                    outcomes.append(item)
+                if len(outcomes) >= flush_size or finished.empty():
+                    break
+                item = finished.get_nowait()
+
+            created = [outcome for outcome in outcomes if outcome["status"] == "created"]
+            if created:
+                try:
+                    await run_db(save_jobs, [outcome["job"] for outcome in created])
+                except SQLAlchemyError as exc:
+                    logger.exception("Failed to store %d batch jobs", len(created))
+                    for outcome in created:
+                        outcome.update(_error(outcome["index"], exc))
+                        outcome.pop("job")
+
+            for outcome in outcomes:
+                yield outcome
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,197 @@
+"""In-process caching primitives shared by the service layer."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from app.services import deadline
+from app.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+MISSING: Any = object()
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries expire after a time-to-live.
+
+    ``None`` is a valid cached value, so lookups signal a miss with
+    :data:`MISSING` unless another default is given.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Return the live value for ``key`` or ``default``."""
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` for ``ttl`` seconds, evicting the oldest entry when full."""
+
+        self._entries[key] = (value, self.clock() + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[1] > self.clock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _SWREntry:
+    __slots__ = ("value", "fresh_until", "expires_at")
+
+    def __init__(self, value: Any, fresh_until: float, expires_at: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+
+
+class StaleWhileRevalidateCache:
+    """LRU cache that serves stale values while refreshing them in the background.
+
+    Entries are fresh for ``fresh_ttl`` seconds and may then be served stale
+    for up to ``max_stale`` more seconds; a stale read schedules one
+    background reload through ``loader``. Misses await ``loader`` directly.
+    ``loader`` returns ``None`` when no value is available, which is never
+    cached so callers can apply their own fallback.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Hashable], Awaitable[Any]],
+        maxsize: int,
+        fresh_ttl: float,
+        max_stale: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.loader = loader
+        self.maxsize = maxsize
+        self.fresh_ttl = fresh_ttl
+        self.max_stale = max_stale
+        self.clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.load_failures = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, _SWREntry]" = OrderedDict()
+        self._flight = SingleFlight()
+        self._background: Set["asyncio.Task[Any]"] = set()
+
+    def peek(self, key: Hashable) -> Tuple[Any, str]:
+        """Return ``(value, state)`` without loading; state is fresh, stale or missing."""
+
+        entry = self._entries.get(key)
+        now = self.clock()
+        if entry is None or entry.expires_at <= now:
+            return None, "missing"
+        return entry.value, "fresh" if now < entry.fresh_until else "stale"
+
+    async def get(self, key: Hashable) -> Any:
+        """Return the cached value for ``key``, loading it on a miss."""
+
+        value, state = self.peek(key)
+        if state == "fresh":
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+        if state == "stale":
+            self.stale_hits += 1
+            self._entries.move_to_end(key)
+            self._load_in_background(key)
+            return value
+
+        self.misses += 1
+        return await self._flight.do(key, lambda: self._load(key))
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = self.clock()
+        self._entries[key] = _SWREntry(value, now + self.fresh_ttl, now + self.fresh_ttl + self.max_stale)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "load_failures": self.load_failures,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load_in_background(self, key: Hashable) -> None:
+        if self._flight.in_flight(key):
+            return
+        self.refreshes += 1
+        # The refresh serves later requests, so it must not inherit this request's budget.
+        task = asyncio.get_running_loop().create_task(
+            self._flight.do(key, lambda: self._load(key)), context=deadline.detached()
+        )
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _load(self, key: Hashable) -> Any:
+        try:
+            value = await self.loader(key)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Cache loader failed for %r", key)
+            value = None
+
+        if value is None:
+            self.load_failures += 1
+            return None
+
+        self.set(key, value)
+        return value
@@ -0,0 +1,85 @@
+"""Per-request latency budget carried through the pipeline in a context variable.
+
+:func:`process_job` opens a :class:`Budget`; everything awaited beneath it,
+including tasks started by :func:`run_stages`, sees the same budget.
+Provider calls shorten their timeouts to what is left of it, optional stages
+stop waiting when it runs out, and whichever input then falls back to cached
+or baseline data is recorded with :func:`degrade` so the response can say so.
+"""
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+# Stages may run this long past the budget, so the finer-grained fallbacks
+# inside them (per provider call, per material) fire first and keep whatever
+# was already resolved. It is also enough to answer from memory once the
+# budget is spent, and far too short for a network round trip.
+STAGE_GRACE = 0.05
+
+
+@dataclass
+class Budget:
+    """Deadline of one request and the inputs that fell back to cached or baseline data."""
+
+    expires_at: Optional[float] = None
+    degraded: List[str] = field(default_factory=list)
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def degrade(self, name: str) -> None:
+        if name not in self.degraded:
+            self.degraded.append(name)
+
+
+_current: contextvars.ContextVar[Optional[Budget]] = contextvars.ContextVar("request_budget", default=None)
+
+
+@contextmanager
+def budget(seconds: Optional[float]) -> Iterator[Budget]:
+    """Run the block under a budget of ``seconds`` (``None`` only tracks degraded inputs)."""
+
+    token = _current.set(Budget(None if seconds is None else time.monotonic() + seconds))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget, or ``None`` without one."""
+
+    current = _current.get()
+    return current.remaining() if current is not None else None
+
+
+def degrade(name: str) -> None:
+    """Record that input ``name`` of the current request used fallback data."""
+
+    current = _current.get()
+    if current is not None:
+        current.degrade(name)
+
+
+def stage_timeout(timeout: Optional[float]) -> Optional[float]:
+    """Combine a stage's own ``timeout`` with the remaining budget."""
+
+    left = remaining()
+    if left is None:
+        return timeout
+    left = max(left, 0.0) + STAGE_GRACE
+    return left if timeout is None else min(timeout, left)
+
+
+def detached() -> contextvars.Context:
+    """Context for background work that must outlive the request that started it."""
+
+    context = contextvars.copy_context()
+    context.run(_current.set, None)
+    return context
@@ -1,19 +1,177 @@
 """Geocoding utilities relying on public providers."""
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
-from typing import Dict, Optional
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
 
+from app.core import metrics
 from app.core.config import get_settings
+from app.services import deadline, providers
+from app.services.cache import MISSING, TTLCache
+from app.services.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-async def geocode_location(location: str) -> Optional[Dict[str, float]]:
-    """Resolve a free-form location string into coordinates using Nominatim."""
+def normalize_location(location: str) -> str:
+    """Return the cache key for a free-form location string."""
+
+    key = re.sub(r"\s+", " ", location.strip().lower())
+    return re.sub(r"\s*,\s*", ", ", key).strip(" ,")
+
+
+class GeocodeCache:
+    """Two-tier geocode cache: an in-process LRU over a shared SQLite table.
+
+    The SQLite file is shared by every worker process and survives restarts.
+    ``None`` entries record locations Nominatim had no results for and expire
+    after the shorter ``negative_ttl``.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float, path: Optional[Path]):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path = path
+        self.memory = TTLCache(maxsize, ttl)
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(self.path), timeout=5)
+        if not self._schema_ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS geocode_cache ("
+                "key TEXT PRIMARY KEY, payload TEXT, expires_at REAL NOT NULL)"
+            )
+            connection.execute("DELETE FROM geocode_cache WHERE expires_at <= ?", (time.time(),))
+            connection.commit()
+            self._schema_ready = True
+        return connection
+
+    def _load(self, key: str) -> Tuple[Any, float]:
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT payload, expires_at FROM geocode_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return MISSING, 0.0
+        payload, expires_at = row
+        return (json.loads(payload) if payload is not None else None), expires_at - time.time()
+
+    def _save(self, key: str, value: Any, ttl: float) -> None:
+        connection = self._connect()
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO geocode_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value) if value is not None else None, time.time() + ttl),
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+    async def get(self, key: str) -> Any:
+        """Return the cached geocode for ``key`` or :data:`MISSING`."""
+
+        value = self.memory.get(key)
+        if value is not MISSING or self.path is None:
+            return value
+
+        try:
+            value, remaining = await asyncio.to_thread(self._load, key)
+        except sqlite3.Error as exc:
+            logger.warning("Geocode cache read failed for '%s': %s", key, exc)
+            return MISSING
+
+        if value is not MISSING:
+            self.memory.set(key, value, ttl=remaining)
+        return value
+
+    async def set(self, key: str, value: Optional[Dict[str, Any]]) -> None:
+        """Cache ``value`` for ``key``; ``None`` is cached as a negative result."""
+
+        ttl = self.ttl if value is not None else self.negative_ttl
+        self.memory.set(key, value, ttl=ttl)
+        if self.path is None:
+            return
+
+        try:
+            await asyncio.to_thread(self._save, key, value, ttl)
+        except sqlite3.Error as exc:
+            logger.warning("Geocode cache write failed for '%s': %s", key, exc)
+
+
+geocode_cache = GeocodeCache(
+    maxsize=settings.geocode_cache_size,
+    ttl=settings.geocode_cache_ttl,
+    negative_ttl=settings.geocode_negative_ttl,
+    path=settings.geocode_cache_path,
+)
+geocode_flight = SingleFlight(share_errors=settings.singleflight_share_errors)
+metrics.register_cache("geocode", lambda: geocode_cache.memory)
+
+
+def cached_geocode(location: str) -> Any:
+    """Return the geocode for ``location`` from the in-memory cache, or :data:`MISSING`.
+
+    Never touches the network or the on-disk cache.
+    """
+
+    key = normalize_location(location)
+    if not key:
+        return None
+    return geocode_cache.memory.get(key)
+
+
+async def geocode_location(
+    location: str, client: Optional[httpx.AsyncClient] = None
+) -> Optional[Dict[str, float]]:
+    """Resolve a free-form location string into coordinates.
+
+    Results are served from :data:`geocode_cache` when possible; only cache
+    misses reach Nominatim, and concurrent misses for the same location share
+    one request. Transport errors are not cached; they, and lookups still
+    pending when the request budget runs out, return ``None`` and mark the
+    geocode as degraded on the request budget.
+    """
+
+    key = normalize_location(location)
+    if not key:
+        return None
+
+    cached = await geocode_cache.get(key)
+    if cached is not MISSING:
+        return dict(cached) if cached is not None else None
+
+    result = await geocode_flight.do(key, lambda: _geocode_uncached(key, location, client), default=MISSING)
+    if result is MISSING:
+        deadline.degrade("geocode")
+        return None
+    return dict(result) if result is not None else None
+
+
+async def _geocode_uncached(key: str, location: str, client: Optional[httpx.AsyncClient]) -> Any:
+    result = await _search_nominatim(location, client)
+    if result is MISSING:
+        return MISSING
+    await geocode_cache.set(key, result)
+    return result
+
+
+async def _search_nominatim(location: str, client: Optional[httpx.AsyncClient]) -> Any:
+    """Query Nominatim, returning ``None`` for no results and :data:`MISSING` on errors."""
 
     url = "https://nominatim.openstreetmap.org/search"
     params = {
@@ -22,16 +180,15 @@ async def geocode_location(location: str) -> Optional[Dict[str, float]]:
         "limit": 1,
         "addressdetails": 1,
     }
-    headers = {"User-Agent": "Bidder/1.0 (https://example.com)"}
+    client = client or providers.get_client(providers.NOMINATIM)
 
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
     except httpx.HTTPError as exc:
         logger.warning("Geocoding lookup failed for '%s': %s", location, exc)
-        return None
+        return MISSING
 
     if not data:
         logger.warning("No geocoding results for location '%s'", location)
@@ -48,7 +205,9 @@ async def geocode_location(location: str) -> Optional[Dict[str, float]]:
     }
 
 
-async def geoapify_cost_index(postal_code: Optional[str]) -> Optional[float]:
+async def geoapify_cost_index(
+    postal_code: Optional[str], client: Optional[httpx.AsyncClient] = None
+) -> Optional[float]:
     """Retrieve a location cost index via Geoapify if configured."""
 
     if not postal_code or not settings.geoapify_key:
@@ -57,10 +216,10 @@ async def geoapify_cost_index(postal_code: Optional[str]) -> Optional[float]:
     url = "https://api.geoapify.com/v1/geocode/search"
     params = {"text": postal_code, "apiKey": settings.geoapify_key}
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+    client = client or providers.get_client(providers.GEOAPIFY)
+    response = await client.get(url, params=params)
+    response.raise_for_status()
+    data = response.json()
 
     features = data.get("features", [])
     if not features:
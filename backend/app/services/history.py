@@ -0,0 +1,130 @@
+"""Job history listing with keyset pagination."""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from sqlmodel import Session, select
+
+from app.models.counter import Counter
+from app.models.job import Job
+
+JOB_TOTAL = "jobs"
+
+SUMMARY_COLUMNS = (
+    "job_id",
+    "trade",
+    "location",
+    "total_bid",
+    "profit_margin",
+    "material_total",
+    "labor_total",
+    "timestamp",
+    "cost_breakdown",
+    "metrics",
+)
+
+
+def encode_cursor(timestamp: datetime, job_id: str) -> str:
+    """Return an opaque cursor pointing just past ``(timestamp, job_id)``."""
+
+    raw = json.dumps([timestamp.isoformat(), job_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by :func:`encode_cursor`."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, job_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(timestamp), str(job_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def ensure_job_total(session: Session) -> None:
+    """Seed the job counter from the table if it has not been created yet.
+
+    Workers starting together on a fresh database may all try to seed it;
+    the losers find the winner's row and leave it alone.
+    """
+
+    if session.get(Counter, JOB_TOTAL) is None:
+        total = session.exec(select(func.count()).select_from(Job)).one()
+        session.add(Counter(name=JOB_TOTAL, value=int(total)))
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            if session.get(Counter, JOB_TOTAL) is None:
+                raise
+
+
+def increment_job_total(session: Session, amount: int) -> None:
+    """Add ``amount`` to the job counter within the caller's transaction."""
+
+    result = session.execute(
+        update(Counter).where(Counter.name == JOB_TOTAL).values(value=Counter.value + amount)
+    )
+    if result.rowcount == 0:
+        session.flush()
+        total = session.exec(select(func.count()).select_from(Job)).one()
+        session.add(Counter(name=JOB_TOTAL, value=int(total)))
+
+
+def job_total(session: Session) -> int:
+    """Return the maintained number of stored jobs."""
+
+    counter = session.get(Counter, JOB_TOTAL)
+    if counter is None:
+        return int(session.exec(select(func.count()).select_from(Job)).one())
+    return counter.value
+
+
+def list_job_page(
+    session: Session,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    include_total: bool = True,
+) -> Dict[str, object]:
+    """Return one page of jobs, newest first, ordered by ``(timestamp, job_id)``.
+
+    With a ``cursor`` the page starts right after the row it encodes. The
+    row-value comparison lets SQLite seek straight to it in the
+    ``(timestamp, job_id)`` index, so deep pages cost the same as the first. ``offset`` is only
+    honoured without a cursor, for older clients.
+    """
+
+    statement = (
+        select(Job)
+        .options(load_only(*(getattr(Job, column) for column in SUMMARY_COLUMNS)))
+        .order_by(Job.timestamp.desc(), Job.job_id.desc())
+    )
+
+    if cursor:
+        timestamp, job_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(Job.timestamp, Job.job_id) < tuple_(timestamp, job_id))
+    elif offset:
+        statement = statement.offset(offset)
+
+    records = session.exec(statement.limit(limit + 1)).all()
+    has_more = len(records) > limit
+    records = records[:limit]
+
+    next_cursor = None
+    if has_more and records:
+        last = records[-1]
+        next_cursor = encode_cursor(last.timestamp, last.job_id)
+
+    return {
+        "records": records,
+        "next_cursor": next_cursor,
+        "total": job_total(session) if include_total else None,
+    }
@@ -1,15 +1,23 @@
 """Instruction generation using public instructional resources."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import List
+from typing import Dict, Iterable, List, Optional, Set
 
 import httpx
 
+from app.core import metrics
+from app.core.config import get_settings
+from app.services import deadline, providers
+from app.services.background import PeriodicRefresher
+from app.services.singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
-async def fetch_wikihow_steps(query: str) -> List[str]:
+async def fetch_wikihow_steps(query: str, client: Optional[httpx.AsyncClient] = None) -> List[str]:
     """Fetch step-by-step instructions from WikiHow search."""
 
     url = "https://www.wikihow.com/api.php"
@@ -20,12 +28,12 @@ async def fetch_wikihow_steps(query: str) -> List[str]:
         "srsearch": query,
         "srlimit": 1,
     }
+    client = client or providers.get_client(providers.WIKIHOW)
 
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            payload = response.json()
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        payload = response.json()
     except httpx.HTTPError as exc:
         logger.warning("Instruction search failed for '%s': %s", query, exc)
         return []
@@ -46,10 +54,9 @@ async def fetch_wikihow_steps(query: str) -> List[str]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            step_response = await client.get(url, params=step_params)
-            step_response.raise_for_status()
-            step_payload = step_response.json()
+        step_response = await client.get(url, params=step_params)
+        step_response.raise_for_status()
+        step_payload = step_response.json()
     except httpx.HTTPError as exc:
         logger.warning("Instruction detail lookup failed for '%s': %s", query, exc)
         return []
@@ -60,6 +67,94 @@ async def fetch_wikihow_steps(query: str) -> List[str]:
     return [step for step in steps if isinstance(step, str)]
 
 
+class InstructionCache:
+    """In-memory WikiHow steps for a known set of instruction queries.
+
+    Queries are registered up front (one per trade profile) and refreshed in
+    the background, so requests read steps from memory. A miss returns
+    ``None``; callers answer with :func:`fallback_steps` while the query is
+    fetched for next time.
+    """
+
+    def __init__(self) -> None:
+        self.queries: List[str] = []
+        self.steps: Dict[str, List[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refresher = PeriodicRefresher(
+            "instructions",
+            self.refresh,
+            interval=settings.instruction_refresh_interval,
+            retry_interval=settings.instruction_retry_interval,
+        )
+        self._pending: Set["asyncio.Task[bool]"] = set()
+        self._flight = SingleFlight()
+
+    def register(self, queries: Iterable[str]) -> None:
+        for query in queries:
+            if query not in self.queries:
+                self.queries.append(query)
+
+    def get(self, query: str) -> Optional[List[str]]:
+        """Return a copy of the cached steps for ``query``.
+
+        Unknown queries are registered and fetched in the background.
+        """
+
+        steps = self.steps.get(query)
+        if steps is not None:
+            self.hits += 1
+            return list(steps)
+
+        self.misses += 1
+        if query not in self.queries:
+            self.register([query])
+            self._fetch_later(query)
+        return None
+
+    def peek(self, query: str) -> Optional[List[str]]:
+        """Return a copy of the cached steps for ``query`` without scheduling a fetch."""
+
+        steps = self.steps.get(query)
+        return list(steps) if steps is not None else None
+
+    async def load(self, query: str, client: Optional[httpx.AsyncClient] = None) -> bool:
+        return await self._flight.do(query, lambda: self._fetch(query, client))
+
+    async def _fetch(self, query: str, client: Optional[httpx.AsyncClient]) -> bool:
+        steps = await fetch_wikihow_steps(query, client=client)
+        if not steps:
+            return False
+        self.steps[query] = steps
+        return True
+
+    async def refresh(self) -> bool:
+        """Reload every registered query; returns whether all of them are cached."""
+
+        await asyncio.gather(*(self.load(query) for query in self.queries))
+        return all(query in self.steps for query in self.queries)
+
+    def _fetch_later(self, query: str) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(self.load(query), context=deadline.detached())
+        except RuntimeError:
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def start(self) -> None:
+        self.refresher.start()
+
+    async def stop(self) -> None:
+        await self.refresher.stop()
+        for task in list(self._pending):
+            task.cancel()
+
+
+instruction_cache = InstructionCache()
+metrics.register_cache("instructions", lambda: instruction_cache)
+
+
 def fallback_steps(trade: str) -> List[str]:
     """Return a basic fallback instruction set when API data is unavailable."""
 
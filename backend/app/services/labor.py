@@ -1,79 +1,319 @@
 """Labor rate utilities leveraging public data."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import httpx
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
 
 from app.core.config import get_settings
+from app.db.session import run_in_session
+from app.models.labor import LaborRate, LaborRateRefresh
+from app.services import deadline, providers
+from app.services.background import PeriodicRefresher, backoff_delay
+from app.services.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+BLS_TIMESERIES_URL = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
+NATIONAL = "US"
+REFRESH_NAME = "bls"
+# How long a claimed refresh may run before another process takes it over.
+REFRESH_LEASE = 5 * 60.0
+REFRESH_WAIT_INTERVAL = 1.0
 
-async def fetch_bls_labor_rate(occupation_code: str, state: Optional[str]) -> Optional[float]:
-    """Fetch hourly wage information from the BLS API."""
+TRADE_OCCUPATIONS = {
+    "concrete": "472061",  # Construction laborers
+    "electrical": "472111",  # Electricians
+    "plumbing": "472152",  # Plumbers
+    "hvac": "499021",  # HVAC mechanics
+    "landscaping": "372011",  # Landscaping workers
+}
+DEFAULT_OCCUPATION = "472061"
+
+# National average hourly rates in USD used when BLS data is unavailable.
+FALLBACK_LABOR_RATES = {
+    "concrete": 24.50,
+    "electrical": 32.25,
+    "plumbing": 30.40,
+    "hvac": 28.10,
+    "landscaping": 20.75,
+}
+DEFAULT_LABOR_RATE = 25.0
+
+STATE_FIPS = {
+    "alabama": "01", "alaska": "02", "arizona": "04", "arkansas": "05", "california": "06",
+    "colorado": "08", "connecticut": "09", "delaware": "10", "district of columbia": "11",
+    "florida": "12", "georgia": "13", "hawaii": "15", "idaho": "16", "illinois": "17",
+    "indiana": "18", "iowa": "19", "kansas": "20", "kentucky": "21", "louisiana": "22",
+    "maine": "23", "maryland": "24", "massachusetts": "25", "michigan": "26", "minnesota": "27",
+    "mississippi": "28", "missouri": "29", "montana": "30", "nebraska": "31", "nevada": "32",
+    "new hampshire": "33", "new jersey": "34", "new mexico": "35", "new york": "36",
+    "north carolina": "37", "north dakota": "38", "ohio": "39", "oklahoma": "40", "oregon": "41",
+    "pennsylvania": "42", "rhode island": "44", "south carolina": "45", "south dakota": "46",
+    "tennessee": "47", "texas": "48", "utah": "49", "vermont": "50", "virginia": "51",
+    "washington": "53", "west virginia": "54", "wisconsin": "55", "wyoming": "56",
+}
+STATE_ABBREVIATIONS = {
+    "AL": "01", "AK": "02", "AZ": "04", "AR": "05", "CA": "06", "CO": "08", "CT": "09", "DE": "10",
+    "DC": "11", "FL": "12", "GA": "13", "HI": "15", "ID": "16", "IL": "17", "IN": "18", "IA": "19",
+    "KS": "20", "KY": "21", "LA": "22", "ME": "23", "MD": "24", "MA": "25", "MI": "26", "MN": "27",
+    "MS": "28", "MO": "29", "MT": "30", "NE": "31", "NV": "32", "NH": "33", "NJ": "34", "NM": "35",
+    "NY": "36", "NC": "37", "ND": "38", "OH": "39", "OK": "40", "OR": "41", "PA": "42", "RI": "44",
+    "SC": "45", "SD": "46", "TN": "47", "TX": "48", "UT": "49", "VT": "50", "VA": "51", "WA": "53",
+    "WV": "54", "WI": "55", "WY": "56",
+}
+
+
+def fallback_labor_rate(trade: str) -> float:
+    """Return the national fallback hourly rate for ``trade``."""
+
+    return FALLBACK_LABOR_RATES.get(trade.lower(), DEFAULT_LABOR_RATE)
+
+
+def trade_occupation(trade: str) -> str:
+    """Return the SOC occupation code used for ``trade``."""
+
+    return TRADE_OCCUPATIONS.get(trade.lower(), DEFAULT_OCCUPATION)
+
+
+def state_code(state: Optional[str]) -> str:
+    """Map a state name or postal abbreviation to its FIPS code, or ``US``."""
 
     if not state:
-        state = "US"
+        return NATIONAL
+    cleaned = state.strip()
+    return STATE_FIPS.get(cleaned.lower()) or STATE_ABBREVIATIONS.get(cleaned.upper()) or NATIONAL
+
+
+def series_per_request() -> int:
+    """Return how many series one BLS request may ask for."""
+
+    return settings.bls_series_per_request or (50 if settings.bls_api_key else 25)
+
 
-    url = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
-    series_id = f"OEUN0000000000000{occupation_code}"
+def include_states() -> bool:
+    """Return whether state-level wages are prefetched as well as national ones.
+
+    Every state multiplies the series by 52, which an unregistered client's
+    25 daily queries cannot cover, so it is on by default only with a key.
+    """
+
+    if settings.labor_rate_include_states is not None:
+        return settings.labor_rate_include_states
+    return settings.bls_api_key is not None
+
+
+def bls_series_id(occupation_code: str, area: str = NATIONAL) -> str:
+    """Build the OEWS series id for the mean hourly wage of an occupation."""
+
+    if area == NATIONAL:
+        return f"OEUN0000000000000{occupation_code}03"
+    return f"OEUS{area}00000000000{occupation_code}03"
+
+
+async def fetch_bls_series(
+    series_ids: List[str], client: Optional[httpx.AsyncClient] = None
+) -> Dict[str, float]:
+    """Fetch the latest value of several BLS series in as few requests as possible."""
+
+    client = client or providers.get_client(providers.BLS)
     headers = {"Content-type": "application/json"}
-    payload = {
-        "seriesid": [series_id],
-    }
+    chunk_size = series_per_request()
+    values: Dict[str, float] = {}
 
-    if settings.bls_api_key:
-        payload["registrationkey"] = settings.bls_api_key
+    for start in range(0, len(series_ids), chunk_size):
+        payload = {"seriesid": series_ids[start:start + chunk_size], "latest": True}
+        if settings.bls_api_key:
+            payload["registrationkey"] = settings.bls_api_key
 
-    try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            response = await client.post(url, json=payload, headers=headers)
+        try:
+            response = await client.post(BLS_TIMESERIES_URL, json=payload, headers=headers)
             response.raise_for_status()
             data = response.json()
-    except httpx.HTTPError as exc:
-        logger.warning("BLS labor lookup failed for %s: %s", occupation_code, exc)
-        return None
+        except httpx.HTTPError as exc:
+            logger.warning("BLS series lookup failed for %d series: %s", len(payload["seriesid"]), exc)
+            continue
+
+        for series in data.get("Results", {}).get("series", []):
+            data_points = series.get("data", [])
+            if not data_points:
+                continue
+            try:
+                values[series["seriesID"]] = float(data_points[0].get("value"))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    return values
+
 
-    series = data.get("Results", {}).get("series", [])
-    if not series:
+async def fetch_bls_labor_rate(
+    occupation_code: str, state: Optional[str], client: Optional[httpx.AsyncClient] = None
+) -> Optional[float]:
+    """Fetch hourly wage information for one occupation from the BLS API."""
+
+    series_id = bls_series_id(occupation_code, state_code(state))
+    values = await fetch_bls_series([series_id], client=client)
+    if series_id not in values:
         logger.warning("No BLS series found for %s", series_id)
-        return None
+    return values.get(series_id)
 
-    data_points = series[0].get("data", [])
-    if not data_points:
-        return None
 
-    latest = data_points[0]
-    value = latest.get("value")
-    return float(value) if value else None
+def _claim_refresh(session: Session, lease: float) -> bool:
+    """Claim the shared refresh if it is due and nobody else holds it."""
 
+    now = datetime.utcnow()
+    claimed_until = now + timedelta(seconds=lease)
+    if session.get(LaborRateRefresh, REFRESH_NAME) is None:
+        # The first refresh is created already claimed, so nobody sees it due but idle.
+        session.add(LaborRateRefresh(name=REFRESH_NAME, next_refresh_at=now, claimed_until=claimed_until))
+        try:
+            session.commit()
+            return True
+        except IntegrityError:
+            # Another process created it first.
+            session.rollback()
 
-async def resolve_trade_labor_rate(trade: str, state: Optional[str]) -> float:
-    """Resolve a trade-specific labor rate with sensible fallbacks."""
+    result = session.execute(
+        update(LaborRateRefresh)
+        .where(
+            LaborRateRefresh.name == REFRESH_NAME,
+            LaborRateRefresh.next_refresh_at <= now,
+            or_(LaborRateRefresh.claimed_until.is_(None), LaborRateRefresh.claimed_until < now),
+        )
+        .values(claimed_until=claimed_until)
+    )
+    session.commit()
+    return result.rowcount == 1
 
-    trade_to_occupation = {
-        "concrete": "472061",  # Construction laborers
-        "electrical": "472111",  # Electricians
-        "plumbing": "472152",  # Plumbers
-        "hvac": "499021",  # HVAC mechanics
-        "landscaping": "372011",  # Landscaping workers
-    }
 
-    occupation_code = trade_to_occupation.get(trade.lower(), "472061")
-    rate = await fetch_bls_labor_rate(occupation_code, state)
+def _store_rates(session: Session, rates: Dict[Tuple[str, str], float]) -> None:
+    """Save the claimed refresh's rates and schedule the next one."""
 
-    if rate is None:
-        # Fallback to national average hourly rate in USD
-        fallback_rates = {
-            "concrete": 24.50,
-            "electrical": 32.25,
-            "plumbing": 30.40,
-            "hvac": 28.10,
-            "landscaping": 20.75,
+    now = datetime.utcnow()
+    refresh = session.get(LaborRateRefresh, REFRESH_NAME)
+    for (occupation, area), rate in rates.items():
+        session.merge(LaborRate(occupation=occupation, area=area, rate=rate, fetched_at=now))
+    if rates:
+        refresh.failures = 0
+        delay = settings.labor_rate_refresh_interval
+    else:
+        refresh.failures += 1
+        delay = backoff_delay(
+            refresh.failures, settings.labor_rate_retry_interval, settings.labor_rate_refresh_interval
+        )
+    refresh.next_refresh_at = now + timedelta(seconds=delay)
+    refresh.claimed_until = None
+    session.commit()
+
+
+def _load_rates(
+    session: Session, occupations: List[str], areas: List[str]
+) -> Tuple[Dict[Tuple[str, str], float], bool, bool]:
+    """Return the stored rates, whether a refresh is running and whether the last one failed."""
+
+    rows = session.exec(
+        select(LaborRate).where(LaborRate.occupation.in_(occupations), LaborRate.area.in_(areas))
+    ).all()
+    refresh = session.get(LaborRateRefresh, REFRESH_NAME)
+    running = bool(refresh and refresh.claimed_until and refresh.claimed_until > datetime.utcnow())
+    failing = bool(refresh and refresh.failures)
+    return {(row.occupation, row.area): row.rate for row in rows}, running, failing
+
+
+class LaborRateStore:
+    """In-memory labor rates keyed by occupation and state.
+
+    Every series the trades need is fetched in bulk on startup and then on a
+    schedule, so resolving a rate during a request never touches BLS. The
+    rates are kept in the database as well: one process claims each due
+    refresh and the others load what it stored instead of querying BLS.
+    """
+
+    def __init__(self, occupations: Iterable[str], areas: Iterable[str]):
+        self.occupations = sorted(set(occupations))
+        self.areas = list(dict.fromkeys(areas))
+        self.rates: Dict[Tuple[str, str], float] = {}
+        self.refresher = PeriodicRefresher(
+            "labor-rates",
+            self.refresh,
+            interval=settings.labor_rate_refresh_interval,
+            retry_interval=settings.labor_rate_retry_interval,
+            max_retry_interval=settings.labor_rate_refresh_interval,
+        )
+        self._flight = SingleFlight()
+
+    async def refresh(self, client: Optional[httpx.AsyncClient] = None) -> bool:
+        """Reload every tracked series; returns whether the shared rates are current.
+
+        Overlapping refreshes (scheduled and on demand) share one BLS round.
+        """
+
+        return await self._flight.do("refresh", lambda: self._refresh(client))
+
+    async def _refresh(self, client: Optional[httpx.AsyncClient]) -> bool:
+        if await run_in_session(_claim_refresh, REFRESH_LEASE):
+            await self._fetch(client)
+
+        while True:
+            rates, running, failing = await run_in_session(_load_rates, self.occupations, self.areas)
+            if not running:
+                break
+            # Another process is fetching; its lease bounds the wait.
+            await asyncio.sleep(REFRESH_WAIT_INTERVAL)
+
+        # Merge so series missing from the database keep their previous values.
+        self.rates = {**self.rates, **rates}
+        return bool(rates) and not failing
+
+    async def _fetch(self, client: Optional[httpx.AsyncClient]) -> None:
+        series = {
+            bls_series_id(occupation, area): (occupation, area)
+            for occupation in self.occupations
+            for area in self.areas
         }
-        rate = fallback_rates.get(trade.lower(), 25.0)
+        rates: Dict[Tuple[str, str], float] = {}
+        try:
+            values = await fetch_bls_series(list(series), client=client)
+            rates = {series[series_id]: value for series_id, value in values.items()}
+            logger.info("Loaded %d of %d BLS labor series", len(values), len(series))
+        finally:
+            await run_in_session(_store_rates, rates)
+
+    def rate_for(self, occupation_code: str, state: Optional[str]) -> Optional[float]:
+        """Return the state rate for an occupation, falling back to the national rate."""
+
+        area = state_code(state)
+        rate = self.rates.get((occupation_code, area))
+        if rate is None and area != NATIONAL:
+            rate = self.rates.get((occupation_code, NATIONAL))
+        return rate
+
+    def start(self) -> None:
+        self.refresher.start()
+
+    async def stop(self) -> None:
+        await self.refresher.stop()
+
+
+labor_rate_store = LaborRateStore(
+    TRADE_OCCUPATIONS.values(),
+    [NATIONAL, *sorted(set(STATE_FIPS.values()))] if include_states() else [NATIONAL],
+)
+
+
+async def resolve_trade_labor_rate(trade: str, state: Optional[str]) -> float:
+    """Resolve a trade-specific labor rate with sensible fallbacks."""
+
+    rate = labor_rate_store.rate_for(trade_occupation(trade), state)
+    if rate is None:
+        deadline.degrade("labor_rate")
+        rate = fallback_labor_rate(trade)
 
     return rate
@@ -1,31 +1,40 @@
 """Material pricing helpers leveraging public data sources."""
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import re
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import httpx
 
+from app.core import metrics
+from app.core.config import get_settings
+from app.services import deadline, providers
+from app.services.cache import StaleWhileRevalidateCache
+
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 BASELINE_PATH = Path(__file__).resolve().parent.parent / "data" / "material_baseline.json"
 DEFAULT_MATERIAL_PRICE = 15.0
 
 
-async def search_material_price(query: str) -> Optional[float]:
+async def search_material_price(query: str, client: Optional[httpx.AsyncClient] = None) -> Optional[float]:
     """Attempt to retrieve live material pricing from Build.com search API."""
 
     url = "https://www.build.com/api/search/v1"
     params = {"q": query, "sort": "relevance", "limit": 1}
 
+    client = client or providers.get_client(providers.BUILD)
+
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            payload = response.json()
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        payload = response.json()
     except httpx.HTTPError as exc:
         logger.warning("Material price lookup failed for %s: %s", query, exc)
         return None
@@ -49,25 +58,98 @@ def load_baseline_prices() -> Dict[str, float]:
         return json.load(handle)
 
 
-async def resolve_material_costs(materials: List[str]) -> Dict[str, float]:
-    """Resolve material costs using live data with baseline fallback."""
+def normalize_material(name: str) -> str:
+    """Return the cache key for a material name."""
 
-    baselines = load_baseline_prices()
-    costs: Dict[str, float] = {}
+    return re.sub(r"\s+", " ", name.strip().lower())
+
+
+async def _load_live_price(key: str) -> Optional[float]:
+    return await search_material_price(key)
+
+
+material_price_cache = StaleWhileRevalidateCache(
+    _load_live_price,
+    maxsize=settings.material_price_cache_size,
+    fresh_ttl=settings.material_price_fresh_ttl,
+    max_stale=settings.material_price_max_stale,
+)
+metrics.register_cache("material_prices", lambda: material_price_cache)
 
+
+def unique_materials(materials: List[str]) -> List[str]:
+    """Return stripped material names without case-insensitive duplicates.
+
+    The first spelling of each material wins and input order is preserved.
+    """
+
+    unique: Dict[str, str] = {}
     for material in materials:
         normalized_name = material.strip()
-        if not normalized_name:
-            continue
+        if normalized_name:
+            unique.setdefault(normalized_name.lower(), normalized_name)
+    return list(unique.values())
 
-        lookup_key = normalized_name.lower()
-        if lookup_key in costs:
-            continue
 
-        price = await search_material_price(normalized_name)
+def baseline_price(material: str) -> float:
+    """Return the offline baseline price for ``material``."""
+
+    baselines = load_baseline_prices()
+    return float(baselines.get(material.lower(), baselines.get(material, DEFAULT_MATERIAL_PRICE)))
+
+
+def baseline_material_costs(materials: List[str]) -> Dict[str, float]:
+    """Price ``materials`` from the offline baseline only."""
+
+    return {name: baseline_price(name) for name in unique_materials(materials)}
+
+
+def cached_material_costs(materials: List[str]) -> Tuple[Dict[str, float], List[str], List[str]]:
+    """Resolve material costs from memory only, without any network call.
+
+    Returns ``(costs, stale, defaulted)``: the names priced from a stale cache
+    entry and the names that fell back to the baseline price.
+    """
+
+    costs: Dict[str, float] = {}
+    stale: List[str] = []
+    defaulted: List[str] = []
+    for name in unique_materials(materials):
+        price, state = material_price_cache.peek(normalize_material(name))
         if price is None:
-            price = baselines.get(lookup_key, baselines.get(normalized_name, DEFAULT_MATERIAL_PRICE))
+            costs[name] = baseline_price(name)
+            defaulted.append(name)
+            continue
+        costs[name] = float(price)
+        if state == "stale":
+            stale.append(name)
+    return costs, stale, defaulted
+
+
+async def resolve_material_costs(materials: List[str], concurrency: Optional[int] = None) -> Dict[str, float]:
+    """Resolve material costs using live data with baseline fallback.
+
+    Live prices come from :data:`material_price_cache`, which answers fresh
+    and stale entries from memory. Lookups for distinct materials run
+    concurrently, at most ``concurrency`` at a time
+    (``material_lookup_concurrency`` by default). The result is keyed by the
+    first spelling of each material, in input order. Materials priced from
+    the baseline are marked degraded as ``material:<name>``.
+    """
 
-        costs[normalized_name] = float(price)
+    names = unique_materials(materials)
+    semaphore = asyncio.Semaphore(concurrency or settings.material_lookup_concurrency)
+
+    async def lookup(name: str) -> Optional[float]:
+        async with semaphore:
+            return await material_price_cache.get(normalize_material(name))
+
+    prices = await asyncio.gather(*(lookup(name) for name in names))
+    for name, price in zip(names, prices):
+        if price is None:
+            deadline.degrade(f"material:{name}")
 
-    return costs
+    return {
+        name: float(price) if price is not None else baseline_price(name)
+        for name, price in zip(names, prices)
+    }
@@ -0,0 +1,28 @@
+"""Persistence of generated job payloads."""
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+from app.db.session import get_session
+from app.models.job import Job
+from app.services.analytics import record_jobs
+from app.services.history import increment_job_total
+from app.services.rollups import record_rollups
+
+
+def save_jobs(payloads: Sequence[Dict]) -> None:
+    """Insert ``payloads`` as :class:`Job` rows in a single transaction.
+
+    Maintained aggregates are updated in the same transaction.
+    """
+
+    if not payloads:
+        return
+
+    jobs = [Job.from_payload(payload) for payload in payloads]
+    with get_session() as session:
+        session.add_all(jobs)
+        increment_job_total(session, len(jobs))
+        record_jobs(session, jobs)
+        record_rollups(session, jobs)
+        session.commit()
@@ -2,46 +2,119 @@
 from __future__ import annotations
 
 import logging
+import time
 import uuid
-from typing import Dict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
 
-from app.db.session import get_session
-from app.models.job import Job
+from app.core import metrics
+from app.core.config import get_settings
 from app.plugins.trades.concrete import ConfigurableTradePlugin, build_plugins
+from app.services import deadline, instructions
+from app.services.stages import Stage, run_stages
+from app.services.write_behind import persist_job
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 PLUGIN_REGISTRY: Dict[str, ConfigurableTradePlugin] = build_plugins()
 
+# Called with (stage, "started" | "finished") as the pipeline advances.
+ProgressHook = Callable[[str, str], None]
 
-async def process_job(payload: Dict) -> Dict:
-    """Execute the plugin pipeline for the provided job payload."""
 
-    trade = payload.get("trade", "").lower()
-    plugin = PLUGIN_REGISTRY.get(trade)
-    if not plugin:
-        raise ValueError(f"Unsupported trade: {trade}")
+@contextmanager
+def _stage(trade: str, name: str, progress: Optional[ProgressHook]) -> Iterator[None]:
+    if progress is not None:
+        progress(name, "started")
+    with metrics.stage_seconds.time(trade, name):
+        yield
+    if progress is not None:
+        progress(name, "finished")
 
-    logger.info("Processing job for trade '%s'", trade)
 
-    normalized = await plugin.normalize_data(payload)
-    enriched = await plugin.fetch_public_data(normalized)
-    bid = await plugin.compute_bid(enriched)
-    steps = await plugin.generate_instructions(bid)
-    bid["steps"] = steps
-    final_payload = await plugin.export_bid_report(bid)
+async def process_job(
+    payload: Dict,
+    deadline_seconds: Optional[float] = None,
+    job_id: Optional[str] = None,
+    progress: Optional[ProgressHook] = None,
+) -> Dict:
+    """Execute the plugin pipeline for the provided job payload and persist it.
 
-    job = Job(**final_payload)
-    with get_session() as session:
-        session.add(job)
-        session.commit()
-        session.refresh(job)
+    Enrichment runs under a budget of ``deadline_seconds`` (``request_deadline``
+    by default, ``0`` for none) minus ``deadline_reserve``; lookups still
+    pending when it runs out fall back to cached or baseline data. The result
+    lists those inputs under ``degraded``. ``job_id`` keeps an identifier
+    handed out before the job ran, and ``progress`` is told about every stage.
+    """
+
+    started = time.perf_counter()
+    seconds = settings.request_deadline if deadline_seconds is None else deadline_seconds
+    with deadline.budget(max(seconds - settings.deadline_reserve, 0.0) if seconds else None) as budget:
+        final_payload = await build_job(payload, progress=progress)
+    if job_id is not None:
+        final_payload["job_id"] = job_id
+    final_payload["degraded"] = list(budget.degraded)
+    trade = final_payload.get("trade", "")
+    with _stage(trade, "persist", progress):
+        await persist_job(final_payload)
+    metrics.job_seconds.observe(time.perf_counter() - started, trade)
 
     logger.info("Generated job %s with total bid %.2f", final_payload.get("job_id"), final_payload.get("total_bid", 0.0))
 
     return final_payload
 
 
+def get_plugin(trade: str) -> ConfigurableTradePlugin:
+    """Return the plugin for ``trade`` or raise ``ValueError`` if it is unsupported."""
+
+    plugin = PLUGIN_REGISTRY.get(trade.lower())
+    if not plugin:
+        raise ValueError(f"Unsupported trade: {trade.lower()}")
+    return plugin
+
+
+async def build_job(payload: Dict, progress: Optional[ProgressHook] = None) -> Dict:
+    """Run the plugin pipeline for ``payload`` without persisting the result."""
+
+    trade = payload.get("trade", "").lower()
+    plugin = get_plugin(trade)
+
+    logger.info("Processing job for trade '%s'", trade)
+
+    with _stage(trade, "normalize", progress):
+        normalized = await plugin.normalize_data(payload)
+
+    async def enrich(_: Dict) -> Dict:
+        with _stage(trade, "enrich", progress):
+            return await plugin.fetch_public_data(dict(normalized))
+
+    async def compute(inputs: Dict) -> Dict:
+        with _stage(trade, "compute", progress):
+            return await plugin.compute_bid(inputs["enrich"])
+
+    async def steps(_: Dict) -> List[str]:
+        # Instructions depend only on the trade profile, so they are fetched
+        # alongside enrichment rather than after the bid is computed.
+        with _stage(trade, "instructions", progress):
+            return await plugin.generate_instructions(normalized)
+
+    results = await run_stages(
+        [
+            Stage("enrich", enrich),
+            Stage("compute", compute, requires=("enrich",)),
+            Stage("steps", steps, fallback=instructions.fallback_steps(trade)),
+        ]
+    )
+
+    bid = results["compute"]
+    bid["steps"] = results["steps"]
+    with _stage(trade, "export", progress):
+        report = await plugin.export_bid_report(bid)
+    metrics.bids_created.inc(trade)
+    return report
+
+
 def generate_job_id() -> str:
     """Generate a unique job identifier."""
 
@@ -0,0 +1,259 @@
+"""Shared HTTP client pool for upstream data providers."""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import ipaddress
+import logging
+import time
+import urllib.request
+from typing import Dict, Optional
+
+import httpx
+
+from app.core import metrics
+from app.core.config import Settings, get_settings
+from app.services.resilience import ProviderGuard, ResilientTransport
+
+logger = logging.getLogger(__name__)
+
+NOMINATIM = "nominatim"
+GEOAPIFY = "geoapify"
+BLS = "bls"
+BUILD = "build"
+OPENWEATHER = "openweather"
+WIKIHOW = "wikihow"
+
+PROVIDERS = (NOMINATIM, GEOAPIFY, BLS, BUILD, OPENWEATHER, WIKIHOW)
+
+
+def environment_proxies() -> Dict[str, Optional[str]]:
+    """Map httpx mount patterns to the proxies set by HTTP(S)_PROXY, ALL_PROXY and NO_PROXY.
+
+    A ``None`` value marks a host that NO_PROXY sends direct.
+    """
+
+    proxies = urllib.request.getproxies()
+    mounts: Dict[str, Optional[str]] = {}
+    for scheme in ("http", "https", "all"):
+        url = proxies.get(scheme)
+        if url:
+            mounts[f"{scheme}://"] = url if "://" in url else f"http://{url}"
+
+    for host in (entry.strip() for entry in proxies.get("no", "").split(",")):
+        if not host:
+            continue
+        if host == "*":
+            return {}
+        if "://" in host:
+            mounts[host] = None
+            continue
+        try:
+            address = ipaddress.ip_address(host.strip("[]"))
+        except ValueError:
+            # A domain also covers its subdomains; "*.example.com" only those.
+            mounts[f"all://*{host.lstrip('*')}"] = None
+        else:
+            mounts[f"all://[{address}]" if address.version == 6 else f"all://{address}"] = None
+    return mounts
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Record latency and failures of every request sent through ``transport``.
+
+    Latency is measured until the response headers arrive, which for the
+    small JSON payloads of these providers is nearly the whole exchange.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, provider: str):
+        self.transport = transport
+        self.provider = provider
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            metrics.provider_errors.inc(self.provider, "transport")
+            raise
+        finally:
+            metrics.provider_seconds.observe(time.perf_counter() - started, self.provider)
+
+        if response.status_code >= 500:
+            metrics.provider_errors.inc(self.provider, "status")
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class ProviderClients:
+    """Pool of long-lived ``httpx.AsyncClient`` instances, one per provider host.
+
+    Each provider gets its own client so connection limits and keep-alive
+    apply per upstream host, and so a slow provider cannot starve the
+    connection pool of the others. Each also gets a :class:`ProviderGuard`
+    whose circuit breaker and latency history live as long as the pool.
+    """
+
+    def __init__(self, settings: Settings, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.settings = settings
+        self.transport = transport
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._closer: Optional[asyncio.Task] = None
+        self.guards = {provider: ProviderGuard(provider, settings) for provider in PROVIDERS}
+
+    def _http2_enabled(self) -> bool:
+        if not self.settings.http2_enabled:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            return False
+        return True
+
+    def timeout_for(self, provider: str) -> httpx.Timeout:
+        """Return the configured timeout for ``provider``."""
+
+        seconds = self.settings.provider_timeouts.get(provider, self.settings.http_timeout)
+        return httpx.Timeout(seconds, connect=min(seconds, self.settings.http_connect_timeout))
+
+    def _create_client(self, provider: str) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.settings.http_max_connections_per_host,
+            max_keepalive_connections=self.settings.http_max_keepalive_connections,
+            keepalive_expiry=self.settings.http_keepalive_expiry,
+        )
+        guard = self.guards[provider]
+
+        def wrap(transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+            return ResilientTransport(InstrumentedTransport(transport, provider), guard)
+
+        mounts: Dict[str, Optional[httpx.AsyncBaseTransport]] = {}
+        if self.transport is None:
+            http2 = self._http2_enabled()
+            transport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+            # httpx ignores HTTP(S)_PROXY/NO_PROXY once a transport is passed in,
+            # so mount the environment's proxies here, wrapped like the direct route.
+            for pattern, proxy in environment_proxies().items():
+                if proxy is None:
+                    mounts[pattern] = None
+                else:
+                    proxied = httpx.AsyncHTTPTransport(proxy=httpx.Proxy(proxy), limits=limits, http2=http2)
+                    mounts[pattern] = wrap(proxied)
+        else:
+            transport = self.transport
+        return httpx.AsyncClient(
+            timeout=self.timeout_for(provider),
+            limits=limits,
+            headers={"User-Agent": self.settings.http_user_agent},
+            transport=wrap(transport),
+            mounts=mounts,
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """Return the shared client for ``provider``, creating it on first use."""
+
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown provider: {provider}")
+
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._create_client(provider)
+            self._clients[provider] = client
+        return client
+
+    async def close(self) -> None:
+        """Close every open client and release pooled connections."""
+
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def close_with_loop(self) -> None:
+        """Close the pool when its event loop shuts down.
+
+        ``asyncio.run`` cancels leftover tasks before closing the loop, so a
+        task parked until cancellation gets to close the clients while their
+        connections can still be shut down cleanly.
+        """
+
+        async def wait_for_shutdown() -> None:
+            try:
+                await self.loop.create_future()
+            finally:
+                await self.close()
+
+        self._closer = self.loop.create_task(wait_for_shutdown(), name="provider-clients-closer")
+
+    def release(self) -> None:
+        """Close a pool owned by an event loop other than the running one."""
+
+        if self.loop is None or self.loop.is_closed():
+            if self._clients:
+                logger.warning("Provider clients of a closed event loop were never closed")
+            self._clients = {}
+        elif self._closer is not None:
+            self.loop.call_soon_threadsafe(self._closer.cancel)
+        else:
+            asyncio.run_coroutine_threadsafe(self.close(), self.loop)
+
+
+_pool: Optional[ProviderClients] = None
+
+
+async def startup(transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+    """Create the shared provider pool for the running event loop."""
+
+    global _pool
+    if _pool is not None:
+        await _discard(_pool)
+
+    _pool = ProviderClients(get_settings(), transport=transport)
+    _pool.loop = asyncio.get_running_loop()
+    for provider in PROVIDERS:
+        _pool.get(provider)
+    logger.info("Provider HTTP clients started for %s", ", ".join(PROVIDERS))
+
+
+async def shutdown() -> None:
+    """Close the shared provider pool."""
+
+    global _pool
+    if _pool is None:
+        return
+
+    pool, _pool = _pool, None
+    await _discard(pool)
+    logger.info("Provider HTTP clients closed")
+
+
+async def _discard(pool: ProviderClients) -> None:
+    if pool.loop is not asyncio.get_running_loop():
+        pool.release()
+        return
+    if pool._closer is not None:
+        pool._closer.cancel()
+    await pool.close()
+
+
+def get_client(provider: str) -> httpx.AsyncClient:
+    """Return the shared client for ``provider``.
+
+    Outside the application lifecycle (scripts, tests) the pool is created on
+    demand and closed when its event loop shuts down. It is rebuilt whenever
+    it is used from a different event loop, since pooled connections cannot
+    be shared across loops; the old pool is closed first.
+    """
+
+    global _pool
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool.loop is not loop:
+        transport = None
+        if _pool is not None:
+            transport = _pool.transport
+            _pool.release()
+        _pool = ProviderClients(get_settings(), transport=transport)
+        _pool.loop = loop
+        _pool.close_with_loop()
+    return _pool.get(provider)
@@ -0,0 +1,72 @@
+"""Ballpark quotes computed from cached and baseline data only."""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from app.core.config import get_settings
+from app.services import geocoding, instructions, labor, materials, weather
+from app.services.cache import MISSING
+from app.services.pipeline import get_plugin
+
+settings = get_settings()
+
+
+async def quick_quote(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Price ``payload`` with the plugin math using only data already in memory.
+
+    Nothing is fetched and nothing is stored. Inputs come from the in-memory
+    geocode, material price, labor rate, weather and instruction caches, with
+    baseline prices and fallback rates where they are empty. The result is the
+    bid payload (without a ``job_id``) plus ``stale`` and ``defaulted`` lists
+    naming the inputs that came from an expired entry or a fallback;
+    materials are reported as ``material:<name>``.
+    """
+
+    plugin = get_plugin(payload.get("trade", ""))
+    normalized = await plugin.normalize_data(payload)
+    stale: List[str] = []
+    defaulted: List[str] = []
+
+    geo = geocoding.cached_geocode(normalized.get("location") or "")
+    if geo is MISSING:
+        geo = None
+        defaulted.append("geocode")
+
+    material_costs, stale_materials, default_materials = materials.cached_material_costs(normalized["materials"])
+    stale.extend(f"material:{name}" for name in stale_materials)
+    defaulted.extend(f"material:{name}" for name in default_materials)
+
+    labor_rate = labor.labor_rate_store.rate_for(
+        labor.trade_occupation(plugin.trade_name), geo.get("state") if geo else None
+    )
+    if labor_rate is None:
+        labor_rate = labor.fallback_labor_rate(plugin.trade_name)
+        defaulted.append("labor_rate")
+
+    weather_modifier = 0.0
+    if settings.openweather_api_key:
+        cached = weather.cached_weather_modifier(geo["lat"], geo["lon"]) if geo else MISSING
+        if cached is MISSING:
+            defaulted.append("weather_modifier")
+        else:
+            weather_modifier = cached or 0.0
+
+    bid = await plugin.compute_bid(
+        {
+            **normalized,
+            "geocode": geo,
+            "location_details": geo,
+            "material_costs": material_costs,
+            "labor_rate": labor_rate,
+            "weather_modifier": weather_modifier,
+        }
+    )
+    bid.pop("job_id", None)
+
+    steps = instructions.instruction_cache.peek(plugin.instruction_query)
+    if not steps:
+        steps = instructions.fallback_steps(plugin.trade_name)
+        defaulted.append("steps")
+    bid["steps"] = steps
+
+    return {**bid, "stale": stale, "defaulted": defaulted}
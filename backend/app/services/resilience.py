@@ -0,0 +1,244 @@
+"""Circuit breakers, adaptive timeouts and retries for upstream providers.
+
+Every provider client sends its requests through a :class:`ResilientTransport`
+that owns one :class:`ProviderGuard` per provider:
+
+* the circuit breaker opens after ``circuit_failure_threshold`` consecutive
+  failures and rejects calls for ``circuit_reset_timeout`` seconds, then lets a
+  single probe through (half-open) to decide whether to close again;
+* the timeout follows the provider's observed latency (a high percentile
+  times a safety multiplier) and never exceeds the configured
+  ``provider_timeouts`` value;
+* connection errors, timeouts and 429/502/503/504 responses are retried up
+  to ``provider_max_retries`` times with full-jitter exponential backoff.
+
+Timeouts are further cut to what is left of the request budget (see
+:mod:`app.services.deadline`); running out of budget is not held against the
+provider. Rejected and timed-out calls raise :class:`httpx.TransportError`
+subclasses, so the ``except httpx.HTTPError`` fallbacks in the provider
+modules apply unchanged and an outage costs accuracy rather than latency.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+import httpx
+
+from app.core import metrics
+from app.core.config import Settings
+from app.services import deadline
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class ProviderTimeout(httpx.TimeoutException):
+    """Raised when a provider does not answer within its adaptive timeout."""
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """Raised when the request budget runs out before a provider answers."""
+
+
+def is_failure(response: httpx.Response) -> bool:
+    """Whether ``response`` counts against the provider's health."""
+
+    return response.status_code >= 500 or response.status_code == 429
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker driven by consecutive failures."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self._probing or self.clock() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """Return whether a call may proceed; in half-open state only one probe may."""
+
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._probing = False
+
+    def release(self) -> None:
+        """Give up a probe that ended without an outcome (for example, cancellation)."""
+
+        self._probing = False
+
+
+class AdaptiveTimeout:
+    """Timeout derived from a window of recent successful response times."""
+
+    def __init__(
+        self,
+        maximum: float,
+        minimum: float,
+        percentile: float,
+        multiplier: float,
+        window: int,
+        min_samples: int,
+    ):
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.samples: Deque[float] = deque(maxlen=window)
+        self._current = maximum
+        self._since_update = 0
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self._since_update += 1
+        # Re-sorting the window on every call would cost more than it saves.
+        if len(self.samples) >= self.min_samples and self._since_update >= max(1, self.min_samples // 4):
+            self._since_update = 0
+            ordered = sorted(self.samples)
+            rank = max(1, math.ceil(self.percentile / 100 * len(ordered)))
+            self._current = min(self.maximum, max(self.minimum, ordered[rank - 1] * self.multiplier))
+
+    @property
+    def current(self) -> float:
+        return self._current
+
+
+class ProviderGuard:
+    """Breaker, timeout and retry policy for one provider."""
+
+    def __init__(self, provider: str, settings: Settings, clock: Callable[[], float] = time.monotonic):
+        self.provider = provider
+        self.max_retries = settings.provider_max_retries
+        self.retry_backoff = settings.provider_retry_backoff
+        self.breaker = CircuitBreaker(settings.circuit_failure_threshold, settings.circuit_reset_timeout, clock)
+        self.timeout = AdaptiveTimeout(
+            maximum=settings.provider_timeouts.get(provider, settings.http_timeout),
+            minimum=settings.adaptive_timeout_min,
+            percentile=settings.adaptive_timeout_percentile,
+            multiplier=settings.adaptive_timeout_multiplier,
+            window=settings.adaptive_timeout_window,
+            min_samples=settings.adaptive_timeout_min_samples,
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number ``attempt`` (1-based)."""
+
+        return random.uniform(0, self.retry_backoff * 2 ** (attempt - 1))
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Apply a :class:`ProviderGuard` to every request sent through ``transport``.
+
+    Provider calls are lookups, so every method (including the BLS POST) is
+    treated as safe to retry.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, guard: ProviderGuard):
+        self.transport = transport
+        self.guard = guard
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        guard = self.guard
+        attempt = 0
+        while True:
+            if not guard.breaker.allow():
+                metrics.provider_errors.inc(guard.provider, "circuit_open")
+                raise CircuitOpenError(f"Circuit for {guard.provider} is open", request=request)
+
+            try:
+                response = await self._attempt(request)
+            except DeadlineExceeded:
+                guard.breaker.release()
+                raise
+            except httpx.TransportError as exc:
+                guard.breaker.record_failure()
+                if attempt >= guard.max_retries:
+                    raise
+                logger.debug("Retrying %s after %r", guard.provider, exc)
+            except BaseException:
+                guard.breaker.release()
+                raise
+            else:
+                if not is_failure(response):
+                    guard.breaker.record_success()
+                    return response
+                guard.breaker.record_failure()
+                if response.status_code not in RETRY_STATUSES or attempt >= guard.max_retries:
+                    return response
+                await response.aclose()
+
+            attempt += 1
+            delay = guard.backoff(attempt)
+            left = deadline.remaining()
+            if left is not None and left <= delay:
+                raise DeadlineExceeded(f"No budget left to retry {guard.provider}", request=request)
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, request: httpx.Request) -> httpx.Response:
+        timeout = self.guard.timeout.current
+        left = deadline.remaining()
+        budget_bound = left is not None and left < timeout
+        if budget_bound:
+            if left <= 0:
+                raise DeadlineExceeded(f"No budget left to call {self.guard.provider}", request=request)
+            timeout = left
+
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self.transport.handle_async_request(request), timeout)
+        except asyncio.TimeoutError:
+            if budget_bound:
+                raise DeadlineExceeded(
+                    f"Request budget ran out waiting for {self.guard.provider}", request=request
+                ) from None
+            metrics.provider_errors.inc(self.guard.provider, "timeout")
+            raise ProviderTimeout(
+                f"{self.guard.provider} did not respond within {timeout:.2f}s", request=request
+            ) from None
+        if not is_failure(response):
+            self.guard.timeout.observe(time.perf_counter() - started)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
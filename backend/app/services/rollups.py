@@ -0,0 +1,186 @@
+"""Time-bucketed job rollups for analytics trends.
+
+Every job insert adds to one hourly, one daily and one weekly
+:class:`JobRollup` row for its trade, in the same transaction, so trend
+queries read a handful of rollup rows instead of the ``job`` table. Hourly
+rows older than ``rollup_hourly_retention`` are compacted away on a schedule;
+the daily rows already hold their totals.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.core.timestamps import naive_utc
+from app.db.session import run_in_session
+from app.models.analytics import JobRollup
+from app.models.job import Job
+from app.services.background import PeriodicRefresher
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+HOUR = "hour"
+DAY = "day"
+WEEK = "week"
+GRANULARITIES = (HOUR, DAY, WEEK)
+
+SUM_COLUMNS = ("total_bid_sum", "profit_margin_sum", "material_total_sum", "labor_total_sum")
+
+BucketKey = Tuple[str, datetime, str]
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Return the start of the ``granularity`` bucket containing ``timestamp``.
+
+    Weeks start on Monday.
+    """
+
+    hour = timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == HOUR:
+        return hour
+    day = hour.replace(hour=0)
+    if granularity == DAY:
+        return day
+    if granularity == WEEK:
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def _bucket_sums(jobs: Sequence[Job]) -> Dict[BucketKey, Dict[str, float]]:
+    """Sum ``jobs`` (or rows with the same columns) per hour, day and week bucket."""
+
+    buckets: Dict[BucketKey, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(("job_count", *SUM_COLUMNS), 0))
+    for job in jobs:
+        for granularity in GRANULARITIES:
+            values = buckets[(granularity, bucket_start(job.timestamp, granularity), job.trade)]
+            values["job_count"] += 1
+            values["total_bid_sum"] += job.total_bid
+            values["profit_margin_sum"] += job.profit_margin
+            values["material_total_sum"] += job.material_total
+            values["labor_total_sum"] += job.labor_total
+    return buckets
+
+
+def record_rollups(session: Session, jobs: Sequence[Job]) -> None:
+    """Add ``jobs`` to their hour, day and week buckets within the caller's transaction."""
+
+    for (granularity, start, trade), values in _bucket_sums(jobs).items():
+        result = session.execute(
+            update(JobRollup)
+            .where(
+                JobRollup.granularity == granularity,
+                JobRollup.bucket_start == start,
+                JobRollup.trade == trade,
+            )
+            .values(**{column: getattr(JobRollup, column) + amount for column, amount in values.items()})
+        )
+        if result.rowcount == 0:
+            session.add(JobRollup(granularity=granularity, bucket_start=start, trade=trade, **values))
+
+
+def compact_hourly(session: Session, now: Optional[datetime] = None) -> int:
+    """Drop hourly rollups for whole days older than the retention window.
+
+    A day row is inserted from its hours when it is missing, so compaction
+    never loses totals. Returns the number of hourly rows removed; the caller
+    commits.
+    """
+
+    now = now or datetime.utcnow()
+    cutoff = bucket_start(now - timedelta(seconds=settings.rollup_hourly_retention), DAY)
+    old_hours = JobRollup.granularity == HOUR, JobRollup.bucket_start < cutoff
+
+    hours = session.exec(select(JobRollup).where(*old_hours)).all()
+    if not hours:
+        return 0
+
+    days: Dict[BucketKey, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(("job_count", *SUM_COLUMNS), 0))
+    for row in hours:
+        values = days[(DAY, bucket_start(row.bucket_start, DAY), row.trade)]
+        for column in values:
+            values[column] += getattr(row, column)
+
+    for (granularity, start, trade), values in days.items():
+        if session.get(JobRollup, (granularity, start, trade)) is None:
+            session.add(JobRollup(granularity=granularity, bucket_start=start, trade=trade, **values))
+
+    session.execute(delete(JobRollup).where(*old_hours))
+    logger.info("Compacted %d hourly rollups older than %s", len(hours), cutoff.isoformat())
+    return len(hours)
+
+
+def rebuild_rollups(session: Session) -> None:
+    """Recompute every rollup row from the ``job`` table (without committing)."""
+
+    session.execute(delete(JobRollup))
+    rows = session.exec(
+        select(Job.trade, Job.timestamp, Job.total_bid, Job.profit_margin, Job.material_total, Job.labor_total)
+    ).all()
+    for (granularity, start, trade), values in _bucket_sums(rows).items():
+        session.add(JobRollup(granularity=granularity, bucket_start=start, trade=trade, **values))
+    compact_hourly(session)
+
+
+def timeseries(
+    session: Session,
+    granularity: str,
+    trade: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Dict[str, object]]:
+    """Return per-trade points for buckets starting in ``[start, end)``, oldest first.
+
+    Only rollup rows are read. Shares are fractions of the bucket's total bid.
+    """
+
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    query = select(JobRollup).where(JobRollup.granularity == granularity)
+    if trade:
+        query = query.where(JobRollup.trade == trade.lower())
+    if start:
+        query = query.where(JobRollup.bucket_start >= bucket_start(naive_utc(start), granularity))
+    if end:
+        query = query.where(JobRollup.bucket_start < naive_utc(end))
+    rows = session.exec(
+        query.order_by(JobRollup.bucket_start, JobRollup.trade).limit(settings.rollup_max_points)
+    ).all()
+
+    points = []
+    for row in rows:
+        count = row.job_count or 1
+        bid_sum = row.total_bid_sum or 1.0
+        points.append(
+            {
+                "bucket_start": row.bucket_start,
+                "trade": row.trade,
+                "job_count": row.job_count,
+                "total_bid": round(row.total_bid_sum, 2),
+                "average_bid": round(row.total_bid_sum / count, 2),
+                "average_profit_margin": round(row.profit_margin_sum / count, 4),
+                "material_share": round(row.material_total_sum / bid_sum, 4),
+                "labor_share": round(row.labor_total_sum / bid_sum, 4),
+            }
+        )
+    return points
+
+
+def _compact_and_commit(session: Session) -> bool:
+    compact_hourly(session)
+    session.commit()
+    return True
+
+
+async def _compact() -> bool:
+    return await run_in_session(_compact_and_commit)
+
+
+rollup_compactor = PeriodicRefresher("rollup-compaction", _compact, interval=settings.rollup_compaction_interval)
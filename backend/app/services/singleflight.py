@@ -0,0 +1,75 @@
+"""Single-flight coalescing of duplicate in-flight upstream calls."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.services import deadline
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one execution.
+
+    The first caller for a key starts ``fn`` as a task; callers arriving while
+    it runs await the same task. Once started, the call runs to completion
+    even if every caller has given up, so a slow provider still fills the
+    cache for later requests. For the same reason it runs outside the request
+    budget of the caller that started it: each caller instead waits at most
+    for what is left of its own budget and then gets ``default``. With
+    ``share_errors`` disabled, a failure is raised to the caller that started
+    the call while the other waiters retry on their own.
+    """
+
+    def __init__(self, share_errors: bool = True):
+        self.share_errors = share_errors
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._in_flight
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        share_errors: Optional[bool] = None,
+        default: Any = None,
+    ) -> Any:
+        """Return the result of ``fn()``, sharing it with concurrent callers of ``key``."""
+
+        task = self._in_flight.get(key)
+        leader = task is None
+        if leader:
+            self.calls += 1
+            # Detached from the caller's budget on purpose, so ResilientTransport
+            # does not cut its timeouts to it and the call may run for the full
+            # provider timeout. The call is shared and runs to completion for
+            # later callers; each waiter stops at its own budget instead.
+            task = asyncio.get_running_loop().create_task(fn(), context=deadline.detached())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+
+        left = deadline.remaining()
+        finished, _ = await asyncio.wait((task,), timeout=None if left is None else max(left, 0.0))
+        if not finished:
+            return default
+
+        try:
+            return task.result()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            share = self.share_errors if share_errors is None else share_errors
+            if leader or share:
+                raise
+            return await fn()
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Nobody may be waiting any more; retrieve the error so it is not reported as lost.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,103 @@
+"""Dependency-driven concurrent execution of pipeline stages."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from app.services import deadline
+
+logger = logging.getLogger(__name__)
+
+_REQUIRED = object()
+
+
+@dataclass
+class Stage:
+    """A unit of pipeline work and the stages whose results it consumes.
+
+    ``run`` receives a mapping of dependency name to result. When ``fallback``
+    is provided, any error or timeout in the stage is logged and the fallback
+    value is used instead, so dependents still run, and the stage is recorded
+    as degraded on the request budget. Stages with a fallback also stop
+    waiting once the request budget is spent. Stages without a fallback are
+    required: their failure cancels the remaining stages and is raised.
+    """
+
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    requires: Tuple[str, ...] = ()
+    fallback: Any = field(default=_REQUIRED)
+    timeout: Optional[float] = None
+
+    @property
+    def required(self) -> bool:
+        return self.fallback is _REQUIRED
+
+
+def _validate(stages: Dict[str, Stage]) -> None:
+    for stage in stages.values():
+        for dependency in stage.requires:
+            if dependency not in stages:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'")
+
+    visiting, done = set(), set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Stage dependency cycle detected at '{name}'")
+        visiting.add(name)
+        for dependency in stages[name].requires:
+            visit(dependency)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in stages:
+        visit(name)
+
+
+async def _execute(stage: Stage, tasks: Dict[str, "asyncio.Task[Any]"]) -> Any:
+    inputs = {dependency: await tasks[dependency] for dependency in stage.requires}
+
+    timeout = stage.timeout if stage.required else deadline.stage_timeout(stage.timeout)
+    try:
+        if timeout is not None:
+            return await asyncio.wait_for(stage.run(inputs), timeout)
+        return await stage.run(inputs)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        if stage.required:
+            raise
+        logger.warning("Stage '%s' failed, using fallback: %r", stage.name, exc)
+        deadline.degrade(stage.name)
+        return stage.fallback
+
+
+async def run_stages(stages: Iterable[Stage]) -> Dict[str, Any]:
+    """Run ``stages`` concurrently, each as soon as its dependencies finish.
+
+    Returns a mapping of stage name to result. If a required stage fails, every
+    stage still pending is cancelled before the error propagates.
+    """
+
+    graph = {stage.name: stage for stage in stages}
+    _validate(graph)
+
+    tasks: Dict[str, asyncio.Task[Any]] = {}
+    for name, stage in graph.items():
+        tasks[name] = asyncio.ensure_future(_execute(stage, tasks))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        # Collect every outcome so sibling failures are not reported as unretrieved.
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,491 @@
+"""Asynchronous job submission: a durable queue, a worker pool and progress events.
+
+``POST /jobs?async=true`` stores the request as a :class:`JobSubmission` row
+and returns its ``job_id`` at once. Every process runs a fixed pool of worker
+tasks that poll the table and claim queued rows with a conditional update, so
+each row is leased to exactly one worker across all processes. The lease is
+renewed while the job runs; a row whose lease expired (its process died) is
+claimed again, up to ``submission_max_attempts`` runs. A job whose bid was
+already stored is only marked completed, never priced twice.
+
+Stage-by-stage progress is published to the :class:`ProgressFeed` of the
+process running the job and written to the row as its current ``stage``;
+status and event streams served by any other process poll the row.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, func, or_, update
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.db.session import run_in_session
+from app.models.job import Job
+from app.models.submission import JobSubmission
+from app.services.pipeline import process_job
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED = (COMPLETED, FAILED)
+
+# Rows looked at per claim attempt; the rest wait for the next poll.
+CLAIM_BATCH = 8
+
+Claimed = Tuple[str, Dict[str, Any], Optional[float], bool]
+
+
+class SubmissionQueueFull(RuntimeError):
+    """Raised when ``submission_max_pending`` jobs are already waiting."""
+
+
+class ProgressFeed:
+    """In-memory progress events per job, replayed to late subscribers.
+
+    Each event is a dict with at least ``job_id`` and ``status``. Only the
+    process running a job publishes its events. Once a job finishes, or is
+    handed back to the queue for another process, its events are dropped
+    ``retention`` seconds after the last one.
+    """
+
+    def __init__(self, retention: Optional[float] = None):
+        self.retention = settings.submission_progress_retention if retention is None else retention
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._subscribers: Dict[str, Set["asyncio.Queue[Dict[str, Any]]"]] = {}
+
+    def publish(self, job_id: str, status: str, **fields: Any) -> None:
+        event = {"job_id": job_id, "status": status, **fields}
+        self._events.setdefault(job_id, []).append(event)
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+        if status != RUNNING:
+            asyncio.get_running_loop().call_later(self.retention, self._forget, job_id)
+
+    def latest(self, job_id: str) -> Optional[Dict[str, Any]]:
+        events = self._events.get(job_id)
+        return events[-1] if events else None
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._events
+
+    async def subscribe(self, job_id: str, keepalive: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield every event of ``job_id`` so far and then new ones until it finishes.
+
+        With ``keepalive``, ``None`` is yielded whenever that many seconds pass
+        without an event.
+        """
+
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        for event in self._events.get(job_id, ()):
+            queue.put_nowait(event)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event["status"] in FINISHED:
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    def _forget(self, job_id: str) -> None:
+        latest = self.latest(job_id)
+        if latest is not None and latest["status"] != RUNNING:
+            self._events.pop(job_id, None)
+
+
+def _insert(session: Session, submission: JobSubmission, max_pending: int) -> None:
+    pending = session.exec(
+        select(func.count()).select_from(JobSubmission).where(JobSubmission.status == QUEUED)
+    ).one()
+    if pending >= max_pending:
+        raise SubmissionQueueFull(f"{pending} jobs are already queued")
+    session.add(submission)
+    session.commit()
+
+
+def _purge(session: Session, cutoff: datetime) -> None:
+    """Drop finished rows last updated before ``cutoff``."""
+
+    session.execute(
+        delete(JobSubmission).where(JobSubmission.status.in_(FINISHED), JobSubmission.updated_at < cutoff)
+    )
+    session.commit()
+
+
+def _claimable(now: datetime):
+    expired = or_(JobSubmission.lease_expires_at.is_(None), JobSubmission.lease_expires_at < now)
+    return or_(JobSubmission.status == QUEUED, and_(JobSubmission.status == RUNNING, expired))
+
+
+def _claim_next(
+    session: Session, owner: str, lease: float, max_attempts: int
+) -> Tuple[Optional[Claimed], List[str]]:
+    """Lease the oldest claimable row to ``owner``.
+
+    Returns its ``(job_id, payload, deadline, stored)``, where ``stored`` says
+    the bid already exists, and the ids of rows given up on because their
+    earlier runs never finished ``max_attempts`` times.
+    """
+
+    now = datetime.utcnow()
+    candidates = session.exec(
+        select(JobSubmission.job_id, JobSubmission.attempts)
+        .where(_claimable(now))
+        .order_by(JobSubmission.submitted_at)
+        .limit(CLAIM_BATCH)
+    ).all()
+
+    abandoned: List[str] = []
+    for job_id, attempts in candidates:
+        if attempts >= max_attempts:
+            values = {
+                "status": FAILED,
+                "error": f"Gave up after {attempts} interrupted attempts",
+                "owner": None,
+                "lease_expires_at": None,
+            }
+        else:
+            values = {
+                "status": RUNNING,
+                "stage": None,
+                "owner": owner,
+                "lease_expires_at": now + timedelta(seconds=lease),
+                "attempts": JobSubmission.attempts + 1,
+            }
+        # The claimable condition is checked again by the update itself, so
+        # only one of several workers racing for the row gets it.
+        result = session.execute(
+            update(JobSubmission)
+            .where(JobSubmission.job_id == job_id, _claimable(now))
+            .values(updated_at=now, **values)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        if result.rowcount != 1:
+            continue
+        if values["status"] == FAILED:
+            abandoned.append(job_id)
+            continue
+
+        submission = session.get(JobSubmission, job_id)
+        stored = session.get(Job, job_id) is not None
+        if stored:
+            _finish(session, job_id, owner, COMPLETED)
+        return (job_id, dict(submission.payload), submission.deadline, stored), abandoned
+    return None, abandoned
+
+
+def _owned(session: Session, job_id: str, owner: str) -> Optional[JobSubmission]:
+    submission = session.get(JobSubmission, job_id)
+    if submission is None or submission.owner != owner or submission.status != RUNNING:
+        return None
+    return submission
+
+
+def _renew(session: Session, job_id: str, owner: str, lease: float, stage: Optional[str]) -> bool:
+    """Extend ``owner``'s lease on ``job_id`` and record its stage; ``False`` if the lease was lost."""
+
+    submission = _owned(session, job_id, owner)
+    if submission is None:
+        return False
+    submission.lease_expires_at = datetime.utcnow() + timedelta(seconds=lease)
+    submission.stage = stage
+    session.commit()
+    return True
+
+
+def _release(session: Session, job_id: str, owner: str) -> None:
+    """Hand a job interrupted by shutdown back to the queue without counting the attempt."""
+
+    submission = _owned(session, job_id, owner)
+    if submission is None:
+        return
+    submission.status = QUEUED
+    submission.stage = None
+    submission.owner = None
+    submission.lease_expires_at = None
+    submission.attempts = max(submission.attempts - 1, 0)
+    submission.updated_at = datetime.utcnow()
+    session.commit()
+
+
+def _finish(
+    session: Session, job_id: str, owner: str, status: str, error: Optional[str] = None
+) -> Tuple[str, Optional[str]]:
+    """Record the outcome of ``owner``'s run and return the status actually reached.
+
+    A run that failed after the bid was stored (for example by a previous
+    owner whose lease expired) still counts as completed. A row leased to
+    another worker meanwhile is left to that worker.
+    """
+
+    if status == FAILED and session.get(Job, job_id) is not None:
+        status, error = COMPLETED, None
+    submission = _owned(session, job_id, owner)
+    if submission is not None:
+        submission.status = status
+        submission.error = error
+        submission.stage = None
+        submission.owner = None
+        submission.lease_expires_at = None
+        submission.updated_at = datetime.utcnow()
+        session.commit()
+    return status, error
+
+
+def _status(session: Session, job_id: str) -> Optional[Dict[str, Any]]:
+    submission = session.get(JobSubmission, job_id)
+    if submission is not None:
+        return {
+            "job_id": job_id,
+            "status": submission.status,
+            "stage": submission.stage,
+            "error": submission.error,
+            "attempts": submission.attempts,
+            "submitted_at": submission.submitted_at,
+            "updated_at": submission.updated_at,
+        }
+    job = session.get(Job, job_id)
+    if job is not None:
+        # Jobs created synchronously have no submission row.
+        return {"job_id": job_id, "status": COMPLETED, "submitted_at": job.timestamp, "updated_at": job.timestamp}
+    return None
+
+
+class SubmissionQueue:
+    """Bounded worker pool draining the durable submission queue.
+
+    Several processes may run one each against the same database.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = workers or settings.submission_workers
+        self.max_pending = max_pending or settings.submission_max_pending
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.feed = ProgressFeed()
+        self._tasks: List[asyncio.Task] = []
+        self._busy: Set[asyncio.Task] = set()
+        self._closed = False
+        self._wakeup = asyncio.Event()
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def start(self) -> None:
+        """Purge old finished submissions and start the workers on the running loop."""
+
+        async with self._start_lock:
+            if self.running:
+                return
+            self._closed = False
+            self._wakeup = asyncio.Event()
+            cutoff = datetime.utcnow() - timedelta(seconds=settings.submission_retention)
+            await run_in_session(_purge, cutoff)
+
+            loop = asyncio.get_running_loop()
+            self._tasks = [
+                loop.create_task(self._work(), name=f"submission-worker-{index}") for index in range(self.workers)
+            ]
+
+    async def submit(self, payload: Dict[str, Any], deadline_seconds: Optional[float] = None) -> str:
+        """Store ``payload`` for background processing and return its ``job_id``."""
+
+        if self._closed:
+            raise RuntimeError("Job submission queue is shut down")
+        if not self.running:
+            await self.start()
+
+        job_id = str(uuid.uuid4())
+        submission = JobSubmission(job_id=job_id, payload=payload, deadline=deadline_seconds)
+        await run_in_session(_insert, submission, self.max_pending)
+        self._wakeup.set()
+        return job_id
+
+    async def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored state of ``job_id`` with its latest stage, or ``None`` if unknown."""
+
+        status = await run_in_session(_status, job_id)
+        if status is None:
+            return None
+        latest = self.feed.latest(job_id)
+        if latest is not None and latest["status"] == RUNNING and status["status"] == RUNNING:
+            status["stage"] = latest.get("stage") or status.get("stage")
+        return status
+
+    async def events(
+        self, job_id: str, keepalive: Optional[float] = None
+    ) -> Optional[AsyncIterator[Optional[Dict[str, Any]]]]:
+        """Return the progress events of ``job_id``, or ``None`` if it is unknown.
+
+        Jobs this process has picked up stream from the in-memory feed; any
+        other job, including one still waiting for a worker, is followed by
+        polling its row until it finishes.
+        """
+
+        latest = self.feed.latest(job_id)
+        if latest is not None and latest["status"] != QUEUED:
+            return self.feed.subscribe(job_id, keepalive)
+        status = await self.status(job_id)
+        if status is None:
+            return None
+        return self._poll(status, keepalive)
+
+    async def stop(self) -> None:
+        """Stop taking jobs, give running ones ``submission_shutdown_timeout`` to finish, then cancel them.
+
+        Cancelled jobs are released back to the queue for another worker or the next start.
+        """
+
+        self._closed = True
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            if task not in self._busy:
+                task.cancel()
+        busy = [task for task in tasks if task in self._busy]
+        if busy:
+            await asyncio.wait(busy, timeout=settings.submission_shutdown_timeout)
+        for task in busy:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _poll(
+        self, status: Dict[str, Any], keepalive: Optional[float]
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        job_id = status["job_id"]
+        last = None
+        idle = 0.0
+        while True:
+            current = (status["status"], status.get("stage"), status.get("error"))
+            if current != last:
+                last, idle = current, 0.0
+                event = {"job_id": job_id, "status": current[0]}
+                if current[1]:
+                    event["stage"] = current[1]
+                if current[2]:
+                    event["error"] = current[2]
+                yield event
+            elif keepalive is not None and idle >= keepalive:
+                idle = 0.0
+                yield None
+            if current[0] in FINISHED:
+                return
+            await asyncio.sleep(settings.submission_poll_interval)
+            idle += settings.submission_poll_interval
+            status = await self.status(job_id) or status
+
+    async def _work(self) -> None:
+        task = asyncio.current_task()
+        while not self._closed:
+            self._busy.add(task)
+            try:
+                claimed, abandoned = await run_in_session(
+                    _claim_next, self.owner, settings.submission_lease, settings.submission_max_attempts
+                )
+                for job_id in abandoned:
+                    logger.error("Job submission %s was interrupted too often; giving up", job_id)
+                    self.feed.publish(job_id, FAILED, error="Gave up after repeated interrupted attempts")
+                if claimed is not None:
+                    await self._run(*claimed)
+                    continue
+            except Exception:
+                logger.exception("Job submission worker failed; retrying")
+            finally:
+                self._busy.discard(task)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.submission_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _run(self, job_id: str, payload: Dict[str, Any], deadline_seconds: Optional[float], stored: bool) -> None:
+        if stored:
+            self.feed.publish(job_id, COMPLETED)
+            return
+
+        stage: List[Optional[str]] = [None]
+        changed = asyncio.Event()
+
+        def progress(name: str, state: str) -> None:
+            if state == "started":
+                stage[0] = name
+                changed.set()
+            self.feed.publish(job_id, RUNNING, stage=name, state=state)
+
+        self.feed.publish(job_id, RUNNING)
+        renewer = asyncio.get_running_loop().create_task(self._keep_lease(job_id, stage, changed))
+        if deadline_seconds is None:
+            deadline_seconds = settings.submission_deadline
+
+        outcome: Dict[str, Any] = {"status": FAILED, "error": "Job processing was interrupted"}
+        try:
+            job = await process_job(payload, deadline_seconds=deadline_seconds, job_id=job_id, progress=progress)
+            outcome = {"status": COMPLETED, "total_bid": job.get("total_bid"), "degraded": job.get("degraded", [])}
+        except asyncio.CancelledError:
+            outcome = {"status": QUEUED}
+            raise
+        except Exception as exc:
+            if not isinstance(exc, ValueError):
+                logger.exception("Async job %s failed", job_id)
+            outcome = {"status": FAILED, "error": str(exc) or exc.__class__.__name__}
+        finally:
+            renewer.cancel()
+            try:
+                if outcome["status"] == QUEUED:
+                    await run_in_session(_release, job_id, self.owner)
+                else:
+                    status, error = await run_in_session(
+                        _finish, job_id, self.owner, outcome["status"], outcome.get("error")
+                    )
+                    if status != outcome["status"]:
+                        outcome = {"status": status}
+                    elif error is not None:
+                        outcome["error"] = error
+            except Exception:
+                logger.exception("Could not record the outcome of job submission %s", job_id)
+            finally:
+                # Subscribers wait for a final event, so one is always published.
+                self.feed.publish(job_id, **outcome)
+
+    async def _keep_lease(self, job_id: str, stage: List[Optional[str]], changed: asyncio.Event) -> None:
+        """Renew the lease a third of the way through it, and write each new stage as it starts."""
+
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), settings.submission_lease / 3)
+            except asyncio.TimeoutError:
+                pass
+            changed.clear()
+            try:
+                kept = await run_in_session(_renew, job_id, self.owner, settings.submission_lease, stage[0])
+            except Exception:
+                logger.exception("Could not renew the lease of job submission %s", job_id)
+                continue
+            if not kept:
+                logger.warning("Lost the lease of job submission %s to another worker", job_id)
+                return
+
+
+job_queue = SubmissionQueue()
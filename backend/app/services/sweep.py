@@ -0,0 +1,214 @@
+"""Vectorized what-if pricing over a grid of dimensions and margins.
+
+One enrichment (geocode, prices, labor rate, weather) is fetched for the
+request, then the ``normalize_data`` metrics and ``compute_bid`` formulas are
+evaluated for every variant at once as NumPy arrays. The arithmetic mirrors
+the scalar path operation for operation, and rounding goes through
+:func:`py_round` so each row equals what ``compute_bid`` returns for the same
+inputs.
+"""
+from __future__ import annotations
+
+import itertools
+import sys
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.plugins.plans import PricingPlan
+from app.services.pipeline import get_plugin
+
+settings = get_settings()
+
+SWEEP_COLUMNS = (
+    "length",
+    "width",
+    "depth",
+    "margin",
+    "material_total",
+    "labor_hours",
+    "labor_total",
+    "overhead",
+    "profit_amount",
+    "total_bid",
+)
+
+_TIE_TOLERANCE = 1e-9
+
+
+def py_round(values: np.ndarray, digits: int) -> np.ndarray:
+    """Round like the builtin :func:`round`, element by element.
+
+    ``np.round`` scales by ``10**digits`` before rounding, which can flip the
+    result for values within an ulp of a half; those few elements are rounded
+    with the builtin instead.
+    """
+
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, digits)
+    scaled = values * 10.0 ** digits
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= _TIE_TOLERANCE * np.maximum(1.0, np.abs(scaled))
+    for index in zip(*np.nonzero(near_tie)):
+        rounded[index] = round(float(values[index]), digits)
+    return rounded
+
+
+def python_sum(columns: Sequence[np.ndarray], size: int) -> np.ndarray:
+    """Add ``columns`` left to right exactly as ``sum()`` adds a list of floats.
+
+    Python 3.12 made ``sum()`` use Neumaier compensated summation for floats,
+    so that is reproduced on those versions.
+    """
+
+    if not columns:
+        return np.zeros(size)
+    total = columns[0] + 0.0
+    if sys.version_info < (3, 12):
+        for column in columns[1:]:
+            total = total + column
+        return total
+
+    compensation = np.zeros(size)
+    for column in columns[1:]:
+        step = total + column
+        compensation += np.where(np.abs(total) >= np.abs(column), (total - step) + column, (column - step) + total)
+        total = step
+    return np.where((compensation != 0) & np.isfinite(compensation), total + compensation, total)
+
+
+def _or(*arrays: np.ndarray) -> np.ndarray:
+    """Vectorized ``a or b or ...`` for float arrays (zero is falsy)."""
+
+    result = arrays[-1]
+    for array in reversed(arrays[:-1]):
+        result = np.where(array != 0, array, result)
+    return result
+
+
+def grid_metrics(lengths: np.ndarray, widths: np.ndarray, depths: np.ndarray) -> Dict[str, np.ndarray]:
+    """Return the rounded ``normalize_data`` metrics for each variant."""
+
+    area_sqft = lengths * widths
+    linear_ft = 2 * (lengths + widths)
+    volume_cuft = area_sqft * depths
+    volume_cy = np.where(volume_cuft != 0, volume_cuft / 27, 0.0)
+    return {
+        "length_ft": py_round(lengths, 2),
+        "width_ft": py_round(widths, 2),
+        "depth_ft": py_round(depths, 2),
+        "area_sqft": py_round(area_sqft, 2),
+        "linear_ft": py_round(linear_ft, 2),
+        "volume_cuft": py_round(volume_cuft, 2),
+        "volume_cy": py_round(volume_cy, 2),
+    }
+
+
+def evaluate_grid(
+    plan: PricingPlan,
+    material_costs: Mapping[str, float],
+    labor_rate: float,
+    weather_modifier: float,
+    metrics: Mapping[str, np.ndarray],
+    margins: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Apply the ``compute_bid`` formulas to every variant and return rounded totals."""
+
+    size = len(margins)
+    ones = np.ones(size)
+
+    material_columns: List[np.ndarray] = []
+    for material_name, unit_cost in material_costs.items():
+        rule = plan.rule_for(material_name)
+        metric_value = _or(metrics[rule.metric], metrics["volume_cy"], metrics["area_sqft"], ones)
+
+        quantity = rule.base_quantity + metric_value * rule.multiplier
+        if rule.min_quantity:
+            quantity = np.maximum(quantity, rule.min_quantity)
+        if rule.round_up:
+            quantity = np.ceil(quantity)
+        if rule.precision >= 0:
+            quantity = py_round(quantity, rule.precision)
+
+        material_columns.append(py_round(quantity * unit_cost, 2))
+
+    material_total = python_sum(material_columns, size)
+
+    labor_metric_value = _or(metrics[plan.labor_metric], metrics["area_sqft"], metrics["volume_cy"], ones)
+    labor_hours = np.maximum(labor_metric_value * plan.labor_hours_per_unit, plan.min_labor_hours)
+    labor_total = labor_hours * labor_rate
+
+    overhead = (material_total + labor_total) * plan.overhead_rate
+    subtotal = material_total + labor_total + overhead
+    weather_adjusted_subtotal = subtotal * (1 + weather_modifier)
+    profit_amount = weather_adjusted_subtotal * margins
+    total_bid = weather_adjusted_subtotal + profit_amount
+
+    return {
+        "margin": py_round(margins, 4),
+        "material_total": py_round(material_total, 2),
+        "labor_hours": py_round(labor_hours, 2),
+        "labor_total": py_round(labor_total, 2),
+        "overhead": py_round(overhead, 2),
+        "profit_amount": py_round(profit_amount, 2),
+        "total_bid": py_round(total_bid, 2),
+    }
+
+
+def _axis(values: Optional[Sequence[float]], default: float) -> List[float]:
+    return [float(value) for value in values] if values else [default]
+
+
+async def quote_sweep(
+    payload: Dict[str, Any],
+    lengths: Optional[Sequence[float]] = None,
+    widths: Optional[Sequence[float]] = None,
+    depths: Optional[Sequence[float]] = None,
+    margins: Optional[Sequence[float]] = None,
+) -> Dict[str, Any]:
+    """Price every combination of the given axes for the job in ``payload``.
+
+    Axes that are not given stay at the payload's own value. Returns the shared
+    enrichment inputs and a ``columns``/``rows`` table with one row per
+    variant, in ``itertools.product`` order.
+    """
+
+    plugin = get_plugin(payload.get("trade", ""))
+    normalized = await plugin.normalize_data(payload)
+    length, width, depth = plugin.dimensions(payload)
+    axes = [
+        _axis(lengths, length),
+        _axis(widths, width),
+        _axis(depths, depth),
+        _axis(margins, normalized["margin"]),
+    ]
+    variants = int(np.prod([len(axis) for axis in axes]))
+    if variants > settings.sweep_max_variants:
+        raise ValueError(f"Sweep is limited to {settings.sweep_max_variants} variants, got {variants}")
+
+    enriched = await plugin.fetch_public_data(dict(normalized))
+    labor_rate = enriched.get("labor_rate", 25.0)
+    weather_modifier = float(enriched.get("weather_modifier", 0.0))
+
+    grid = np.array(list(itertools.product(*axes)), dtype=float).reshape(variants, 4)
+    lengths_, widths_, depths_, margins_ = grid.T
+    totals = evaluate_grid(
+        plugin.plan,
+        enriched["material_costs"],
+        labor_rate,
+        weather_modifier,
+        grid_metrics(lengths_, widths_, depths_),
+        margins_,
+    )
+    table = np.column_stack([lengths_, widths_, depths_] + [totals[column] for column in SWEEP_COLUMNS[3:]])
+
+    return {
+        "trade": plugin.trade_name,
+        "location": payload.get("location", ""),
+        "labor_rate": round(labor_rate, 2),
+        "weather_modifier": round(weather_modifier, 3),
+        "material_costs": {name: round(cost, 2) for name, cost in enriched["material_costs"].items()},
+        "variants": variants,
+        "columns": list(SWEEP_COLUMNS),
+        "rows": table.tolist(),
+    }
@@ -1,29 +1,82 @@
 """Weather adjustment utilities."""
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Optional, Tuple
 
 import httpx
 
+from app.core import metrics
 from app.core.config import get_settings
+from app.services import deadline, providers
+from app.services.cache import MISSING, TTLCache
+from app.services.singleflight import SingleFlight
 
 settings = get_settings()
 
+GridCell = Tuple[float, float]
+
+weather_cache = TTLCache(settings.weather_cache_size, settings.weather_cache_ttl)
+weather_flight = SingleFlight(share_errors=settings.singleflight_share_errors)
+metrics.register_cache("weather", lambda: weather_cache)
+
+
+def grid_cell(lat: float, lon: float, precision: Optional[int] = None) -> GridCell:
+    """Snap coordinates to the weather grid (0.1° is roughly 11 km)."""
+
+    digits = settings.weather_grid_precision if precision is None else precision
+    return (round(float(lat), digits), round(float(lon), digits))
 
-async def fetch_weather_modifier(lat: float, lon: float) -> Optional[float]:
-    """Fetch a simple weather-based cost modifier from OpenWeatherMap."""
+
+async def fetch_weather_modifier(
+    lat: float, lon: float, client: Optional[httpx.AsyncClient] = None
+) -> Optional[float]:
+    """Return the weather cost modifier for the grid cell containing ``lat``/``lon``.
+
+    Modifiers are cached per cell, and concurrent requests for a cell that is
+    not cached yet share a single OpenWeatherMap call.
+    """
 
     if not settings.openweather_api_key:
         return None
 
+    cell = grid_cell(lat, lon)
+    cached = weather_cache.get(cell)
+    if cached is not MISSING:
+        return cached
+
+    modifier = await weather_flight.do(cell, lambda: _load_cell(cell, client))
+    if modifier is None:
+        deadline.degrade("weather_modifier")
+    return modifier
+
+
+def cached_weather_modifier(lat: float, lon: float) -> Any:
+    """Return the cached modifier for the cell containing ``lat``/``lon``, or :data:`MISSING`."""
+
+    return weather_cache.get(grid_cell(lat, lon))
+
+
+async def _load_cell(cell: GridCell, client: Optional[httpx.AsyncClient]) -> Optional[float]:
+    modifier = await _query_openweather(cell[0], cell[1], client)
+    if modifier is not None:
+        weather_cache.set(cell, modifier)
+    return modifier
+
+
+async def _query_openweather(
+    lat: float, lon: float, client: Optional[httpx.AsyncClient] = None
+) -> Optional[float]:
+    """Fetch a simple weather-based cost modifier from OpenWeatherMap."""
+
     url = "https://api.openweathermap.org/data/2.5/weather"
     params = {"lat": lat, "lon": lon, "appid": settings.openweather_api_key, "units": "imperial"}
 
+    client = client or providers.get_client(providers.OPENWEATHER)
+
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
     except httpx.HTTPError:
         return None
 
@@ -0,0 +1,163 @@
+"""Group-commit write-behind queue for job persistence."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config import get_settings
+from app.db.session import run_db
+from app.services.persistence import save_jobs
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+DIRECT = "direct"
+WRITE_BEHIND = "write_behind"
+
+_Pending = Tuple[Any, "asyncio.Future[None]"]
+
+# Errors caused by the contents of a row. Anything else (a locked or full
+# database, a lost connection) fails the whole batch at once.
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+class WriteBehindQueue:
+    """Buffer rows in memory and let one writer task insert them in batches.
+
+    The writer flushes as soon as ``batch_size`` rows are waiting, or
+    ``max_delay`` seconds after the first row of a batch arrived. Each caller
+    gets a future that resolves once its row is committed (or carries the
+    error). At most ``max_pending`` rows are buffered; further callers wait
+    for room. :meth:`stop` stops accepting rows and drains the buffer.
+    """
+
+    def __init__(
+        self,
+        save: Callable[[Sequence[Any]], None],
+        batch_size: Optional[int] = None,
+        max_delay: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.save = save
+        self.batch_size = batch_size or settings.write_behind_batch_size
+        self.max_delay = settings.write_behind_max_delay if max_delay is None else max_delay
+        self.max_pending = max_pending or settings.write_behind_max_pending
+        self.flushes = 0
+        self.written = 0
+        self._pending: List[_Pending] = []
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._reset()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop."""
+
+        if self.running:
+            return
+        self._closed = False
+        # Fresh primitives, since a restart may happen on another event loop.
+        self._reset()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="write-behind")
+
+    def _reset(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_pending)
+
+    async def submit(self, row: Any) -> "asyncio.Future[None]":
+        """Queue ``row`` and return a future that resolves once it is durable."""
+
+        if self._closed:
+            raise RuntimeError("Write-behind queue is shut down")
+        if not self.running:
+            self.start()
+
+        await self._slots.acquire()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        self._wakeup.set()
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+        return future
+
+    async def write(self, row: Any) -> None:
+        """Queue ``row`` and wait until it has been committed."""
+
+        await (await self.submit(row))
+
+    async def stop(self) -> None:
+        """Reject new rows, flush everything already queued and stop the writer."""
+
+        self._closed = True
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._wakeup.set()
+        self._full.set()
+        await task
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if not self._closed and len(self._pending) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch, self._pending = self._pending[: self.batch_size], self._pending[self.batch_size :]
+            if len(self._pending) < self.batch_size:
+                self._full.clear()
+            if not self._pending:
+                self._wakeup.clear()
+
+            if batch:
+                await self._flush(batch)
+            if self._closed and not self._pending:
+                return
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        try:
+            await run_db(self.save, [row for row, _ in batch])
+        except Exception as exc:
+            if len(batch) > 1 and isinstance(exc, ROW_ERRORS):
+                # Retry rows one at a time so one bad row does not fail its neighbours.
+                logger.warning("Write-behind batch of %d failed (%s); retrying rows individually", len(batch), exc)
+                for item in batch:
+                    await self._flush([item])
+                return
+            logger.exception("Write-behind insert of %d rows failed", len(batch))
+            self._resolve(batch, exc)
+        else:
+            self.flushes += 1
+            self.written += len(batch)
+            self._resolve(batch, None)
+
+    def _resolve(self, batch: List[_Pending], error: Optional[BaseException]) -> None:
+        for _, future in batch:
+            self._slots.release()
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+job_writer = WriteBehindQueue(save_jobs)
+
+
+async def persist_job(payload: Dict) -> None:
+    """Store one generated job using the configured persistence mode."""
+
+    if settings.persistence_mode == WRITE_BEHIND:
+        await job_writer.write(payload)
+    else:
+        await run_db(save_jobs, [payload])
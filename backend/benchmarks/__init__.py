@@ -0,0 +1,4 @@
+"""Offline performance benchmarks for the bidding pipeline.
+
+Run from ``backend/`` with ``python -m benchmarks.run --help``.
+"""
@@ -0,0 +1,291 @@
+"""Run the offline benchmark scenarios and compare them with a stored baseline.
+
+Example::
+
+    python -m benchmarks.run --sizes 1000,100000 --latency 0.02 --failure-rate 0.05 \
+        --output results.json --baseline benchmarks/baseline.json
+
+Every scenario reports throughput and p50/p95/p99 latency in milliseconds.
+Results are written as JSON keyed by ``"<scenario>@<size>"``; with
+``--baseline`` each scenario is compared with the stored numbers and the run
+exits non-zero when a percentile regressed beyond ``--tolerance``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlmodel import Session
+
+from app.db.session import shutdown_db
+from app.services import geocoding, instructions, labor, materials, providers, weather
+from app.services.analytics import compute_summary
+from app.services.cache import StaleWhileRevalidateCache, TTLCache
+from app.services.history import encode_cursor, list_job_page
+from app.services.pipeline import PLUGIN_REGISTRY, process_job
+from app.services.singleflight import SingleFlight
+from benchmarks.seed import seed_database
+from benchmarks.stubs import StubProviders
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+PERCENTILES = (50, 95, 99)
+
+Scenario = Callable[[int], Awaitable[Any]]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def measure(scenario: Scenario, iterations: int, concurrency: int) -> Dict[str, Any]:
+    """Run ``scenario`` ``iterations`` times on ``concurrency`` workers and summarise the latencies."""
+
+    samples: List[float] = []
+    errors = 0
+    counter = iter(range(iterations))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                await scenario(index)
+            except Exception:
+                errors += 1
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_per_s": round(iterations / elapsed, 2) if elapsed else None,
+    }
+    for pct in PERCENTILES:
+        result[f"p{pct}_ms"] = round(percentile(samples, pct) * 1000, 3)
+    return result
+
+
+def _job_payload(rng: random.Random, trade: str) -> Dict[str, Any]:
+    return {
+        "trade": trade,
+        "location": rng.choice(["Fort Dodge, IA", "Ames, IA", "Austin, TX"]),
+        "dimensions": {"length": rng.uniform(5, 80), "width": rng.uniform(5, 40), "depth": rng.uniform(0.2, 1.5)},
+        "margin": 0.15,
+    }
+
+
+def reset_caches() -> None:
+    """Give every in-memory provider cache a clean slate (the on-disk geocode cache is off).
+
+    Labor rates and instruction steps start empty, as they do before the
+    startup refresh completes, and in-flight lookups are forgotten.
+    """
+
+    settings = geocoding.settings
+    geocoding.geocode_cache.memory = TTLCache(settings.geocode_cache_size, settings.geocode_cache_ttl)
+    geocoding.geocode_cache.path = None
+    geocoding.geocode_flight = SingleFlight(share_errors=settings.singleflight_share_errors)
+    weather.weather_cache.clear()
+    weather.weather_flight = SingleFlight(share_errors=settings.singleflight_share_errors)
+    materials.material_price_cache = StaleWhileRevalidateCache(
+        materials._load_live_price,
+        maxsize=settings.material_price_cache_size,
+        fresh_ttl=settings.material_price_fresh_ttl,
+        max_stale=settings.material_price_max_stale,
+    )
+    store = labor.labor_rate_store
+    labor.labor_rate_store = labor.LaborRateStore(store.occupations, store.areas)
+    instructions.instruction_cache = instructions.InstructionCache()
+
+
+async def warm_caches() -> None:
+    """Load labor rates and instruction steps the way application startup does."""
+
+    await labor.labor_rate_store.refresh()
+    instructions.instruction_cache.register(plugin.instruction_query for plugin in PLUGIN_REGISTRY.values())
+    await instructions.instruction_cache.refresh()
+
+
+def build_scenarios(size: int, engine, rng: random.Random) -> Dict[str, Scenario]:
+    trades = sorted(PLUGIN_REGISTRY)
+    material_names = ["concrete mix", "rebar", "gravel", "copper pipe", "pvc pipe", "ductwork"]
+
+    with Session(engine) as session:
+        middle = list_job_page(session, limit=1, offset=size // 2, include_total=False)["records"]
+    deep_cursor = encode_cursor(middle[0].timestamp, middle[0].job_id) if middle else None
+
+    async def compute_bid(index: int) -> None:
+        plugin = PLUGIN_REGISTRY[trades[index % len(trades)]]
+        normalized = await plugin.normalize_data(_job_payload(rng, plugin.trade_name))
+        normalized["material_costs"] = materials.baseline_material_costs(normalized["materials"])
+        normalized["labor_rate"] = 30.0
+        await plugin.compute_bid(normalized)
+
+    async def resolve_material_costs_cold(index: int) -> None:
+        reset_caches()
+        await materials.resolve_material_costs(material_names)
+
+    async def resolve_material_costs_warm(index: int) -> None:
+        await materials.resolve_material_costs(material_names)
+
+    async def process_job_cold(index: int) -> None:
+        reset_caches()
+        await process_job(_job_payload(rng, trades[index % len(trades)]))
+
+    async def process_job_warm(index: int) -> None:
+        await process_job(_job_payload(rng, trades[index % len(trades)]))
+
+    def in_session(fn: Callable[[Session], Any]) -> Scenario:
+        async def run(index: int) -> None:
+            with Session(engine) as session:
+                fn(session)
+
+        return run
+
+    scenarios: Dict[str, Scenario] = {
+        "compute_bid": compute_bid,
+        "resolve_material_costs_cold": resolve_material_costs_cold,
+        "resolve_material_costs_warm": resolve_material_costs_warm,
+        "process_job_cold": process_job_cold,
+        "process_job_warm": process_job_warm,
+        "list_jobs_first_page": in_session(lambda session: list_job_page(session, limit=20)),
+        "compute_summary": in_session(compute_summary),
+    }
+    if deep_cursor:
+        scenarios["list_jobs_deep_page"] = in_session(lambda session: list_job_page(session, limit=20, cursor=deep_cursor))
+    return scenarios
+
+
+async def run_size(size: int, engine, args: argparse.Namespace, stubs: StubProviders) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(args.seed)
+
+    await providers.startup(transport=stubs.transport())
+    reset_caches()
+    await warm_caches()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for name, scenario in build_scenarios(size, engine, rng).items():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            concurrency = args.concurrency if name.startswith(("process_job", "resolve")) else 1
+            if args.warmup:
+                await measure(scenario, min(args.warmup, args.iterations), concurrency)
+            results[f"{name}@{size}"] = {"scenario": name, "size": size, **await measure(scenario, args.iterations, concurrency)}
+            logging.getLogger(__name__).info("%s@%d: %s", name, size, results[f"{name}@{size}"])
+            if name.endswith("_cold"):
+                await warm_caches()
+    finally:
+        await providers.shutdown()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Annotate ``results`` with ratios to ``baseline`` and return the regressions."""
+
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if not reference:
+            continue
+        ratios = {}
+        for pct in PERCENTILES:
+            field = f"p{pct}_ms"
+            if reference.get(field):
+                ratios[field] = round(result[field] / reference[field], 3)
+                if ratios[field] > 1 + tolerance:
+                    regressions.append(f"{key} {field}: {reference[field]} -> {result[field]} ms")
+        result["vs_baseline"] = ratios
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the Bidder pipeline against stubbed providers.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma separated job counts for the seeded databases.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8, help="Workers for the pipeline scenarios.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds of injected provider latency.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of provider calls that fail.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenarios", type=lambda value: set(value.split(",")), default=None)
+    parser.add_argument("--data-dir", default=str(Path(tempfile.gettempdir()) / "bidder-benchmarks"),
+                        help="Where seeded databases are kept between runs.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--baseline", help="JSON report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before flagging, as a fraction.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the report to --baseline.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    for noisy in ("app", "httpx"):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+    Path(args.data_dir).mkdir(parents=True, exist_ok=True)
+
+    stubs = StubProviders(latency=args.latency, failure_rate=args.failure_rate, seed=args.seed)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for size in (int(value) for value in args.sizes.split(",")):
+            engine = seed_database(Path(args.data_dir) / f"bench_{size}.db", size, seed=args.seed)
+            results.update(asyncio.run(run_size(size, engine, args, stubs)))
+    finally:
+        shutdown_db()
+
+    report = {
+        "created": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {
+            "latency": args.latency,
+            "failure_rate": args.failure_rate,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+        },
+        "provider_requests": stubs.requests,
+        "provider_failures": stubs.failures,
+        "results": results,
+    }
+
+    regressions: List[str] = []
+    if args.baseline and args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(report, indent=2) + "\n")
+    elif args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
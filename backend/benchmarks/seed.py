@@ -0,0 +1,104 @@
+"""Seeded SQLite databases of synthetic jobs for the benchmarks."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from sqlalchemy import func, insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.db import session as db_session
+from app.db.session import build_engine, init_db
+from app.models.counter import Counter
+from app.models.job import Job
+from app.services import analytics, history, materials, rollups
+from app.services.pipeline import PLUGIN_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LOCATIONS = ["Fort Dodge, IA", "Ames, IA", "Austin, TX", "Denver, CO", "Portland, OR", "Albany, NY"]
+CHUNK_SIZE = 5000
+
+
+def use_database(path: Path) -> Engine:
+    """Point the application at the SQLite database in ``path`` and create its schema."""
+
+    db_session.engine.dispose()
+    db_session.engine = build_engine(f"sqlite:///{path}")
+    init_db()
+    return db_session.engine
+
+
+def _job_rows(count: int, seed: int) -> Iterator[List[Dict]]:
+    rng = random.Random(seed)
+    trades = sorted(PLUGIN_REGISTRY)
+    start = datetime.utcnow() - timedelta(days=365)
+    step = timedelta(days=365) / max(count, 1)
+    loop = asyncio.new_event_loop()
+
+    try:
+        chunk: List[Dict] = []
+        for index in range(count):
+            plugin = PLUGIN_REGISTRY[trades[index % len(trades)]]
+            payload = {
+                "trade": plugin.trade_name,
+                "location": rng.choice(LOCATIONS),
+                "dimensions": {
+                    "length": round(rng.uniform(5, 80), 1),
+                    "width": round(rng.uniform(5, 40), 1),
+                    "depth": round(rng.uniform(0.2, 1.5), 2),
+                },
+                "margin": round(rng.uniform(0.1, 0.3), 3),
+            }
+            normalized = loop.run_until_complete(plugin.normalize_data(payload))
+            normalized["material_costs"] = materials.baseline_material_costs(normalized["materials"])
+            normalized["labor_rate"] = rng.uniform(20, 45)
+            bid = loop.run_until_complete(plugin.compute_bid(normalized))
+            bid["job_id"] = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            bid["timestamp"] = start + step * index
+            bid["steps"] = []
+            bid.pop("_timestamp")
+            chunk.append(bid)
+            if len(chunk) == CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        loop.close()
+
+
+def seed_database(path: Path, count: int, seed: int = 0) -> Engine:
+    """Return an engine for a database holding ``count`` synthetic jobs, creating it if needed.
+
+    Existing files with at least ``count`` jobs are reused, since seeding a
+    million rows takes a while; the pipeline scenarios add a few hundred
+    rows per run on top of the seeded ones.
+    """
+
+    engine = use_database(path)
+    with Session(engine) as session:
+        existing = session.exec(select(func.count()).select_from(Job)).one()
+    if existing >= count:
+        return engine
+    if existing:
+        raise RuntimeError(f"{path} holds {existing} jobs, expected at least {count}; delete it to reseed")
+
+    logger.info("Seeding %s with %d jobs", path, count)
+    with engine.begin() as connection:
+        for chunk in _job_rows(count, seed):
+            connection.execute(insert(Job.__table__), chunk)
+
+    with Session(engine) as session:
+        counter = session.get(Counter, history.JOB_TOTAL)
+        counter.value = count
+        analytics.rebuild_aggregates(session)
+        rollups.rebuild_rollups(session)
+        session.commit()
+    return engine
@@ -0,0 +1,74 @@
+"""Local stand-ins for the upstream providers, served through ``httpx.MockTransport``."""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import httpx
+
+
+@dataclass
+class StubProviders:
+    """Answer every provider the pipeline calls with canned data.
+
+    Each request waits ``latency`` seconds (± ``jitter`` as a fraction) and
+    fails with ``failure_rate`` probability, alternating between a 503 and a
+    connection error so both failure paths are exercised. ``seed`` makes the
+    latency and failure sequence repeatable.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.2
+    failure_rate: float = 0.0
+    seed: Optional[int] = 0
+    requests: Dict[str, int] = field(default_factory=dict)
+    failures: int = 0
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests[host] = self.requests.get(host, 0) + 1
+
+        if self.latency:
+            spread = self.latency * self.jitter
+            await asyncio.sleep(max(0.0, self.latency + self._random.uniform(-spread, spread)))
+
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.failures += 1
+            if self.failures % 2:
+                return httpx.Response(503, request=request)
+            raise httpx.ConnectError("Injected provider failure", request=request)
+
+        return self._respond(request)
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if "nominatim" in host:
+            return httpx.Response(
+                200,
+                json=[{"lat": "42.50", "lon": "-94.17", "display_name": "Fort Dodge, Iowa", "address": {"state": "Iowa"}}],
+            )
+        if "geoapify" in host:
+            return httpx.Response(200, json={"features": []})
+        if "bls" in host:
+            series = json.loads(request.content)["seriesid"]
+            return httpx.Response(
+                200,
+                json={"Results": {"series": [{"seriesID": item, "data": [{"value": "31.50"}]} for item in series]}},
+            )
+        if "openweathermap" in host:
+            return httpx.Response(200, json={"main": {"temp": 58.0}})
+        if "wikihow" in host:
+            if request.url.params.get("action") == "parse":
+                return httpx.Response(200, json={"parse": {"sections": [{"line": "Plan the work"}, {"line": "Do the work"}]}})
+            return httpx.Response(200, json={"query": {"search": [{"pageid": 1}]}})
+        # Material price search and anything else.
+        return httpx.Response(200, json={"results": [{"price": 12.5}]})
@@ -0,0 +1,94 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlmodel import Session, SQLModel, create_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.models import analytics as _analytics_models  # noqa: F401
+from app.models.job import Job
+from app.services import analytics, history, rollups
+
+
+def _job(index, trade, timestamp):
+    return Job(
+        job_id=f"job-{index:03d}",
+        trade=trade,
+        location=f"Town {index}, IA",
+        overhead=1.0,
+        profit_margin=0.1 + index / 100,
+        profit_amount=1.0,
+        material_total=10.0 * index,
+        labor_total=5.0,
+        weather_modifier=0.0,
+        total_bid=100.0 + index,
+        timestamp=timestamp,
+    )
+
+
+def test_incremental_aggregates_match_full_scan_and_rebuild(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    SQLModel.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    trades = ["concrete", "hvac", "plumbing"]
+
+    with Session(engine) as session:
+        history.ensure_job_total(session)
+        for batch in range(3):
+            jobs = [
+                _job(index, trades[index % 3], start + timedelta(hours=index))
+                for index in range(batch * 4, batch * 4 + 4)
+            ]
+            session.add_all(jobs)
+            history.increment_job_total(session, len(jobs))
+            analytics.record_jobs(session, jobs)
+            session.commit()
+
+        summary = analytics.compute_summary(session)
+        assert summary == analytics.scan_summary(session)
+        assert summary["total_jobs"] == 12
+        assert analytics.summary_drift(session) == {}
+
+        # Jobs committed after newer ones (write-behind, async submissions) keep the scan's order.
+        late = [
+            _job(20, "hvac", start + timedelta(minutes=30)),
+            _job(21, "hvac", (start + timedelta(hours=20)).replace(tzinfo=timezone.utc)),
+        ]
+        session.add_all(late)
+        history.increment_job_total(session, len(late))
+        analytics.record_jobs(session, late)
+        session.commit()
+        assert analytics.summary_drift(session) == {}
+        summary = analytics.compute_summary(session)
+        assert summary["recent_locations"][:2] == ["Town 21, IA", "Town 11, IA"]
+
+        analytics.rebuild_aggregates(session)
+        session.commit()
+        assert analytics.compute_summary(session) == summary
+
+
+def test_rollups_bucket_incrementally_and_compact_old_hours(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    SQLModel.metadata.create_all(engine)
+    monday = datetime(2024, 1, 1, 9, 30)
+
+    with Session(engine) as session:
+        rollups.record_rollups(session, [_job(1, "hvac", monday), _job(2, "hvac", monday + timedelta(minutes=20))])
+        rollups.record_rollups(session, [_job(3, "hvac", monday + timedelta(days=2, hours=3))])
+        session.commit()
+
+        hours = rollups.timeseries(session, rollups.HOUR, trade="hvac")
+        days = rollups.timeseries(session, rollups.DAY, start=monday, end=monday + timedelta(days=1))
+        weeks = rollups.timeseries(session, rollups.WEEK)
+        assert [(point["bucket_start"].hour, point["job_count"]) for point in hours] == [(9, 2), (12, 1)]
+        assert [point["job_count"] for point in days] == [2]
+        assert days[0]["average_bid"] == 101.5
+        assert [(point["bucket_start"], point["job_count"]) for point in weeks] == [(datetime(2024, 1, 1), 3)]
+
+        assert rollups.compact_hourly(session, now=monday + timedelta(days=30)) == 2
+        session.commit()
+        assert rollups.timeseries(session, rollups.HOUR) == []
+        assert [point["job_count"] for point in rollups.timeseries(session, rollups.DAY)] == [2, 1]
@@ -0,0 +1,50 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services import batch
+
+
+def test_run_batch_streams_fast_items_first_and_bulk_inserts(monkeypatch):
+    saved = []
+
+    async def fake_build_job(payload):
+        await asyncio.sleep(payload["delay"])
+        if payload["trade"] == "bogus":
+            raise ValueError("Unsupported trade: bogus")
+        return {"job_id": payload["name"]}
+
+    monkeypatch.setattr(batch, "build_job", fake_build_job)
+    monkeypatch.setattr(batch, "save_jobs", lambda jobs: saved.append([job["job_id"] for job in jobs]))
+
+    payloads = [
+        {"name": "slow", "trade": "concrete", "delay": 0.05},
+        {"name": "a", "trade": "concrete", "delay": 0.0},
+        {"name": "b", "trade": "bogus", "delay": 0.0},
+        {"name": "c", "trade": "concrete", "delay": 0.0},
+    ]
+
+    async def items():
+        for index, payload in enumerate(payloads):
+            yield index, payload
+        yield len(payloads), ValueError("Invalid JSON")
+
+    async def scenario():
+        return [result async for result in batch.run_batch(items(), concurrency=4, flush_size=10)]
+
+    results = asyncio.run(scenario())
+
+    assert results[-1] == {"index": 0, "status": "created", "job": {"job_id": "slow"}}
+    assert {result["index"]: result["status"] for result in results} == {
+        0: "created",
+        1: "created",
+        2: "error",
+        3: "created",
+        4: "error",
+    }
+    assert sorted(job for flush in saved for job in flush) == ["a", "c", "slow"]
+    assert len(saved) < 3
@@ -0,0 +1,77 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services import deadline, geocoding, instructions, labor, materials, pipeline, providers
+from app.services.cache import StaleWhileRevalidateCache
+
+
+def test_process_job_answers_within_deadline_and_lists_degraded_inputs(monkeypatch):
+    monkeypatch.setattr(
+        geocoding, "geocode_cache", geocoding.GeocodeCache(maxsize=8, ttl=60, negative_ttl=60, path=None)
+    )
+    prices = StaleWhileRevalidateCache(materials._load_live_price, maxsize=16, fresh_ttl=60, max_stale=600)
+    prices.set("rebar", 1.25)
+    monkeypatch.setattr(materials, "material_price_cache", prices)
+    store = labor.LaborRateStore(labor.TRADE_OCCUPATIONS.values(), [labor.NATIONAL])
+    store.rates[(labor.trade_occupation("concrete"), labor.NATIONAL)] = 30.0
+    monkeypatch.setattr(labor, "labor_rate_store", store)
+    plugin = pipeline.get_plugin("concrete")
+    monkeypatch.setitem(instructions.instruction_cache.steps, plugin.instruction_query, ["Pour."])
+
+    saved = []
+
+    async def persist(payload):
+        saved.append(payload["job_id"])
+
+    monkeypatch.setattr(pipeline, "persist_job", persist)
+
+    async def handler(request):
+        if request.url.host == "nominatim.openstreetmap.org":
+            return httpx.Response(200, json=[{"lat": "42.0", "lon": "-93.6", "address": {"state": "Iowa"}}])
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"price": 9.99})
+
+    payload = {
+        "trade": "concrete",
+        "location": "Ames, IA",
+        "dimensions": {"length": 20, "width": 10, "depth": 0.5},
+        "materials": ["concrete mix", "rebar"],
+    }
+
+    async def scenario():
+        await providers.startup(transport=httpx.MockTransport(handler))
+        try:
+            started = time.perf_counter()
+            job = await pipeline.process_job(payload, deadline_seconds=0.5)
+            return job, time.perf_counter() - started
+        finally:
+            await providers.shutdown()
+
+    job, elapsed = asyncio.run(scenario())
+
+    assert elapsed < 1.0
+    assert job["degraded"] == ["material:concrete mix"]
+    assert {item["name"]: item["unit_cost"] for item in job["materials"]}["rebar"] == 1.25
+    assert job["location_details"]["state"] == "Iowa"
+    assert job["steps"] == ["Pour."]
+    assert saved == [job["job_id"]]
+
+
+def test_stage_timeout_leaves_a_grace_period_for_cached_reads():
+    assert deadline.stage_timeout(3.0) == 3.0
+    with deadline.budget(10) as budget:
+        assert deadline.stage_timeout(3.0) == 3.0
+        budget.expires_at = time.monotonic() - 1
+        assert deadline.stage_timeout(None) == deadline.STAGE_GRACE
+        deadline.degrade("steps")
+        deadline.degrade("steps")
+    assert budget.degraded == ["steps"]
+    assert deadline.remaining() is None
@@ -0,0 +1,42 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services import geocoding
+
+
+def test_geocode_results_persist_across_cache_instances(monkeypatch, tmp_path):
+    calls = []
+
+    async def fake_search(location, _client):
+        calls.append(location)
+        if "nowhere" in location.lower():
+            return None
+        return {"lat": 42.5, "lon": -94.2, "display_name": location, "state": "Iowa"}
+
+    monkeypatch.setattr(geocoding, "_search_nominatim", fake_search)
+    path = tmp_path / "geocode_cache.db"
+
+    def fresh_cache():
+        return geocoding.GeocodeCache(maxsize=8, ttl=3600, negative_ttl=60, path=path)
+
+    async def scenario():
+        monkeypatch.setattr(geocoding, "geocode_cache", fresh_cache())
+        first = await geocoding.geocode_location("Fort Dodge, IA")
+        missing = await geocoding.geocode_location("Nowhere")
+
+        # A new cache instance stands in for a restarted or sibling worker.
+        monkeypatch.setattr(geocoding, "geocode_cache", fresh_cache())
+        second = await geocoding.geocode_location("  fort dodge ,ia ")
+        missing_again = await geocoding.geocode_location("nowhere")
+        return first, second, missing, missing_again
+
+    first, second, missing, missing_again = asyncio.run(scenario())
+
+    assert first == second
+    assert missing is None and missing_again is None
+    assert calls == ["Fort Dodge, IA", "Nowhere"]
@@ -0,0 +1,98 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.db import migrations
+from app.models.counter import Counter
+from app.models.job import Job
+from app.services import history
+
+
+def _job(index, timestamp):
+    return Job(
+        job_id=f"job-{index:03d}",
+        trade="concrete",
+        location="Fort Dodge, IA",
+        overhead=1.0,
+        profit_margin=0.15,
+        profit_amount=1.0,
+        material_total=10.0,
+        labor_total=5.0,
+        weather_modifier=0.0,
+        total_bid=100.0 + index,
+        timestamp=timestamp,
+    )
+
+
+def test_keyset_pages_cover_every_job_once_and_total_is_maintained(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    SQLModel.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+
+    with Session(engine) as session:
+        history.ensure_job_total(session)
+        # Pairs of jobs share a timestamp so the job_id tie-breaker matters.
+        session.add_all(_job(index, start + timedelta(minutes=index // 2)) for index in range(25))
+        history.increment_job_total(session, 25)
+        session.commit()
+
+        seen, cursor = [], None
+        while True:
+            page = history.list_job_page(session, limit=10, cursor=cursor)
+            seen.extend(record.job_id for record in page["records"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert page["total"] == 25
+        assert seen == [f"job-{index:03d}" for index in reversed(range(25))]
+
+        with pytest.raises(ValueError):
+            history.list_job_page(session, limit=10, cursor="not-a-cursor")
+
+
+def test_cursor_pages_seek_the_index_instead_of_scanning_it(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    SQLModel.metadata.create_all(engine)
+    migrations.run_migrations(engine)
+
+    with Session(engine) as session:
+        cursor = history.encode_cursor(datetime(2024, 1, 1), "job-010")
+        statements = []
+
+        def record(conn, cursor_, statement, params, context, executemany):
+            statements.append((statement, params))
+
+        event.listen(engine, "before_cursor_execute", record)
+        history.list_job_page(session, limit=10, cursor=cursor, include_total=False)
+        event.remove(engine, "before_cursor_execute", record)
+
+        statement, params = statements[-1]
+        rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params)
+        plan = " ".join(row[-1] for row in rows)
+
+    assert "SEARCH job USING" in plan and "ix_job_timestamp_job_id" in plan, plan
+
+
+def test_job_total_seeding_tolerates_a_concurrent_seeder(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as winner, Session(engine) as loser:
+        history.ensure_job_total(winner)
+        # The loser looked before the winner committed, then inserts too.
+        reads = [None]
+        real_get = loser.get
+        loser.get = lambda model, key: reads.pop() if reads else real_get(model, key)
+        history.ensure_job_total(loser)
+
+    with Session(engine) as session:
+        assert session.get(Counter, history.JOB_TOTAL).value == 0
@@ -0,0 +1,36 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services import instructions
+
+
+def test_instruction_cache_serves_warmed_steps_and_fetches_cold_misses(monkeypatch):
+    calls = []
+
+    async def fake_fetch(query, client=None):
+        calls.append(query)
+        return [f"{query}: step 1", f"{query}: step 2"]
+
+    monkeypatch.setattr(instructions, "fetch_wikihow_steps", fake_fetch)
+    cache = instructions.InstructionCache()
+    cache.register(["pour a concrete slab"])
+
+    async def scenario():
+        warmed = await cache.refresh()
+        hit = cache.get("pour a concrete slab")
+        miss = cache.get("build a deck")
+        await asyncio.sleep(0.01)
+        return warmed, hit, miss, cache.get("build a deck")
+
+    warmed, hit, miss, after_fetch = asyncio.run(scenario())
+
+    assert warmed
+    assert hit == ["pour a concrete slab: step 1", "pour a concrete slab: step 2"]
+    assert miss is None
+    assert after_fetch == ["build a deck: step 1", "build a deck: step 2"]
+    assert calls == ["pour a concrete slab", "build a deck"]
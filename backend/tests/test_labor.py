@@ -0,0 +1,115 @@
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+from sqlmodel import Session, SQLModel, create_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.db import session as db_session
+from app.models.labor import LaborRate, LaborRateRefresh
+from app.services import labor
+
+
+def _use_engine(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(db_session, "engine", engine)
+    return engine
+
+
+def _bls(requests, available=True):
+    def handler(request):
+        series_ids = json.loads(request.content)["seriesid"]
+        requests.append(series_ids)
+        if not available:
+            return httpx.Response(503)
+        series = [
+            {"seriesID": series_id, "data": [{"value": "41.0" if series_id.startswith("OEUS19") else "30.0"}]}
+            for series_id in series_ids
+        ]
+        return httpx.Response(200, json={"Results": {"series": series}})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_store_prefetches_series_in_bulk_and_serves_from_memory(monkeypatch, tmp_path):
+    _use_engine(monkeypatch, tmp_path)
+    requests = []
+    store = labor.LaborRateStore(labor.TRADE_OCCUPATIONS.values(), [labor.NATIONAL, "19"])
+
+    async def scenario():
+        async with _bls(requests) as client:
+            return await store.refresh(client=client)
+
+    assert asyncio.run(scenario())
+    assert len(requests) == 1
+    assert len(requests[0]) == 10
+
+    electrician = labor.trade_occupation("electrical")
+    assert store.rate_for(electrician, "Iowa") == 41.0
+    assert store.rate_for(electrician, "IA") == 41.0
+    assert store.rate_for(electrician, "Texas") == 30.0
+    assert store.rate_for(electrician, None) == 30.0
+
+
+def test_resolve_trade_labor_rate_falls_back_without_network(monkeypatch):
+    monkeypatch.setattr(labor, "labor_rate_store", labor.LaborRateStore([], []))
+
+    rate = asyncio.run(labor.resolve_trade_labor_rate("plumbing", "Iowa"))
+
+    assert rate == labor.FALLBACK_LABOR_RATES["plumbing"]
+
+
+def test_processes_share_one_bls_refresh_and_back_off_when_it_fails(monkeypatch, tmp_path):
+    engine = _use_engine(monkeypatch, tmp_path)
+    monkeypatch.setattr(labor.settings, "labor_rate_retry_interval", 60.0)
+    areas = [labor.NATIONAL]
+    requests = []
+
+    async def refresh_all(stores, available=True):
+        async with _bls(requests, available) as client:
+            return await asyncio.gather(*(store.refresh(client=client) for store in stores))
+
+    # Three worker processes start together on a fresh database.
+    workers = [labor.LaborRateStore(labor.TRADE_OCCUPATIONS.values(), areas) for _ in range(3)]
+    assert asyncio.run(refresh_all(workers)) == [True, True, True]
+    assert len(requests) == 1
+    assert all(store.rates == workers[0].rates and store.rates for store in workers)
+
+    # A worker started later reads the stored rates instead of refetching.
+    late = labor.LaborRateStore(labor.TRADE_OCCUPATIONS.values(), areas)
+    assert asyncio.run(refresh_all([late]))
+    assert len(requests) == 1 and late.rates == workers[0].rates
+
+    delays = []
+    for _ in range(3):
+        with Session(engine) as session:
+            session.get(LaborRateRefresh, labor.REFRESH_NAME).next_refresh_at = datetime.utcnow()
+            session.commit()
+        # Stored rates keep serving while BLS is down, but the refresh counts as failed.
+        assert asyncio.run(refresh_all([late], available=False)) == [False]
+        assert late.rates == workers[0].rates
+        with Session(engine) as session:
+            refresh = session.get(LaborRateRefresh, labor.REFRESH_NAME)
+            delays.append((refresh.next_refresh_at - datetime.utcnow()).total_seconds())
+            assert session.get(LaborRate, (labor.trade_occupation("plumbing"), labor.NATIONAL)).rate == 30.0
+
+    assert [round(delay / 60) for delay in delays] == [1, 2, 4]
+
+
+def test_defaults_stay_within_the_unregistered_bls_quota(monkeypatch):
+    monkeypatch.setattr(labor.settings, "bls_api_key", None)
+    monkeypatch.setattr(labor.settings, "bls_series_per_request", None)
+    monkeypatch.setattr(labor.settings, "labor_rate_include_states", None)
+    assert labor.series_per_request() == 25
+    assert not labor.include_states()
+
+    monkeypatch.setattr(labor.settings, "bls_api_key", "key")
+    assert labor.series_per_request() == 50
+    assert labor.include_states()
@@ -2,11 +2,21 @@ import asyncio
 import sys
 from pathlib import Path
 
+import pytest
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from app.services import materials
+from app.services.cache import StaleWhileRevalidateCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_price_cache(monkeypatch):
+    cache = StaleWhileRevalidateCache(materials._load_live_price, maxsize=16, fresh_ttl=60, max_stale=600)
+    monkeypatch.setattr(materials, "material_price_cache", cache)
+    return cache
 
 
 def test_resolve_material_costs_uses_baseline(monkeypatch):
@@ -19,3 +29,59 @@ def test_resolve_material_costs_uses_baseline(monkeypatch):
 
     assert costs["concrete mix"] > 0
     assert costs["unknown item"] == materials.DEFAULT_MATERIAL_PRICE
+
+
+def test_resolve_material_costs_dedupes_case_insensitively_and_keeps_order(monkeypatch):
+    queries = []
+    in_flight = 0
+    peak = 0
+
+    async def fake_search(query):
+        nonlocal in_flight, peak
+        queries.append(query)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"gravel": None}.get(query, 3.0)
+
+    monkeypatch.setattr(materials, "search_material_price", fake_search)
+
+    names = ["Rebar", "rebar ", "gravel", "REBAR", "plywood", "sand"]
+    costs = asyncio.run(materials.resolve_material_costs(names, concurrency=2))
+
+    assert list(costs) == ["Rebar", "gravel", "plywood", "sand"]
+    assert sorted(queries) == ["gravel", "plywood", "rebar", "sand"]
+    assert peak == 2
+    assert costs["gravel"] == materials.load_baseline_prices()["gravel"]
+
+
+def test_price_cache_serves_stale_prices_while_refreshing(monkeypatch):
+    now = [0.0]
+    prices = iter([4.0, 5.0, 18.0])
+
+    async def fake_search(_query):
+        return next(prices)
+
+    monkeypatch.setattr(materials, "search_material_price", fake_search)
+    cache = StaleWhileRevalidateCache(
+        materials._load_live_price, maxsize=1, fresh_ttl=60, max_stale=600, clock=lambda: now[0]
+    )
+    monkeypatch.setattr(materials, "material_price_cache", cache)
+
+    async def scenario():
+        first = await materials.resolve_material_costs(["Rebar"])
+        now[0] = 120.0
+        stale = await materials.resolve_material_costs(["rebar"])
+        await asyncio.sleep(0)
+        refreshed = await materials.resolve_material_costs(["rebar"])
+        await materials.resolve_material_costs(["plywood"])
+        return first, stale, refreshed
+
+    first, stale, refreshed = asyncio.run(scenario())
+
+    assert first == {"Rebar": 4.0}
+    assert stale == {"rebar": 4.0}
+    assert refreshed == {"rebar": 5.0}
+    assert cache.stats()["refreshes"] == 1
+    assert cache.stats()["evictions"] == 1
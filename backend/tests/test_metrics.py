@@ -0,0 +1,74 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.services import providers
+
+
+def test_histogram_and_counters_render_in_prometheus_text_format():
+    registry = metrics.Registry()
+    latency = registry.register(metrics.Histogram("demo_seconds", "Demo latency.", ("stage",), buckets=(0.1, 1.0)))
+    total = registry.register(metrics.Counter("demo_total", "Demo count.", ("trade",)))
+    hits = registry.register(metrics.CallbackCounter("demo_cache_total", "Demo cache.", ("result",)))
+    hits.register(lambda: [(("hit",), 3)])
+
+    latency.observe(0.05, "enrich")
+    latency.observe(0.5, "enrich")
+    latency.observe(7, "enrich")
+    with latency.time("compute"):
+        pass
+    total.inc("concrete")
+    total.inc("concrete", amount=2)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{stage="enrich",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="enrich",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="enrich",le="+Inf"} 3' in lines
+    assert 'demo_seconds_sum{stage="enrich"} 7.55' in lines
+    assert 'demo_seconds_count{stage="compute"} 1' in lines
+    assert 'demo_total{trade="concrete"} 3' in lines
+    assert 'demo_cache_total{result="hit"} 3' in lines
+
+
+def test_provider_transport_records_latency_and_errors(monkeypatch):
+    monkeypatch.setattr(get_settings(), "provider_max_retries", 0)
+
+    def handler(request):
+        if request.url.path == "/down":
+            return httpx.Response(503)
+        if request.url.path == "/refused":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={})
+
+    before = metrics.provider_seconds.count(providers.BUILD)
+    status_errors = metrics.provider_errors.value(providers.BUILD, "status")
+    transport_errors = metrics.provider_errors.value(providers.BUILD, "transport")
+
+    async def scenario():
+        await providers.startup(transport=httpx.MockTransport(handler))
+        client = providers.get_client(providers.BUILD)
+        try:
+            await client.get("https://build.example/ok")
+            await client.get("https://build.example/down")
+            try:
+                await client.get("https://build.example/refused")
+            except httpx.ConnectError:
+                pass
+        finally:
+            await providers.shutdown()
+
+    asyncio.run(scenario())
+
+    assert metrics.provider_seconds.count(providers.BUILD) == before + 3
+    assert metrics.provider_errors.value(providers.BUILD, "status") == status_errors + 1
+    assert metrics.provider_errors.value(providers.BUILD, "transport") == transport_errors + 1
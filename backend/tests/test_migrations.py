@@ -0,0 +1,75 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, create_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.db import migrations
+from app.models.analytics import TradeAggregate
+from app.models.job import Job
+
+
+def test_migrations_apply_once_to_an_existing_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bidder.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            Job(
+                job_id="existing",
+                trade="hvac",
+                location="Ames, IA",
+                overhead=1.0,
+                profit_margin=0.2,
+                profit_amount=1.0,
+                material_total=10.0,
+                labor_total=5.0,
+                weather_modifier=0.0,
+                total_bid=250.0,
+                timestamp=datetime(2024, 1, 1),
+            )
+        )
+        session.commit()
+
+    extra = migrations.Migration(99, "Add a column", ("ALTER TABLE job ADD COLUMN notes TEXT",))
+    steps = [*migrations.MIGRATIONS, extra]
+
+    first = migrations.run_migrations(engine, steps)
+    second = migrations.run_migrations(engine, steps)
+
+    assert first == [migration.version for migration in steps]
+    assert second == []
+
+    with Session(engine) as session:
+        aggregate = session.get(TradeAggregate, "hvac")
+    assert aggregate.job_count == 1 and aggregate.total_bid_sum == 250.0
+
+    inspector = inspect(engine)
+    index_names = {index["name"] for index in inspector.get_indexes("job")}
+    assert {"ix_job_timestamp_job_id", "ix_job_trade_timestamp", "ix_job_location"} <= index_names
+    assert "notes" in {column["name"] for column in inspector.get_columns("job")}
+
+    with engine.connect() as connection:
+        plan = connection.execute(
+            text("EXPLAIN QUERY PLAN SELECT * FROM job ORDER BY timestamp DESC, job_id DESC LIMIT 10")
+        ).all()
+    assert "ix_job_timestamp_job_id" in " ".join(str(row) for row in plan)
+
+
+def test_constraint_violation_inside_a_migration_is_not_mistaken_for_a_race(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bidder.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE item (name TEXT)"))
+        connection.execute(text("INSERT INTO item (name) VALUES ('a'), ('a')"))
+
+    unique = migrations.Migration(1, "Make item names unique", ("CREATE UNIQUE INDEX ix_item_name ON item (name)",))
+
+    with pytest.raises(IntegrityError):
+        migrations.run_migrations(engine, [unique])
+    assert migrations.applied_versions(engine) == []
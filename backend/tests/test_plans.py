@@ -0,0 +1,37 @@
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.plugins.trades.concrete import TRADE_PROFILES, build_plugins
+
+
+def test_profiles_compile_into_plans_with_resolved_defaults():
+    plan = build_plugins()["hvac"].plan
+
+    assert plan.rule_for("Thermostat").metric == "area_sqft"
+    assert plan.rule_for("thermostat").precision == 0
+    assert plan.rule_for("mystery part") is plan.default_rule
+    assert plan.default_rule.min_quantity is None and plan.default_rule.precision == 2
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        (lambda profile: profile["material_heuristics"]["rebar"].update(metric="volume_yd"), "metric for 'rebar'"),
+        (lambda profile: profile["material_heuristics"]["gravel"].update(multipler=2), "unknown heuristics"),
+        (lambda profile: profile.update(overhead_rate="10%"), "overhead_rate"),
+        (lambda profile: profile["material_heuristics"]["rebar"].update(precision=1.5), "precision"),
+    ],
+)
+def test_invalid_profiles_fail_when_plugins_are_built(change, message):
+    profile = copy.deepcopy(TRADE_PROFILES["concrete"])
+    change(profile)
+
+    with pytest.raises(ValueError, match=message):
+        build_plugins({"concrete": profile})
@@ -0,0 +1,91 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services import geocoding, providers
+
+
+def test_provider_clients_are_shared_and_closed_on_shutdown(monkeypatch):
+    monkeypatch.setattr(
+        geocoding, "geocode_cache", geocoding.GeocodeCache(maxsize=8, ttl=60, negative_ttl=60, path=None)
+    )
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(
+            200,
+            json=[{"lat": "42.5", "lon": "-94.2", "display_name": "Fort Dodge", "address": {"state": "Iowa"}}],
+        )
+
+    async def scenario():
+        await providers.startup(transport=httpx.MockTransport(handler))
+        client = providers.get_client(providers.NOMINATIM)
+        assert providers.get_client(providers.NOMINATIM) is client
+
+        first = await geocoding.geocode_location("Fort Dodge, IA")
+        second = await geocoding.geocode_location("Springfield, IL")
+
+        await providers.shutdown()
+        return client, first, second
+
+    client, first, second = asyncio.run(scenario())
+
+    assert first["state"] == "Iowa"
+    assert second["lat"] == first["lat"]
+    assert len(requests) == 2
+    assert requests[0].headers["User-Agent"].startswith("Bidder/")
+    assert client.is_closed
+
+
+def test_on_demand_clients_are_closed_with_their_event_loop(monkeypatch):
+    monkeypatch.setattr(providers, "_pool", None)
+
+    async def use_client():
+        return providers.get_client(providers.BUILD)
+
+    first = asyncio.run(use_client())
+    assert first.is_closed
+
+    second = asyncio.run(use_client())
+    assert second is not first
+    assert second.is_closed
+
+
+def test_provider_clients_keep_environment_proxies(monkeypatch):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.internal:3128")
+    monkeypatch.setenv("NO_PROXY", "api.bls.gov")
+    pool = providers.ProviderClients(providers.get_settings())
+
+    build = pool.get(providers.BUILD)
+    proxied = build._transport_for_url(httpx.URL("https://www.build.com/api/search/v1"))
+    direct = build._transport_for_url(httpx.URL("https://api.bls.gov/publicAPI/v2/timeseries/data/"))
+
+    assert isinstance(proxied, providers.ResilientTransport)
+    assert proxied is not build._transport
+    assert direct is build._transport
+
+
+def test_environment_proxies_follow_no_proxy(monkeypatch):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.lower(), raising=False)
+    monkeypatch.setenv("HTTPS_PROXY", "proxy.internal:3128")
+    monkeypatch.setenv("NO_PROXY", "api.bls.gov, *.internal,10.0.0.1,::1")
+
+    assert providers.environment_proxies() == {
+        "https://": "http://proxy.internal:3128",
+        "all://*api.bls.gov": None,
+        "all://*.internal": None,
+        "all://10.0.0.1": None,
+        "all://[::1]": None,
+    }
+
+    monkeypatch.setenv("NO_PROXY", "*")
+    assert providers.environment_proxies() == {}
@@ -0,0 +1,50 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services import geocoding, labor, materials, providers
+from app.services.cache import StaleWhileRevalidateCache, TTLCache
+from app.services.quick_quote import quick_quote
+
+
+def test_quick_quote_uses_only_cached_inputs_and_reports_fallbacks(monkeypatch):
+    now = [0.0]
+    prices = StaleWhileRevalidateCache(
+        materials._load_live_price, maxsize=16, fresh_ttl=60, max_stale=600, clock=lambda: now[0]
+    )
+    prices.set("concrete mix", 5.0)
+    now[0] = 120.0  # concrete mix is now stale
+    prices.set("rebar", 1.25)
+    monkeypatch.setattr(materials, "material_price_cache", prices)
+
+    monkeypatch.setattr(geocoding.geocode_cache, "memory", TTLCache(16, 60))
+    geocoding.geocode_cache.memory.set("ames, ia", {"lat": 42.03, "lon": -93.62, "state": "Iowa"})
+    store = labor.LaborRateStore(labor.TRADE_OCCUPATIONS.values(), [labor.NATIONAL])
+    store.rates[(labor.trade_occupation("concrete"), labor.NATIONAL)] = 30.0
+    monkeypatch.setattr(labor, "labor_rate_store", store)
+
+    def no_network(provider):
+        raise AssertionError(f"quick quote must not call {provider}")
+
+    monkeypatch.setattr(providers, "get_client", no_network)
+
+    payload = {
+        "trade": "concrete",
+        "location": "Ames, IA",
+        "dimensions": {"length": 20, "width": 10, "depth": 0.5},
+        "materials": ["concrete mix", "rebar", "gravel"],
+        "margin": 0.15,
+    }
+    quote = asyncio.run(quick_quote(payload))
+
+    assert "job_id" not in quote
+    assert quote["labor"]["rate"] == 30.0
+    assert quote["location_details"]["state"] == "Iowa"
+    assert {item["name"]: item["unit_cost"] for item in quote["materials"]}["rebar"] == 1.25
+    assert quote["stale"] == ["material:concrete mix"]
+    assert "material:gravel" in quote["defaulted"] and "geocode" not in quote["defaulted"]
+    assert quote["total_bid"] > 0
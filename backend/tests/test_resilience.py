@@ -0,0 +1,106 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.config import Settings
+from app.services import resilience
+from app.services.resilience import AdaptiveTimeout, CircuitBreaker, ProviderGuard, ResilientTransport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _client(handler, clock=None, **overrides):
+    options = {"circuit_failure_threshold": 2, "circuit_reset_timeout": 30, "provider_retry_backoff": 0}
+    options.update(overrides)
+    guard = ProviderGuard("build", Settings(**options), clock=clock or FakeClock())
+    return httpx.AsyncClient(transport=ResilientTransport(httpx.MockTransport(handler), guard)), guard
+
+
+def test_breaker_opens_after_failures_and_probes_once_after_reset():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == resilience.CLOSED
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.state == resilience.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == resilience.CLOSED
+
+
+def test_retries_transient_errors_then_fails_fast_while_open():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path == "/flaky" and calls.count("/flaky") == 1:
+            raise httpx.ConnectError("reset", request=request)
+        if request.url.path == "/down":
+            return httpx.Response(503)
+        return httpx.Response(200, json={"price": 1})
+
+    async def scenario():
+        client, guard = _client(handler, provider_max_retries=1)
+        async with client:
+            flaky = await client.get("https://build.example/flaky")
+            down = await client.get("https://build.example/down")
+            with pytest.raises(httpx.HTTPError):
+                await client.get("https://build.example/ok")
+        return flaky, down, guard
+
+    flaky, down, guard = asyncio.run(scenario())
+
+    assert flaky.status_code == 200
+    assert down.status_code == 503
+    assert calls == ["/flaky", "/flaky", "/down", "/down"]
+    assert guard.breaker.state == resilience.OPEN
+
+
+def test_adaptive_timeout_tracks_latency_and_cuts_off_slow_calls():
+    timeout = AdaptiveTimeout(maximum=10, minimum=0.05, percentile=99, multiplier=3, window=50, min_samples=20)
+    assert timeout.current == 10
+    for _ in range(20):
+        timeout.observe(0.02)
+    assert timeout.current == pytest.approx(0.06)
+    for _ in range(20):
+        timeout.observe(5)
+    assert timeout.current == 10
+
+    async def handler(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200)
+
+    async def scenario():
+        client, guard = _client(handler, provider_max_retries=0)
+        guard.timeout._current = 0.05
+        async with client:
+            with pytest.raises(resilience.ProviderTimeout):
+                await client.get("https://build.example/slow")
+        return guard
+
+    guard = asyncio.run(scenario())
+    assert guard.breaker.failures == 1
@@ -0,0 +1,46 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import text
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.core.config import Settings
+from app.db.session import build_engine
+
+
+def test_sqlite_engine_applies_pragmas_and_shares_connections_across_threads(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'bidder.db'}")
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == -8 * 1024
+
+    errors = []
+
+    def query() -> None:
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+
+    worker = threading.Thread(target=query)
+    worker.start()
+    worker.join()
+    assert errors == []
+    engine.dispose()
+
+
+def test_sqlite_pragma_settings_reject_unknown_values():
+    with pytest.raises(ValidationError):
+        Settings(sqlite_journal_mode="WAL; DROP TABLE job")
+    with pytest.raises(ValidationError):
+        Settings(sqlite_synchronous="normal-ish")
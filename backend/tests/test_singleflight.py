@@ -0,0 +1,110 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services import deadline
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call_and_survive_a_cancelled_waiter():
+    flight = SingleFlight()
+    calls = []
+
+    async def lookup():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def scenario():
+        cancelled = asyncio.ensure_future(flight.do("key", lookup))
+        waiters = [asyncio.ensure_future(flight.do("key", lookup)) for _ in range(4)]
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(scenario()) == ["value"] * 4
+    assert calls == [1]
+    assert flight.coalesced == 4
+
+
+def test_errors_can_be_isolated_from_followers():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "recovered"
+
+    async def scenario(flight):
+        return await asyncio.gather(flight.do("key", flaky), flight.do("key", flaky), return_exceptions=True)
+
+    leader, follower = asyncio.run(scenario(SingleFlight(share_errors=False)))
+    assert isinstance(leader, RuntimeError)
+    assert follower == "recovered"
+
+    attempts.clear()
+    results = asyncio.run(scenario(SingleFlight(share_errors=True)))
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(attempts) == 1
+
+
+def test_abandoned_call_finishes_in_background_outside_the_request_budget():
+    flight = SingleFlight()
+    cache = {}
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        cache["key"] = "value"
+        return "value"
+
+    async def scenario():
+        with deadline.budget(0.01):
+            late = await flight.do("key", slow, default="fallback")
+        waiter = asyncio.ensure_future(flight.do("key", slow))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert flight.in_flight("key")
+        await asyncio.sleep(0.1)
+        return late, flight.in_flight("key")
+
+    assert asyncio.run(scenario()) == ("fallback", False)
+    assert cache == {"key": "value"}
+    assert flight.calls == 1
+
+
+def test_budget_limited_waiter_returns_on_time_while_the_shared_call_goes_on():
+    flight = SingleFlight()
+    budgets = []
+
+    async def slow():
+        # The shared call sees no request budget, so upstream timeouts are not cut short.
+        budgets.append(deadline.remaining())
+        await asyncio.sleep(0.2)
+        return "value"
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        with deadline.budget(0.02):
+            limited = await flight.do("key", slow, default="fallback")
+        waited = loop.time() - started
+        follower = await flight.do("key", slow)
+        return limited, waited, follower
+
+    limited, waited, follower = asyncio.run(scenario())
+
+    assert limited == "fallback"
+    assert waited < 0.1
+    assert follower == "value"
+    assert budgets == [None]
+    assert flight.calls == 1 and flight.coalesced == 1
@@ -0,0 +1,74 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services.stages import Stage, run_stages
+
+
+def test_independent_stages_run_concurrently_and_fallbacks_isolate_errors():
+    started = []
+
+    async def slow(name):
+        started.append(name)
+        await asyncio.sleep(0.05)
+        return name
+
+    async def broken(_inputs):
+        raise RuntimeError("upstream down")
+
+    async def combine(inputs):
+        return (inputs["a"], inputs["broken"])
+
+    stages = [
+        Stage("a", lambda _: slow("a")),
+        Stage("b", lambda _: slow("b")),
+        Stage("broken", broken, fallback="fallback"),
+        Stage("combined", combine, requires=("a", "broken")),
+    ]
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await run_stages(stages)
+        return results, loop.time() - start
+
+    results, elapsed = asyncio.run(scenario())
+
+    assert results["combined"] == ("a", "fallback")
+    assert results["b"] == "b"
+    assert sorted(started) == ["a", "b"]
+    assert elapsed < 0.09
+
+
+def test_required_stage_failure_cancels_pending_stages():
+    cancelled = []
+
+    async def long_running(_inputs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def failing(_inputs):
+        await asyncio.sleep(0.01)
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run_stages([Stage("slow", long_running), Stage("fail", failing)]))
+
+    assert cancelled == [True]
+
+
+def test_unknown_dependency_is_rejected():
+    async def noop(_inputs):
+        return None
+
+    with pytest.raises(ValueError):
+        asyncio.run(run_stages([Stage("a", noop, requires=("missing",))]))
@@ -0,0 +1,194 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlmodel import Session, SQLModel, create_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.db import session as db_session
+from app.models.job import Job  # noqa: F401  (registers the table)
+from app.models.submission import JobSubmission
+from app.services import submissions
+
+
+def _use_engine(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(db_session, "engine", engine)
+    return engine
+
+
+def test_submitted_job_runs_in_background_and_streams_progress(monkeypatch, tmp_path):
+    engine = _use_engine(monkeypatch, tmp_path)
+    calls = []
+
+    async def process_job(payload, deadline_seconds=None, job_id=None, progress=None):
+        calls.append((payload["trade"], deadline_seconds, job_id))
+        if payload["trade"] == "unknown":
+            raise ValueError("Unsupported trade 'unknown'")
+        progress("normalize", "started")
+        progress("normalize", "finished")
+        return {"job_id": job_id, "total_bid": 125.0, "degraded": []}
+
+    monkeypatch.setattr(submissions, "process_job", process_job)
+
+    async def scenario():
+        queue = submissions.SubmissionQueue(workers=2)
+        job_id = await queue.submit({"trade": "concrete"}, deadline_seconds=3.0)
+        events = [event async for event in queue.feed.subscribe(job_id) if event is not None]
+        bad_id = await queue.submit({"trade": "unknown"})
+        bad_events = [event async for event in queue.feed.subscribe(bad_id)]
+        status = await queue.status(job_id)
+        bad_status = await queue.status(bad_id)
+        missing = await queue.status("missing")
+        await queue.stop()
+        return job_id, events, bad_events, status, bad_status, missing
+
+    job_id, events, bad_events, status, bad_status, missing = asyncio.run(scenario())
+
+    assert calls[0] == ("concrete", 3.0, job_id)
+    assert [(event["status"], event.get("stage"), event.get("state")) for event in events] == [
+        ("running", None, None),
+        ("running", "normalize", "started"),
+        ("running", "normalize", "finished"),
+        ("completed", None, None),
+    ]
+    assert events[-1]["total_bid"] == 125.0
+    assert bad_events[-1] == {"job_id": bad_events[-1]["job_id"], "status": "failed", "error": "Unsupported trade 'unknown'"}
+    assert status["status"] == "completed" and status["attempts"] == 1
+    assert bad_status["status"] == "failed"
+    assert missing is None
+
+    with Session(engine) as session:
+        assert session.get(JobSubmission, job_id).status == "completed"
+
+
+def test_only_rows_with_expired_leases_are_reclaimed_up_to_max_attempts(monkeypatch, tmp_path):
+    engine = _use_engine(monkeypatch, tmp_path)
+    monkeypatch.setattr(submissions.settings, "submission_max_attempts", 3)
+    now = datetime.utcnow()
+    submitted = now - timedelta(minutes=5)
+    rows = [
+        # A live sibling is still pricing this one.
+        ("leased", "running", 1, "other-process", now + timedelta(minutes=1)),
+        # Its process died mid-run.
+        ("crashed", "running", 1, "dead-process", now - timedelta(seconds=1)),
+        # Crashed the process on every run so far.
+        ("poison", "running", 3, "dead-process", now - timedelta(seconds=1)),
+        ("waiting", "queued", 0, None, None),
+    ]
+    with Session(engine) as session:
+        for offset, (job_id, status, attempts, owner, lease) in enumerate(rows):
+            session.add(
+                JobSubmission(
+                    job_id=job_id,
+                    payload={"trade": "concrete"},
+                    status=status,
+                    attempts=attempts,
+                    owner=owner,
+                    lease_expires_at=lease,
+                    submitted_at=submitted + timedelta(seconds=offset),
+                )
+            )
+        session.commit()
+
+    processed = []
+
+    async def process_job(payload, deadline_seconds=None, job_id=None, progress=None):
+        processed.append(job_id)
+        return {"job_id": job_id, "total_bid": 10.0}
+
+    monkeypatch.setattr(submissions, "process_job", process_job)
+
+    async def scenario():
+        queue = submissions.SubmissionQueue(workers=1)
+        await queue.start()
+        for job_id in ("crashed", "waiting"):
+            while queue.feed.latest(job_id) is None or queue.feed.latest(job_id)["status"] != "completed":
+                await asyncio.sleep(0.01)
+        statuses = {job_id: await queue.status(job_id) for job_id, *_ in rows}
+        await queue.stop()
+        return statuses
+
+    statuses = asyncio.run(scenario())
+
+    assert processed == ["crashed", "waiting"]
+    assert statuses["leased"]["status"] == "running"
+    assert statuses["crashed"]["status"] == "completed" and statuses["crashed"]["attempts"] == 2
+    assert statuses["poison"]["status"] == "failed" and "3 interrupted attempts" in statuses["poison"]["error"]
+    assert statuses["waiting"]["status"] == "completed" and statuses["waiting"]["attempts"] == 1
+
+
+def test_processes_sharing_the_table_run_each_job_once_and_follow_each_other(monkeypatch, tmp_path):
+    _use_engine(monkeypatch, tmp_path)
+    monkeypatch.setattr(submissions.settings, "submission_poll_interval", 0.01)
+    processed = []
+
+    async def process_job(payload, deadline_seconds=None, job_id=None, progress=None):
+        processed.append(job_id)
+        progress("materials", "started")
+        await asyncio.sleep(0.05)
+        progress("materials", "finished")
+        return {"job_id": job_id, "total_bid": 10.0}
+
+    monkeypatch.setattr(submissions, "process_job", process_job)
+
+    async def scenario():
+        # Two queues stand in for two server processes; only the second runs workers.
+        web = submissions.SubmissionQueue(workers=1)
+        worker = submissions.SubmissionQueue(workers=2)
+
+        async def no_workers():
+            pass
+
+        web.start = no_workers
+        await worker.start()
+        job_ids = [await web.submit({"trade": "concrete"}) for _ in range(6)]
+        events = await web.events(job_ids[-1])
+        streamed = [event async for event in events]
+        await asyncio.wait_for(_wait_finished(worker, job_ids), 5)
+        await worker.stop()
+        # Only the process running a job keeps its events.
+        assert not any(job_id in web.feed for job_id in job_ids)
+        return job_ids, streamed
+
+    job_ids, streamed = asyncio.run(scenario())
+
+    assert sorted(processed) == sorted(job_ids)
+    assert streamed[0]["status"] == "queued"
+    assert streamed[-1]["status"] == "completed"
+
+
+async def _wait_finished(queue, job_ids):
+    while True:
+        statuses = [await queue.status(job_id) for job_id in job_ids]
+        if all(status["status"] == "completed" for status in statuses):
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_a_final_event_is_published_when_the_outcome_cannot_be_stored(monkeypatch, tmp_path):
+    _use_engine(monkeypatch, tmp_path)
+
+    async def process_job(payload, deadline_seconds=None, job_id=None, progress=None):
+        return {"job_id": job_id, "total_bid": 10.0}
+
+    def broken_finish(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(submissions, "process_job", process_job)
+    monkeypatch.setattr(submissions, "_finish", broken_finish)
+
+    async def scenario():
+        queue = submissions.SubmissionQueue(workers=1)
+        job_id = await queue.submit({"trade": "concrete"})
+        events = [event async for event in queue.feed.subscribe(job_id)]
+        await queue.stop()
+        return events
+
+    events = asyncio.run(scenario())
+    assert events[-1]["status"] == "completed"
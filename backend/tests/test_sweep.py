@@ -0,0 +1,66 @@
+import asyncio
+import itertools
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.plugins.trades.concrete import TRADE_PROFILES
+from app.services import sweep
+from app.services.pipeline import PLUGIN_REGISTRY
+
+
+def test_py_round_matches_builtin_round_on_ties():
+    values = np.array([0.125, 0.375, 2.675, 1.005, 2.5, 3.5, 0.285, 1e-9, 12345.675])
+    for digits in (0, 1, 2, 4):
+        assert sweep.py_round(values, digits).tolist() == [round(value, digits) for value in values.tolist()]
+
+
+def test_sweep_rows_match_scalar_compute_bid_exactly():
+    rng = random.Random(7)
+    lengths = [0.0, 10.005, 12.345, 33.3] + [round(rng.uniform(1, 80), rng.choice([1, 2, 3])) for _ in range(4)]
+    widths = [7.125, 10.0, 14.999] + [round(rng.uniform(1, 40), 3) for _ in range(3)]
+    depths = [0.0, 0.335, 0.5]
+    margins = [0.0, 0.15, 0.17125]
+
+    async def scalar(plugin, enriched_base, length, width, depth, margin):
+        payload = {
+            "trade": plugin.trade_name,
+            "location": "Ames, IA",
+            "dimensions": {"length": length, "width": width, "depth": depth},
+            "margin": margin,
+        }
+        normalized = await plugin.normalize_data(payload)
+        return await plugin.compute_bid({**normalized, **enriched_base})
+
+    for trade in TRADE_PROFILES:
+        plugin = PLUGIN_REGISTRY[trade]
+        costs = {name: rng.uniform(0.1, 900) for name in TRADE_PROFILES[trade]["default_materials"]}
+        enriched_base = {"material_costs": costs, "labor_rate": 31.437, "weather_modifier": 0.0375}
+
+        grid = np.array(list(itertools.product(lengths, widths, depths, margins)), dtype=float)
+        totals = sweep.evaluate_grid(
+            plugin.plan,
+            costs,
+            31.437,
+            0.0375,
+            sweep.grid_metrics(grid[:, 0], grid[:, 1], grid[:, 2]),
+            grid[:, 3],
+        )
+
+        async def expected():
+            return [await scalar(plugin, enriched_base, *row) for row in grid.tolist()]
+
+        for index, bid in enumerate(asyncio.run(expected())):
+            assert totals["material_total"][index] == bid["material_total"]
+            assert totals["labor_hours"][index] == bid["labor"]["hours"]
+            assert totals["labor_total"][index] == bid["labor_total"]
+            assert totals["overhead"][index] == bid["overhead"]
+            assert totals["profit_amount"][index] == bid["profit_amount"]
+            assert totals["total_bid"][index] == bid["total_bid"]
+            assert totals["margin"][index] == bid["profit_margin"]
@@ -0,0 +1,36 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services import weather
+from app.services.cache import TTLCache
+
+
+def test_concurrent_lookups_in_one_cell_share_a_single_call(monkeypatch):
+    calls = []
+
+    async def fake_query(lat, lon, _client=None):
+        calls.append((lat, lon))
+        await asyncio.sleep(0.01)
+        return 0.05
+
+    monkeypatch.setattr(weather.settings, "openweather_api_key", "test-key")
+    monkeypatch.setattr(weather, "weather_cache", TTLCache(16, 60))
+    monkeypatch.setattr(weather, "_query_openweather", fake_query)
+
+    async def scenario():
+        burst = await asyncio.gather(
+            *(weather.fetch_weather_modifier(42.51 + i * 0.001, -94.18) for i in range(10))
+        )
+        cached = await weather.fetch_weather_modifier(42.52, -94.21)
+        return burst, cached
+
+    burst, cached = asyncio.run(scenario())
+
+    assert burst == [0.05] * 10
+    assert cached == 0.05
+    assert calls == [(42.5, -94.2)]
@@ -0,0 +1,66 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services.write_behind import WriteBehindQueue
+
+
+def test_rows_are_group_committed_and_drained_on_stop():
+    batches = []
+
+    def save(rows):
+        if "bad" in rows:
+            raise IntegrityError("INSERT INTO job", {}, Exception("UNIQUE constraint failed"))
+        batches.append(list(rows))
+
+    async def scenario():
+        queue = WriteBehindQueue(save, batch_size=4, max_delay=10.0)
+        rows = [f"row-{index}" for index in range(9)]
+        results = await asyncio.gather(*(queue.write(row) for row in rows[:8]))
+        assert results == [None] * 8
+
+        # Fewer rows than a batch wait for the delay, or for stop() to drain them.
+        tail = await queue.submit(rows[8])
+        bad = await queue.submit("bad")
+        await queue.stop()
+        assert tail.result() is None
+        with pytest.raises(IntegrityError):
+            bad.result()
+        with pytest.raises(RuntimeError):
+            await queue.submit("late")
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert batches == [
+        ["row-0", "row-1", "row-2", "row-3"],
+        ["row-4", "row-5", "row-6", "row-7"],
+        ["row-8"],
+    ]
+    assert queue.written == 9 and queue.flushes == 3
+
+
+def test_batch_wide_errors_fail_the_batch_without_row_retries():
+    calls = []
+
+    def save(rows):
+        calls.append(list(rows))
+        raise OperationalError("INSERT INTO job", {}, Exception("database is locked"))
+
+    async def scenario():
+        idle = WriteBehindQueue(save)
+        await idle.stop()
+        queue = WriteBehindQueue(save, batch_size=3, max_delay=10.0)
+        results = await asyncio.gather(*(queue.write(index) for index in range(3)), return_exceptions=True)
+        await queue.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    assert calls == [[0, 1, 2]]
+    assert all(isinstance(result, OperationalError) for result in results)
@@ -243,6 +243,8 @@ function App() {
               onReset={handleReset}
               tradePresets={TRADE_PRESETS}
               loading={loading}
+              apiBaseUrl={API_BASE_URL}
+              formatCurrency={formatCurrency}
             />
 
             <BidSummary bid={result} formatCurrency={formatCurrency} />
@@ -1,4 +1,4 @@
-import { useMemo, useState } from "react";
+import { useEffect, useMemo, useState } from "react";
 
 const DIMENSION_FIELDS = [
   { key: "length", label: "Length", suffix: "ft" },
@@ -8,8 +8,11 @@ const DIMENSION_FIELDS = [
 
 const clamp = (value, min, max) => Math.min(Math.max(value, min), max);
 
-function JobForm({ formState, onFormChange, onSubmit, onReset, tradePresets, loading }) {
+const QUOTE_DEBOUNCE_MS = 300;
+
+function JobForm({ formState, onFormChange, onSubmit, onReset, tradePresets, loading, apiBaseUrl, formatCurrency }) {
   const [materialInput, setMaterialInput] = useState("");
+  const [quote, setQuote] = useState(null);
 
   const activePreset = tradePresets[formState.trade] ?? {};
 
@@ -28,6 +31,44 @@ function JobForm({ formState, onFormChange, onSubmit, onReset, tradePresets, loa
     };
   }, [formState.dimensions]);
 
+  useEffect(() => {
+    if (!apiBaseUrl) {
+      return undefined;
+    }
+
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const response = await fetch(`${apiBaseUrl}/jobs/quote`, {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          signal: controller.signal,
+          body: JSON.stringify({
+            trade: formState.trade,
+            location: formState.location,
+            dimensions: {
+              length: Number(formState.dimensions.length) || 0,
+              width: Number(formState.dimensions.width) || 0,
+              depth: Number(formState.dimensions.depth) || 0,
+            },
+            materials: formState.materials,
+            margin: Number(formState.margin ?? 0.15),
+          }),
+        });
+        setQuote(response.ok ? await response.json() : null);
+      } catch (err) {
+        if (err.name !== "AbortError") {
+          setQuote(null);
+        }
+      }
+    }, QUOTE_DEBOUNCE_MS);
+
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [apiBaseUrl, formState.trade, formState.location, formState.dimensions, formState.materials, formState.margin]);
+
   const handleDimensionChange = (key, value) => {
     onFormChange((previous) => ({
       ...previous,
@@ -248,6 +289,23 @@ function JobForm({ formState, onFormChange, onSubmit, onReset, tradePresets, loa
         )}
       </div>
 
+      {quote && (
+        <div className="rounded-lg border border-slate-700 bg-slate-900 p-4 text-sm text-slate-300">
+          <div className="flex items-center justify-between">
+            <p className="text-xs uppercase tracking-wide text-slate-500">Quick estimate</p>
+            <p className="text-lg font-semibold text-indigo-200">
+              {formatCurrency ? formatCurrency(quote.total_bid) : quote.total_bid.toFixed(2)}
+            </p>
+          </div>
+          {(quote.defaulted.length > 0 || quote.stale.length > 0) && (
+            <p className="mt-1 text-xs text-slate-400">
+              Ballpark from cached data; generate the bid for live pricing
+              {quote.defaulted.length > 0 && ` (defaults used for ${quote.defaulted.join(", ")})`}.
+            </p>
+          )}
+        </div>
+      )}
+
       <div className="flex flex-col gap-3 pt-2 sm:flex-row sm:items-center sm:justify-between">
         <div className="text-xs text-slate-400">
           Configure assumptions and generate a data-backed estimate instantly.